@@ -1,23 +1,43 @@
 from ml_tools.IO_tools import load_json
-from ml_tools.utilities import load_dataframe, save_dataframe_filename
+from ml_tools.ML_utilities import DragonArtifactFinder
+from ml_tools.utilities import save_dataframe_filename
+from helpers.storage import load_dataframe
 
 from helpers import balance_and_update_dataframe
+from helpers.inference import load_inference_handler, score_dataframe
+from helpers.profiling import run_stage
 from paths import PM
 
 
+# Re-predict the targets of the balanced solutions with the shared CPU model
+RESCORE: bool = True
+
+
 def main():
     # Load bounds
     bounds = load_json(PM.optimization_engineering / "optimization_bounds.json")
     
     # Load optimization results
-    df, _ = load_dataframe(PM.optimization_results / "Pareto_Solutions.csv")
+    df, _ = load_dataframe(PM.pareto_archive_file)
     
     # Balance and update DataFrame
     balanced_df = balance_and_update_dataframe(df, bounds)
     
+    # Targets of the balanced compositions
+    if RESCORE:
+        ARTIFACTS = DragonArtifactFinder(directory=PM.optimization_train_artifacts, 
+                                         load_scaler=True, 
+                                         load_schema=True,
+                                         strict=True)
+        inference_handler = load_inference_handler(architecture_path=ARTIFACTS.model_architecture_path, # type: ignore
+                                                   weights_path=ARTIFACTS.weights_path, # type: ignore
+                                                   scaler_path=ARTIFACTS.scaler_path)
+        predictions = score_dataframe(inference_handler, balanced_df, ARTIFACTS.feature_schema) # type: ignore
+        balanced_df[predictions.columns] = predictions.round(4)
+    
     # Save the updated DataFrame
-    save_dataframe_filename(df=balanced_df, save_dir=PM.optimization_results, filename="balanced_NonDominatedSolutions.csv")
+    save_dataframe_filename(df=balanced_df, save_dir=PM.balanced_solutions_file.parent, filename=PM.balanced_solutions_file.name)
     
 
 if __name__ == "__main__":
-    main()
+    run_stage(main, stage="10_balance", trace_file=PM.profiling_trace_file)
@@ -0,0 +1,31 @@
+from ml_tools.schema import FeatureSchema, make_multibinary_groups
+
+from helpers.constants import CONTINUOUS_INTEGER_FEATURES, MULTIBINARY_GROUPS
+from helpers.recipes import RecipeDecoder, stream_decode_solutions
+from helpers.profiling import run_stage
+from paths import PM
+
+
+# Decode the charge-balanced solutions of 10_balance, otherwise the raw Pareto archive
+BALANCED: bool = True
+
+# Solutions decoded at a time, bounds the memory of large archives
+CHUNK_SIZE: int = 100_000
+
+
+def main():
+    feature_schema = FeatureSchema.from_json(directory=PM.optimization_engineering)
+    multibinary_groups = make_multibinary_groups(feature_schema=feature_schema, group_prefixes=MULTIBINARY_GROUPS)
+
+    decoder = RecipeDecoder(schema=feature_schema,
+                            multibinary_groups=multibinary_groups,
+                            integer_columns=CONTINUOUS_INTEGER_FEATURES)
+
+    stream_decode_solutions(decoder=decoder,
+                            input_path=PM.balanced_solutions_file if BALANCED else PM.pareto_archive_file,
+                            output_path=PM.recipes_file,
+                            chunk_size=CHUNK_SIZE)
+
+
+if __name__ == "__main__":
+    run_stage(main, stage="11_recipes", trace_file=PM.profiling_trace_file)
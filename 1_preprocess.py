@@ -1,15 +1,35 @@
 from helpers.function_map import TRANSFORMATION_RECIPE
+from helpers.memo_processor import MemoizedProcessor
+from helpers.storage import load_dataframe, save_dataframe
+from helpers.streaming import stream_transform_save
+from helpers.profiling import run_stage
 from paths import PM
-from ml_tools.ETL_engineering import DragonProcessor
+
+
+# Read and transform the clean data in row chunks (memory bounded by CHUNK_SIZE)
+STREAMING: bool = False
+CHUNK_SIZE: int = 50_000
 
 
 def process_data() -> None:
     """
     Transform data to numerical values
     """
-    data_processor = DragonProcessor(TRANSFORMATION_RECIPE)
+    if STREAMING:
+        # One-hot categories are read from (or scanned into) the vocabulary file, delete it to rescan
+        stream_transform_save(recipe=TRANSFORMATION_RECIPE,
+                              input_path=PM.clean_data_file,
+                              output_path=PM.processed_data_file,
+                              chunk_size=CHUNK_SIZE,
+                              vocabulary_path=PM.one_hot_vocabulary_file,
+                              cache_dir=PM.parse_cache)
+        return
+    
+    # Each step runs on distinct cell values, parsed free text is reused across runs
+    data_processor = MemoizedProcessor(TRANSFORMATION_RECIPE, cache_dir=PM.parse_cache)
     
-    data_processor.load_transform_save(input_path=PM.clean_data_file, output_path=PM.processed_data_file)
+    df, _ = load_dataframe(df_path=PM.clean_data_file, kind="polars", all_strings=True)
+    save_dataframe(df=data_processor.transform(df), full_path=PM.processed_data_file)
 
 if __name__ == "__main__":
-    process_data()
+    run_stage(process_data, stage="1_preprocess", trace_file=PM.profiling_trace_file)
@@ -1,26 +1,42 @@
-from ml_tools.ensemble_learning import RegressionTreeModels, run_ensemble_pipeline
+from ml_tools.ensemble_learning import RegressionTreeModels
+from helpers.ensemble_scheduler import run_ensemble_scheduler
+from helpers.profiling import run_stage
 from paths import PM
 from helpers.constants import TARGETS
 
 
-if __name__ == "__main__":
-    hyperparameters = {
-        "L1_regularization": 1.5,
-        "L2_regularization": 1.5,
-        "learning_rate": 0.001,
-        "n_estimators": 3000,   #xgb - lightgbm
-        "max_depth": 8,
-        "subsample": 0.8,
-        "colsample_bytree": 0.8,    #xgb - lightgbm
-        "min_child_weight": 3,  #xgb
-        "gamma": 1, #xgb
-        "num_leaves": 31,   #lightgbm
-        "min_data_in_leaf": 40  #lightgbm
-    }
-
-    factory_class = RegressionTreeModels(**hyperparameters)
+# Concurrent fits, the cores are split evenly between them
+N_JOBS = 4
+# None trains all n_estimators on the whole training set, as before. A number of rounds (e.g. 200) holds out a validation
+# split of every training set and stops boosting once its loss has not improved for that many rounds
+EARLY_STOPPING_ROUNDS = None
+
+
+HYPERPARAMETERS = {
+    "L1_regularization": 1.5,
+    "L2_regularization": 1.5,
+    "learning_rate": 0.001,
+    "n_estimators": 3000,   #xgb - lightgbm
+    "max_depth": 8,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,    #xgb - lightgbm
+    "min_child_weight": 3,  #xgb
+    "gamma": 1, #xgb
+    "num_leaves": 31,   #lightgbm
+    "min_data_in_leaf": 40  #lightgbm
+}
+
+
+def main():
+    factory_class = RegressionTreeModels(**HYPERPARAMETERS)
     
-    run_ensemble_pipeline(datasets_dir=PM.train_datasets,
-                      save_dir=PM.train_metrics,
-                      target_columns=TARGETS,
-                      model_object=factory_class)
+    run_ensemble_scheduler(datasets_dir=PM.train_datasets,
+                           save_dir=PM.train_metrics,
+                           target_columns=TARGETS,
+                           model_object=factory_class,
+                           n_jobs=N_JOBS,
+                           early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+
+
+if __name__ == "__main__":
+    run_stage(main, stage="4_machine_learning", trace_file=PM.profiling_trace_file)
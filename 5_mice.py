@@ -1,24 +1,43 @@
-from ml_tools.MICE_imputation import run_mice_pipeline
 from paths import PM
 from helpers.constants import TARGETS
+from helpers.parallel_mice import run_parallel_mice_pipeline
+from helpers.profiling import run_stage
 from ml_tools.serde import deserialize_object
 
 
-# Set number of iterations
+# Number of iterations, every one runs unless early stopping is on
 ITERATIONS = 25
+# Stop once the imputed means/standard deviations change less than TOLERANCE (relative, e.g. 1e-3) for PATIENCE
+# iterations. 0 runs every iteration, as before
+TOLERANCE = 0
+PATIENCE = 2
+# Imputed datasets, each one runs in its own worker process. The parallel speed-up needs RESULTING_DATASETS > 1
+# (every downstream stage then runs once per dataset): one dataset, as before, is a single task sped up only by NUM_THREADS
+RESULTING_DATASETS = 1
+N_WORKERS = None
+# Threads of each model fit, part of the reproducible setup together with the seed
+NUM_THREADS = 4
+RANDOM_STATE = 101
 
 
 def main():
     binary_columns = deserialize_object(filepath=PM.binary_columns_file, expected_type=list)
 
     # Run pipeline
-    run_mice_pipeline(df_path_or_dir=PM.engineered_final_file,
-                  target_columns=[],
-                  save_datasets_dir=PM.mice_datasets,
-                  save_metrics_dir=PM.mice_metrics,
-                  binary_columns=binary_columns,
-                  iterations=ITERATIONS)
+    run_parallel_mice_pipeline(df_path_or_dir=PM.engineered_final_file,
+                               target_columns=[],
+                               save_datasets_dir=PM.mice_datasets,
+                               save_metrics_dir=PM.mice_metrics,
+                               binary_columns=binary_columns,
+                               resulting_datasets=RESULTING_DATASETS,
+                               iterations=ITERATIONS,
+                               random_state=RANDOM_STATE,
+                               tolerance=TOLERANCE,
+                               patience=PATIENCE,
+                               n_workers=N_WORKERS,
+                               num_threads=NUM_THREADS,
+                               memory_report_file=PM.memory_report_file)
 
 
 if __name__ == "__main__":
-    main()
+    run_stage(main, stage="5_mice", trace_file=PM.profiling_trace_file)
@@ -1,13 +1,22 @@
-from ml_tools.VIF_factor import compute_vif_multi
+from helpers.vif import compute_vif_parallel
+from helpers.profiling import run_stage
 from paths import PM
 from helpers.constants import TARGETS
 
+
+# Drop every column above the threshold at once (False, same output as `compute_vif_multi`) or the worst one at a time (True)
+STEPWISE = False
+N_WORKERS = 4
+
+
 def main():
-    compute_vif_multi(input_directory=PM.mice_datasets,
-                    output_plot_directory=PM.vif_metrics,
-                    output_dataset_directory=PM.vif_datasets,
-                    ignore_columns=TARGETS)
+    compute_vif_parallel(input_directory=PM.mice_datasets,
+                         output_plot_directory=PM.vif_metrics,
+                         output_dataset_directory=PM.vif_datasets,
+                         ignore_columns=TARGETS,
+                         stepwise=STEPWISE,
+                         n_workers=N_WORKERS)
 
 
 if __name__ == "__main__":
-    main()
+    run_stage(main, stage="6_vif", trace_file=PM.profiling_trace_file)
@@ -1,16 +1,73 @@
+import pandas as pd
+
 from ml_tools.ML_optimization import DragonParetoOptimizer
-from ml_tools.ML_inference import DragonInferenceHandler
-from ml_tools.ML_models import DragonNodeModel
 from ml_tools.ML_configuration import DragonParetoConfig
 from ml_tools.ML_utilities import DragonArtifactFinder
+from ml_tools.optimization_tools import load_continuous_bounds_template
 
-from helpers.constants import CONTINUOUS_INTEGER_FEATURES, TARGET_capacity, TARGET_capacity_retention, TARGET_first_coulombic_eff
+from helpers.balance import ChargeBalancer, collapse_oxygen_bound
+from helpers.constants import CONTINUOUS_INTEGER_FEATURES, TARGETS_RANGE, TARGET_capacity, TARGET_capacity_retention, TARGET_first_coulombic_eff
+from helpers.convergence import HypervolumeEarlyStopping, evolve, reference_point
+from helpers.inference import encode_features, load_inference_handler
+from helpers.pareto import ParetoArchive
+from helpers.pareto_runner import run_pareto_seeds
+from helpers.screening import ScreenedInferenceHandler, TreeScreen, check_surrogate_predictions, fit_tree_screen, screening_features, screening_report
+from helpers.storage import load_dataframe_with_schema, save_dataframe_filename
+from helpers.surrogate_cache import CachedInferenceHandler
+from helpers.telemetry import GenerationTelemetry, clear_telemetry, load_telemetry, summarize_telemetry
+from helpers.warm_start import warm_start
+from helpers.profiling import run_stage
 from paths import PM
 
 
-# Number of iterations, make sure the optimizer is in "append" mode
+# Number of iterations, one independently seeded optimization each
 ITERATIONS: int = 40
 
+# Population and maximum number of generations of every run
+POPULATION_SIZE: int = 500
+GENERATIONS: int = 1000
+
+# Intra-op threads of every CPU inference process. Fixed, so the seeded fronts do not depend on the worker count or machine
+NUM_THREADS: int = 2
+
+# Worker processes for the seeded iterations, None uses cpu_count // NUM_THREADS
+N_WORKERS: int | None = None
+
+# Derive Fraction_O from the cations (electroneutrality) instead of searching it
+CHARGE_BALANCE: bool = True
+
+# Maximum number of cached surrogate predictions (per process)
+CACHE_SIZE: int = 200_000
+
+# Maximum number of archived solutions (the most crowded are discarded beyond it), None keeps the whole front
+ARCHIVE_MAX_SIZE: int | None = 10_000
+
+# Share of each initial population sampled from the archived front (the rest stays random), 0 starts from scratch
+WARM_START_FRACTION: float = 0.0
+
+# Stop a run once the hypervolume gained over HV_WINDOW generations is below HV_TOLERANCE (relative, e.g. 1e-4), 0 runs every generation
+HV_TOLERANCE: float = 0.0
+HV_WINDOW: int = 50
+
+# Write per-generation hypervolume, front size, evaluations/s and inference/GA time of every run (JSONL)
+TELEMETRY: bool = True
+
+# Two-tier evaluation: a LightGBM approximation of the NODE model scores every population first and only candidates
+# within SCREENING_MARGIN residual deviations of the current front reach the NODE model
+SCREENING: bool = False
+SCREENING_MARGIN: float = 2.0
+# Share of the screened-out candidates still checked by the NODE model for the calibration report, 1.0 makes it exact
+SCREENING_AUDIT: float = 0.05
+# Random candidates (within the bounds) labelled by the NODE model to fit the screen, on top of the dataset and the archive
+SCREENING_SAMPLES: int = 20_000
+SCREENING_HYPERPARAMETERS = {
+    "learning_rate": 0.05,
+    "n_estimators": 400,
+    "max_depth": 8,
+    "num_leaves": 63,
+    "min_data_in_leaf": 20,
+}
+
 
 def optimization_config():
     # Define optimization objectives
@@ -20,14 +77,19 @@ def optimization_config():
         TARGET_first_coulombic_eff: 'max'
     }
 
+    # Continuous bounds, Fraction_O is set by the charge balance repair
+    bounds = load_continuous_bounds_template(PM.optimization_engineering)
+    if CHARGE_BALANCE:
+        bounds = collapse_oxygen_bound(bounds)
+
     # Optimizer configuration
     PARETO_CONFIG = DragonParetoConfig(
         save_directory=PM.optimization_results,
         target_objectives=objectives, # type: ignore
-        continuous_bounds_map=PM.optimization_engineering,
+        continuous_bounds_map=bounds,
         columns_to_round=CONTINUOUS_INTEGER_FEATURES,
-        population_size=500,
-        generations=1000,
+        population_size=POPULATION_SIZE,
+        generations=GENERATIONS,
     )
 
     # ML Artifacts
@@ -39,41 +101,185 @@ def optimization_config():
     return PARETO_CONFIG, ARTIFACTS
 
 
+def load_archive(PARETO_CONFIG: DragonParetoConfig) -> ParetoArchive:
+    return ParetoArchive(file_path=PM.pareto_archive_file,
+                         objectives=PARETO_CONFIG.target_objectives,
+                         integer_columns=CONTINUOUS_INTEGER_FEATURES,
+                         float_precision=PARETO_CONFIG.float_precision,
+                         max_size=ARCHIVE_MAX_SIZE)
+
+
 def main():
     # get config
     PARETO_CONFIG, ARTIFACTS = optimization_config()
+
+    # The summary covers every log in the directory, only this run's seeds may be there
+    if TELEMETRY:
+        clear_telemetry(PM.optimization_telemetry)
     
-    # Define model architecture
-    model = DragonNodeModel.load_architecture(ARTIFACTS.model_architecture_path) # type: ignore
-
-    # Define inference handler
-    inference_handler = DragonInferenceHandler(
-        model=model,
-        state_dict=ARTIFACTS.weights_path, # type: ignore
-        device="cuda:0",
-        scaler=ARTIFACTS.scaler_path
-    )
+    # Single run with plots and log
+    if ITERATIONS == 1:
+        run_single(PARETO_CONFIG, ARTIFACTS)
+        return
+    
+    # Previous non-dominated solutions, used to warm-start every run
+    archive = load_archive(PARETO_CONFIG)
+    hv_reference = reference_point(PARETO_CONFIG.target_objectives, TARGETS_RANGE) # type: ignore
+    screen = None
+    if SCREENING:
+        surrogate, _ = cached_inference_handler(PARETO_CONFIG, ARTIFACTS)
+        screen = fit_screen(PARETO_CONFIG, ARTIFACTS, archive, surrogate)
+
+    # Independent seeded runs merged into one global front
+    merged_front = run_pareto_seeds(seeds=list(range(ITERATIONS)),
+                                    config=PARETO_CONFIG,
+                                    schema=ARTIFACTS.feature_schema, # type: ignore
+                                    architecture_path=ARTIFACTS.model_architecture_path, # type: ignore
+                                    weights_path=ARTIFACTS.weights_path, # type: ignore
+                                    scaler_path=ARTIFACTS.scaler_path,
+                                    num_threads=NUM_THREADS,
+                                    n_workers=N_WORKERS,
+                                    cache_size=CACHE_SIZE,
+                                    charge_balance=CHARGE_BALANCE,
+                                    archive_solutions=archive.solutions,
+                                    warm_start_fraction=WARM_START_FRACTION,
+                                    hv_reference=hv_reference,
+                                    hv_tolerance=HV_TOLERANCE,
+                                    hv_window=HV_WINDOW,
+                                    telemetry_dir=PM.optimization_telemetry if TELEMETRY else None,
+                                    screen=screen,
+                                    screening_margin=SCREENING_MARGIN,
+                                    screening_audit=SCREENING_AUDIT,
+                                    stats_file=PM.optimization_stats_file)
+
+    # Share of NODE calls avoided and of front points lost to false rejections
+    if SCREENING:
+        save_screening_report(pd.read_csv(PM.optimization_stats_file))
+        # Only NODE predictions may reach the archive
+        check_surrogate_predictions(merged_front, surrogate, ARTIFACTS.feature_schema) # type: ignore
+
+    # One row per seed: generations to 90%/99% of the final hypervolume, evaluations/s and inference share
+    if TELEMETRY:
+        save_telemetry_summary()
+
+    # Insert into the persistent non-dominated archive
+    archive.add(merged_front)
+    archive.save()
+
+
+def cached_inference_handler(PARETO_CONFIG: DragonParetoConfig, ARTIFACTS: DragonArtifactFinder):
+    # Shared CPU inference handler
+    inference_handler = load_inference_handler(architecture_path=ARTIFACTS.model_architecture_path, # type: ignore
+                                               weights_path=ARTIFACTS.weights_path, # type: ignore
+                                               scaler_path=ARTIFACTS.scaler_path,
+                                               device="cpu",
+                                               num_threads=NUM_THREADS)
     
-    # LOOP for many iterations
-    for i in range(ITERATIONS):
-        # Initialize optimizer
-        optimizer = DragonParetoOptimizer(inference_handler=inference_handler,
-                                            schema=ARTIFACTS.feature_schema, # type: ignore
-                                            config=PARETO_CONFIG)
+    # Evaluate repeated (rounded, charge-balanced) candidates only once
+    schema = ARTIFACTS.feature_schema
+    balancer = ChargeBalancer(feature_names=list(schema.feature_names)) if CHARGE_BALANCE else None # type: ignore
+    inference_handler = CachedInferenceHandler(inference_handler=inference_handler,
+                                               integer_indices=[schema.feature_names.index(col) for col in CONTINUOUS_INTEGER_FEATURES], # type: ignore
+                                               canonicalize=balancer,
+                                               max_size=CACHE_SIZE)
+    return inference_handler, balancer
+
+
+def fit_screen(PARETO_CONFIG: DragonParetoConfig, ARTIFACTS: DragonArtifactFinder, archive: ParetoArchive,
+               inference_handler: CachedInferenceHandler) -> TreeScreen:
+    # Needs the 'ensemble' extra (xgboost, lightgbm), only imported when screening is on
+    from ml_tools.ensemble_learning import RegressionTreeModels
+
+    schema = ARTIFACTS.feature_schema
+
+    # Known designs: the dataset and the archived front
+    dataset, _ = load_dataframe_with_schema(df_path=PM.optimization_data_file, schema=schema) # type: ignore
+    known_features = [encode_features(dataset, schema)] # type: ignore
+    if archive.solutions is not None and not archive.solutions.empty:
+        known_features.append(encode_features(archive.solutions, schema)) # type: ignore
+
+    # The optimizer is only built for its search bounds
+    probe = DragonParetoOptimizer(inference_handler=inference_handler, schema=schema, config=PARETO_CONFIG) # type: ignore
+    features = screening_features(probe, known_features, n_random=SCREENING_SAMPLES)
+
+    return fit_tree_screen(inference_handler, features, RegressionTreeModels(**SCREENING_HYPERPARAMETERS))
+
+
+def save_screening_report(stats: pd.DataFrame):
+    report = screening_report(stats)
+    save_dataframe_filename(df=report, save_dir=PM.screening_report_file.parent, filename=PM.screening_report_file.name)
+
+
+def run_single(PARETO_CONFIG: DragonParetoConfig, ARTIFACTS: DragonArtifactFinder):
+    inference_handler, balancer = cached_inference_handler(PARETO_CONFIG, ARTIFACTS)
+
+    # Start from the archived front
+    archive = load_archive(PARETO_CONFIG)
+    if SCREENING:
+        inference_handler = ScreenedInferenceHandler(inference_handler=inference_handler,
+                                                     screen=fit_screen(PARETO_CONFIG, ARTIFACTS, archive, inference_handler),
+                                                     objectives=PARETO_CONFIG.target_objectives, # type: ignore
+                                                     margin=SCREENING_MARGIN,
+                                                     audit_rate=SCREENING_AUDIT)
+    
+    # Initialize optimizer
+    optimizer = DragonParetoOptimizer(inference_handler=inference_handler,
+                                        schema=ARTIFACTS.feature_schema, # type: ignore
+                                        config=PARETO_CONFIG)
+
+    warm_start(optimizer, archive.solutions, WARM_START_FRACTION, seed=0)
+
+    hv_reference = reference_point(PARETO_CONFIG.target_objectives, TARGETS_RANGE) # type: ignore
+    telemetry = None
+    if TELEMETRY:
+        telemetry = GenerationTelemetry(optimizer,
+                                        reference=hv_reference,
+                                        log_file=PM.optimization_telemetry / "seed_0.jsonl",
+                                        inference_handler=inference_handler,
+                                        run_id=0)
+        optimizer.algorithm.after_step_hook.append(telemetry)
+
+    # Run optimization with the optimization history plots and log
+    if HV_TOLERANCE > 0:
+        stopping = HypervolumeEarlyStopping(optimizer,
+                                            reference=hv_reference,
+                                            tolerance=HV_TOLERANCE,
+                                            window=HV_WINDOW)
+        evolve(optimizer, stopping, plots_and_log=True)
+    else:
+        optimizer.run(plots_and_log=True)
+    inference_handler.log_stats()
+    if SCREENING:
+        save_screening_report(pd.DataFrame([{"Seed": 0, **inference_handler.stats()}]))
+
+    if telemetry is not None:
+        telemetry.close()
+        save_telemetry_summary()
+
+    # Screened-out front rows carry tree estimates, only NODE predictions are plotted and archived
+    if SCREENING:
+        optimizer.pareto_front = inference_handler.surrogate_front(optimizer.pareto_front, ARTIFACTS.feature_schema) # type: ignore
+        check_surrogate_predictions(optimizer.pareto_front, inference_handler.inference_handler, ARTIFACTS.feature_schema) # type: ignore
+
+    # Plot 3D results
+    optimizer.plot_pareto_3d(x_target=TARGET_capacity,
+                            y_target=TARGET_capacity_retention,
+                            z_target=TARGET_first_coulombic_eff)
+
+    # Store the composition that was actually evaluated
+    pareto_front = optimizer.pareto_front
+    if balancer is not None:
+        pareto_front = balancer.balance_dataframe(pareto_front) # type: ignore
 
-        # Run optimization
-        optimizer.run(plots_and_log=(ITERATIONS == 1))
+    # Insert into the persistent non-dominated archive
+    archive.add(pareto_front) # type: ignore
+    archive.save()
 
-        # Plot 3D results
-        if ITERATIONS == 1:
-            optimizer.plot_pareto_3d(x_target=TARGET_capacity,
-                                    y_target=TARGET_capacity_retention,
-                                    z_target=TARGET_first_coulombic_eff)
 
-        # Save solutions to CSV
-        optimizer.save_solutions(csv_if_exists="append",
-                                save_to_sql=False)
+def save_telemetry_summary():
+    summary = summarize_telemetry(load_telemetry(PM.optimization_telemetry))
+    save_dataframe_filename(df=summary, save_dir=PM.optimization_telemetry_summary_file.parent, filename=PM.optimization_telemetry_summary_file.name)
 
 
 if __name__ == "__main__":
-    main()
+    run_stage(main, stage="9_optimization", trace_file=PM.profiling_trace_file)
@@ -1,7 +1,7 @@
 import pandas as pd
 from ml_tools.schema import FeatureSchema
-from ml_tools.utilities import load_dataframe_with_schema, save_dataframe_with_schema
-from ml_tools.data_exploration import reconstruct_from_schema
+from helpers.storage import load_dataframe_with_schema, save_dataframe_with_schema
+from helpers.schema_ops import reconstruct_from_schema
 
 from paths import PM
 from helpers.constants import TARGET_capacity, TARGET_capacity_retention, TARGET_first_coulombic_eff
@@ -0,0 +1,534 @@
+import argparse
+import importlib
+
+from ml_tools.utilities import save_dataframe_filename
+
+from paths import PM
+
+
+def bench_pareto_workers(worker_counts: list[int], n_seeds: int, generations: int) -> None:
+    """Wall-clock speedup of the seeded Pareto runner against worker count."""
+    from helpers.pareto_runner import benchmark_workers
+
+    optimization = importlib.import_module("9_optimization")
+    PARETO_CONFIG, ARTIFACTS = optimization.optimization_config()
+    PARETO_CONFIG.generations = generations
+
+    report = benchmark_workers(worker_counts=worker_counts,
+                               seeds=list(range(n_seeds)),
+                               config=PARETO_CONFIG,
+                               schema=ARTIFACTS.feature_schema,
+                               architecture_path=ARTIFACTS.model_architecture_path,
+                               weights_path=ARTIFACTS.weights_path,
+                               scaler_path=ARTIFACTS.scaler_path,
+                               num_threads=optimization.NUM_THREADS,
+                               charge_balance=optimization.CHARGE_BALANCE)
+
+    save_dataframe_filename(df=report, save_dir=PM.optimization_results, filename="benchmark_pareto_workers.csv")
+
+
+def bench_inference(batch_size: int, n_batches: int, num_threads: int | None) -> None:
+    """CPU evaluations per second of the eager and the frozen NODE model."""
+    import pandas as pd
+    from helpers.inference import benchmark_inference, load_inference_handler
+
+    optimization = importlib.import_module("9_optimization")
+    _, ARTIFACTS = optimization.optimization_config()
+
+    records = []
+    for freeze in (False, True):
+        inference_handler = load_inference_handler(architecture_path=ARTIFACTS.model_architecture_path,
+                                                   weights_path=ARTIFACTS.weights_path,
+                                                   scaler_path=ARTIFACTS.scaler_path,
+                                                   device="cpu",
+                                                   num_threads=num_threads,
+                                                   freeze=freeze)
+        result = benchmark_inference(inference_handler, ARTIFACTS.feature_schema, batch_size=batch_size, n_batches=n_batches)
+        records.append({"Mode": "frozen" if freeze else "eager", **result})
+
+    report = pd.DataFrame(records)
+    save_dataframe_filename(df=report, save_dir=PM.optimization_results, filename="benchmark_inference.csv")
+
+
+def bench_charge_balance(generations: int, seed: int, target_fraction: float) -> None:
+    """
+    Evaluations needed to reach a target hypervolume with a free Fraction_O versus the charge balance repair.
+    The target is `target_fraction` of the final hypervolume of the free run.
+    """
+    import copy
+    from ml_tools.ML_optimization import DragonParetoOptimizer
+    from ml_tools.optimization_tools import load_continuous_bounds_template
+    from helpers.balance import ChargeBalancer, collapse_oxygen_bound
+    from helpers.benchmarking import compare_hypervolume_traces
+    from helpers.constants import CONTINUOUS_INTEGER_FEATURES, TARGETS_RANGE
+    from helpers.convergence import reference_point
+    from helpers.inference import load_inference_handler
+    from helpers.surrogate_cache import CachedInferenceHandler
+
+    optimization = importlib.import_module("9_optimization")
+    PARETO_CONFIG, ARTIFACTS = optimization.optimization_config()
+    schema = ARTIFACTS.feature_schema
+    bounds = load_continuous_bounds_template(PM.optimization_engineering)
+    reference = reference_point(PARETO_CONFIG.target_objectives, TARGETS_RANGE)
+
+    inference_handler = load_inference_handler(architecture_path=ARTIFACTS.model_architecture_path,
+                                               weights_path=ARTIFACTS.weights_path,
+                                               scaler_path=ARTIFACTS.scaler_path)
+
+    def build(balanced: bool):
+        config = copy.copy(PARETO_CONFIG)
+        config.generations = generations
+        config.continuous_bounds_map = collapse_oxygen_bound(bounds) if balanced else bounds
+
+        cached_handler = CachedInferenceHandler(inference_handler=inference_handler,
+                                                integer_indices=[schema.feature_names.index(col) for col in CONTINUOUS_INTEGER_FEATURES],
+                                                canonicalize=ChargeBalancer(list(schema.feature_names)) if balanced else None)
+        return DragonParetoOptimizer(inference_handler=cached_handler, schema=schema, config=config), cached_handler
+
+    summary, traces = compare_hypervolume_traces(modes={"free": lambda: build(False), "charge balanced": lambda: build(True)},
+                                                 reference=reference,
+                                                 seed=seed,
+                                                 target_fraction=target_fraction)
+
+    save_dataframe_filename(df=summary, save_dir=PM.optimization_results, filename="benchmark_charge_balance.csv")
+    save_dataframe_filename(df=traces, save_dir=PM.optimization_results, filename="benchmark_charge_balance_trace.csv")
+
+
+def bench_preprocess(repeats: int) -> None:
+    """Recipe time with one `str.contains` per keyword (MultiBinaryDummifier) versus the single-pass keyword matcher."""
+    import pandas as pd
+    from ml_tools.ETL_engineering import DragonProcessor, DragonTransformRecipe, MultiBinaryDummifier
+    from ml_tools.utilities import load_dataframe
+    from helpers.benchmarking import best_time
+    from helpers.function_map import TRANSFORMATION_RECIPE
+    from helpers.keyword_matcher import MultiKeywordDummifier
+    from helpers.memo_processor import MemoizedProcessor
+
+    df, _ = load_dataframe(df_path=PM.clean_data_file, kind="polars", all_strings=True, verbose=False)
+
+    baseline_recipe = DragonTransformRecipe()
+    for step in TRANSFORMATION_RECIPE:
+        transform = step["transform"]
+        if isinstance(transform, MultiKeywordDummifier):
+            transform = MultiBinaryDummifier(keywords=transform.keywords,
+                                             case_insensitive=transform.case_insensitive,
+                                             use_regex=transform.use_regex)
+        baseline_recipe.add(input_col_name=step["input_col"], transform=transform, output_col_names=step["output_col"])
+
+    records = []
+    # Keyword steps on their own
+    for baseline_step, step in zip(baseline_recipe, TRANSFORMATION_RECIPE):
+        if not isinstance(step["transform"], MultiKeywordDummifier):
+            continue
+        column = df.get_column(step["input_col"])
+        if not baseline_step["transform"](column).equals(step["transform"](column)):
+            raise RuntimeError(f"Keyword matcher output differs for '{step['input_col']}'.")
+        records.append({"Step": f"{step['input_col']} ({len(step['transform'].keywords)} keywords)",
+                        "Before(s)": best_time(lambda: baseline_step["transform"](column), repeats)[0],
+                        "After(s)": best_time(lambda: step["transform"](column), repeats)[0]})
+
+    # Whole recipe
+    before, after = DragonProcessor(baseline_recipe), DragonProcessor(TRANSFORMATION_RECIPE)
+    records.append({"Step": "full recipe",
+                    "Before(s)": best_time(lambda: before.transform(df), repeats)[0],
+                    "After(s)": best_time(lambda: after.transform(df), repeats)[0]})
+
+    # Whole recipe on distinct values (in-memory, no persistent parse cache)
+    memoized = MemoizedProcessor(TRANSFORMATION_RECIPE)
+    records.append({"Step": "full recipe, memoized",
+                    "Before(s)": records[-1]["Before(s)"],
+                    "After(s)": best_time(lambda: memoized.transform(df), repeats)[0]})
+
+    report = pd.DataFrame(records)
+    report["Speedup"] = report["Before(s)"] / report["After(s)"]
+    save_dataframe_filename(df=report, save_dir=PM.results, filename="benchmark_preprocess.csv")
+
+
+def bench_storage(repeats: int, n_columns: int) -> None:
+    """Load time of the optimization dataset as CSV, Parquet and Arrow IPC, for all columns and a column subset."""
+    import tempfile
+    from pathlib import Path
+    import pandas as pd
+    from ml_tools.schema import FeatureSchema
+    from helpers.benchmarking import best_time
+    from helpers.storage import load_dataframe, save_dataframe_with_schema
+
+    schema = FeatureSchema.from_json(PM.optimization_engineering)
+    df, _ = load_dataframe(df_path=PM.optimization_data_file, kind="pandas", verbose=False)
+    projection = df.columns[:n_columns].to_list()
+
+    records = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for suffix in (".csv", ".parquet", ".arrow"):
+            path = Path(tmp_dir) / f"optimization_dataset{suffix}"
+            save_dataframe_with_schema(df=df, full_path=path, schema=schema, verbose=0)
+            records.append({"Format": suffix.lstrip("."),
+                            "Size(MB)": path.stat().st_size / 1e6,
+                            "Load(s)": best_time(lambda: load_dataframe(df_path=path, verbose=False), repeats)[0],
+                            f"Load {n_columns} Columns(s)": best_time(lambda: load_dataframe(df_path=path, use_columns=projection, verbose=False), repeats)[0]})
+
+    report = pd.DataFrame(records)
+    report["Speedup"] = report["Load(s)"].iloc[0] / report["Load(s)"]
+    save_dataframe_filename(df=report, save_dir=PM.results, filename="benchmark_storage.csv")
+
+
+def bench_schema(scales: list[int], repeats: int) -> None:
+    """
+    Library against vectorized categorical reconstruction (optimization engineering and `reconstruct_from_schema`)
+    on the data tiled `scales` times, checking that both outputs are identical.
+    """
+    import pandas as pd
+    from ml_tools import data_exploration as library
+    from ml_tools.schema import FeatureSchema
+    from helpers import schema_ops
+    from helpers.benchmarking import best_time
+    from helpers.constants import TARGETS, ONE_HOT_FEATURES, BINARY_RECONSTRUCTION_MAP, MULTIBINARY_PATTERN
+    from helpers.storage import load_dataframe_greedy, load_dataframe_with_schema
+
+    df_raw = load_dataframe_greedy(directory=PM.mice_datasets)
+    schema = FeatureSchema.from_json(PM.optimization_engineering)
+    df_encoded, _ = load_dataframe_with_schema(df_path=PM.optimization_data_file, schema=schema, verbose=False)
+
+    def reconstruct_features(module, df: pd.DataFrame) -> pd.DataFrame:
+        df = module.reconstruct_one_hot(df=df, features_to_reconstruct=ONE_HOT_FEATURES, verbose=False)
+        df = module.reconstruct_binary(df=df, reconstruction_map=BINARY_RECONSTRUCTION_MAP, verbose=False)
+        df, _ = module.reconstruct_multibinary(df=df, pattern=MULTIBINARY_PATTERN, case_sensitive=True, verbose=False)
+        return df
+
+    def reconstruct_schema(module, df: pd.DataFrame) -> pd.DataFrame:
+        return module.reconstruct_from_schema(df=df, schema=schema, targets=TARGETS, verbose=0)
+
+    records = []
+    for scale in scales:
+        for step, reconstruct, df in (("features", reconstruct_features, df_raw), ("schema", reconstruct_schema, df_encoded)):
+            df_tiled = pd.concat([df] * scale, ignore_index=True)
+            before, expected = best_time(lambda: reconstruct(library, df_tiled), repeats)
+            after, result = best_time(lambda: reconstruct(schema_ops, df_tiled), repeats)
+            if not expected.equals(result):
+                raise RuntimeError(f"Vectorized '{step}' reconstruction differs from the library at x{scale}.")
+            records.append({"Step": step, "Scale": scale, "Rows": len(df_tiled), "Before(s)": before, "After(s)": after})
+
+        # Round trip of the encoded dataset
+        df_tiled = pd.concat([df_encoded] * scale, ignore_index=True)
+        decoded = reconstruct_schema(schema_ops, df_tiled)
+        encode_time, encoded = best_time(lambda: schema_ops.encode_from_schema(df=decoded, schema=schema, targets=TARGETS), repeats)
+        if not encoded.astype("float64").equals(df_tiled[encoded.columns].astype("float64")):
+            raise RuntimeError(f"Encoding is not the inverse of the reconstruction at x{scale}.")
+        records.append({"Step": "encode", "Scale": scale, "Rows": len(df_tiled), "Before(s)": float("nan"), "After(s)": encode_time})
+
+    report = pd.DataFrame(records)
+    report["Speedup"] = report["Before(s)"] / report["After(s)"]
+    save_dataframe_filename(df=report, save_dir=PM.results, filename="benchmark_schema.csv")
+
+
+def bench_warm_start(generations: int, seed: int, fraction: float, target_fraction: float) -> None:
+    """
+    Evaluations needed to reach a target hypervolume from a random initial population versus one warm-started
+    from the Pareto archive. The target is `target_fraction` of the final hypervolume of the random start.
+    """
+    import copy
+    from ml_tools.ML_optimization import DragonParetoOptimizer
+    from helpers.balance import ChargeBalancer
+    from helpers.benchmarking import compare_hypervolume_traces
+    from helpers.constants import CONTINUOUS_INTEGER_FEATURES, TARGETS_RANGE
+    from helpers.convergence import reference_point
+    from helpers.inference import load_inference_handler
+    from helpers.surrogate_cache import CachedInferenceHandler
+    from helpers.warm_start import warm_start
+
+    optimization = importlib.import_module("9_optimization")
+    PARETO_CONFIG, ARTIFACTS = optimization.optimization_config()
+    schema = ARTIFACTS.feature_schema
+    reference = reference_point(PARETO_CONFIG.target_objectives, TARGETS_RANGE)
+    archive = optimization.load_archive(PARETO_CONFIG)
+    if archive.solutions.empty:
+        raise RuntimeError(f"The Pareto archive '{PM.pareto_archive_file.name}' is empty, run 9_optimization.py first.")
+
+    inference_handler = load_inference_handler(architecture_path=ARTIFACTS.model_architecture_path,
+                                               weights_path=ARTIFACTS.weights_path,
+                                               scaler_path=ARTIFACTS.scaler_path)
+
+    def build(start_fraction: float):
+        config = copy.copy(PARETO_CONFIG)
+        config.generations = generations
+
+        cached_handler = CachedInferenceHandler(inference_handler=inference_handler,
+                                                integer_indices=[schema.feature_names.index(col) for col in CONTINUOUS_INTEGER_FEATURES],
+                                                canonicalize=ChargeBalancer(list(schema.feature_names)) if optimization.CHARGE_BALANCE else None)
+        optimizer = DragonParetoOptimizer(inference_handler=cached_handler, schema=schema, config=config)
+        warm_start(optimizer, archive.solutions, start_fraction, seed)
+        return optimizer, cached_handler
+
+    summary, traces = compare_hypervolume_traces(modes={"random": lambda: build(0.0), "warm start": lambda: build(fraction)},
+                                                 reference=reference,
+                                                 seed=seed,
+                                                 target_fraction=target_fraction)
+
+    save_dataframe_filename(df=summary, save_dir=PM.optimization_results, filename="benchmark_warm_start.csv")
+    save_dataframe_filename(df=traces, save_dir=PM.optimization_results, filename="benchmark_warm_start_trace.csv")
+
+
+# Entry point of every stage of the benchmark suite: (module, function), None for the functions of this script
+SUITE_STAGES = {
+    "1_preprocess": ("1_preprocess", "process_data"),
+    "5_mice": ("5_mice", "main"),
+    "6_vif": ("6_vif", "main"),
+    "4_machine_learning": ("4_machine_learning", "main"),
+    "inference": (None, "suite_inference"),
+    "9_optimization": ("9_optimization", "main"),
+    "10_balance": ("10_balance", "main"),
+}
+
+# Stage constants overridden in the suite (dicts are updated, not replaced): fixed amounts of work that finish in
+# minutes at x1. Part of the recorded settings, runs with different overrides (base rows, seed) are not compared.
+SUITE_OVERRIDES = {
+    "5_mice": {"ITERATIONS": 5, "TOLERANCE": 0},
+    "4_machine_learning": {"HYPERPARAMETERS": {"n_estimators": 300}, "EARLY_STOPPING_ROUNDS": None},
+    "9_optimization": {"ITERATIONS": 4, "POPULATION_SIZE": 200, "GENERATIONS": 50, "HV_TOLERANCE": 0, "TELEMETRY": False, "SCREENING": False},
+}
+
+# Base directories of the data and results, mirrored inside a sandbox
+_SANDBOXED_ROOTS = ["clean_data", "data", "results", "backups"]
+
+
+def _sandbox_path(path, sandbox):
+    """Location of a data or results path of PM inside a sandbox directory. Other paths are returned unchanged."""
+    for root in _SANDBOXED_ROOTS:
+        if path.is_relative_to(PM[root]):
+            return sandbox / path.relative_to(PM.ROOT)
+    return path
+
+
+def suite_inference(batch_size: int = 1000, n_batches: int = 20) -> dict:
+    """Evaluations per second of the frozen CPU model, as in the `inference` benchmark."""
+    from ml_tools.ML_utilities import DragonArtifactFinder
+    from helpers.inference import benchmark_inference, load_inference_handler
+
+    ARTIFACTS = DragonArtifactFinder(directory=PM.optimization_train_artifacts, load_scaler=True, load_schema=True, strict=True)
+    inference_handler = load_inference_handler(architecture_path=ARTIFACTS.model_architecture_path, # type: ignore
+                                               weights_path=ARTIFACTS.weights_path, # type: ignore
+                                               scaler_path=ARTIFACTS.scaler_path,
+                                               device="cpu")
+    result = benchmark_inference(inference_handler, ARTIFACTS.feature_schema, batch_size=batch_size, n_batches=n_batches) # type: ignore
+    return {"Evaluations/s": result["Evaluations/s"]}
+
+
+def run_suite_stage(name: str, sandbox) -> None:
+    """
+    Runs one suite stage with every data and results path of PM moved into `sandbox`, and writes its
+    wall time, CPU time and peak memory next to it. Meant for a fresh process (see `bench_suite`).
+    """
+    from pathlib import Path
+    from ml_tools.IO_tools import save_json
+    from helpers.benchmarking import measure
+
+    sandbox = Path(sandbox)
+    redirected = {key: _sandbox_path(path, sandbox) for key, path in PM.items()}
+    for key, path in redirected.items():
+        if path != PM[key]:
+            PM[key] = path
+
+    module_name, entry = SUITE_STAGES[name]
+    if module_name is None:
+        fn = globals()[entry]
+    else:
+        module = importlib.import_module(module_name)
+        for key, value in SUITE_OVERRIDES.get(name, {}).items():
+            current = getattr(module, key)
+            setattr(module, key, {**current, **value} if isinstance(current, dict) else value)
+        fn = getattr(module, entry)
+
+    save_json(data=measure(fn), directory=sandbox, filename=f"{name}_benchmark.json", verbose=False)
+
+
+def bench_suite(scales: list[int], base_rows: int, seed: int, threshold: float, save_baseline: bool) -> None:
+    """
+    Wall time, CPU time and peak RSS of the pipeline stages on synthetic data at `base_rows` times each scale,
+    plus the CPU inference throughput, saved as JSON and compared against a stored baseline.
+
+    The clean data is generated with the real column layout (`helpers.benchmarking.synthetic_clean_data`) and every
+    stage runs in its own process inside a sandbox per scale, on the outputs of the previous stage. The optimization
+    and inference use the trained model (skipped without one) and do not depend on the row count, they run once;
+    the balancing runs on their Pareto archive tiled to each row count.
+    """
+    import datetime
+    import os
+    import platform
+    import shutil
+    import subprocess
+    import sys
+    from importlib.metadata import version
+    import pandas as pd
+    from ml_tools.IO_tools import load_json, save_json
+    from ml_tools.serde import serialize_object
+    from ml_tools._core import get_logger
+    from helpers.benchmarking import compare_to_baseline, synthetic_clean_data, synthetic_engineered_data, tile_rows
+    from helpers.constants import TARGETS
+    from helpers.storage import load_dataframe, save_dataframe, train_dataset_orchestrator
+
+    logger = get_logger("Benchmarks")
+    root = PM.ROOT
+    has_model = PM.optimization_train_artifacts.is_dir() and PM.optimization_engineering.is_dir()
+    if not has_model:
+        logger.warning("No trained optimization model, the optimization, inference and balancing stages are skipped.")
+
+    records = []
+    archive = None
+    optimized = False
+    for scale in scales:
+        n_rows = base_rows * scale
+        sandbox = PM.benchmark_sandbox / f"x{scale}"
+        shutil.rmtree(sandbox, ignore_errors=True)
+        sandbox.mkdir(parents=True)
+
+        def run(name: str, rows) -> bool:
+            logger.info(f"x{scale}: {name}...")
+            result = subprocess.run([sys.executable, __file__, "stage", name, "--sandbox", str(sandbox)], cwd=root)
+            record = {"Stage": name, "Scale": scale, "Rows": rows}
+            if result.returncode == 0:
+                record.update(Status="ok", **load_json(sandbox / f"{name}_benchmark.json", verbose=False))
+                logger.info(f"x{scale}: {name} took {record['Wall(s)']:.1f}s, peak RSS {record['Peak RSS(MB)']:.0f} MB.")
+            else:
+                record["Status"] = "failed"
+                logger.error(f"x{scale}: {name} failed (exit code {result.returncode}).")
+            records.append(record)
+            return record["Status"] == "ok"
+
+        save_dataframe(df=synthetic_clean_data(n_rows, seed=seed), full_path=_sandbox_path(PM.clean_data_file, sandbox), verbose=0)
+        if run("1_preprocess", n_rows):
+            # Feature engineering notebooks (2, 3) without their plots
+            processed, _ = load_dataframe(df_path=_sandbox_path(PM.processed_data_file, sandbox), kind="pandas", verbose=False)
+            engineered, binary_columns = synthetic_engineered_data(processed)
+            save_dataframe(df=engineered, full_path=_sandbox_path(PM.engineered_final_file, sandbox), verbose=0)
+            serialize_object(obj=binary_columns, file_path=_sandbox_path(PM.binary_columns_file, sandbox))
+
+            if run("5_mice", len(engineered)):
+                run("6_vif", len(engineered))
+
+            train_dataset_orchestrator(list_of_dirs=[_sandbox_path(PM.engineered_final_file, sandbox).parent],
+                                       target_columns=TARGETS,
+                                       save_dir=_sandbox_path(PM.train_datasets, sandbox))
+            run("4_machine_learning", len(engineered))
+
+        if not has_model:
+            continue
+        for directory in (PM.optimization_engineering, PM.optimization_train_artifacts):
+            shutil.copytree(directory, _sandbox_path(directory, sandbox))
+        if not optimized:
+            optimized = True
+            run("inference", None)
+            if run("9_optimization", None):
+                archive, _ = load_dataframe(df_path=_sandbox_path(PM.pareto_archive_file, sandbox), kind="pandas", verbose=False)
+        if archive is not None and not archive.empty:
+            save_dataframe(df=tile_rows(archive, n_rows), full_path=_sandbox_path(PM.pareto_archive_file, sandbox), verbose=0)
+            run("10_balance", n_rows)
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    report = {
+        "Environment": {"Date": datetime.datetime.now().isoformat(timespec="seconds"),
+                        "Commit": commit,
+                        "Python": platform.python_version(),
+                        "Platform": platform.platform(),
+                        "CPUs": os.cpu_count(),
+                        "ml_tools": version("dragon-ml-toolbox")},
+        "Settings": {"Scales": scales, "Base Rows": base_rows, "Seed": seed, "Overrides": SUITE_OVERRIDES},
+        "Results": records,
+    }
+    results = pd.DataFrame(records)
+    logger.info(f"Benchmark suite:\n{results.to_string(index=False)}")
+
+    target_file = PM.benchmark_baseline_file if save_baseline else PM.benchmark_results_file
+    save_json(data=report, directory=target_file.parent, filename=target_file.name, verbose=False)
+    logger.info(f"Results saved to '{target_file.name}'.")
+
+    failed = results.loc[results["Status"] == "failed", "Stage"].to_list()
+    if not save_baseline and PM.benchmark_baseline_file.exists():
+        baseline = load_json(PM.benchmark_baseline_file, verbose=False)
+        # Scales may be a subset of the baseline's, anything else changes the work behind (Stage, Scale)
+        mismatched = [key for key in ("Base Rows", "Seed", "Overrides") if baseline["Settings"].get(key) != report["Settings"][key]]
+        if mismatched:
+            logger.warning(f"The baseline was recorded with different settings ({', '.join(mismatched)}), no comparison is made. "
+                           "Record a new one with '--save-baseline'.")
+        else:
+            comparison = compare_to_baseline(results[results["Status"] == "ok"], pd.DataFrame(baseline["Results"]), threshold=threshold)
+            save_dataframe_filename(df=comparison, save_dir=PM.benchmarks, filename="benchmark_comparison.csv")
+            if comparison["Regression"].any():
+                raise RuntimeError(f"{int(comparison['Regression'].sum())} benchmark regression(s) beyond {threshold:.0%}, see 'benchmark_comparison.csv'.")
+    elif not save_baseline:
+        logger.info("No baseline to compare against, record one with '--save-baseline'.")
+
+    if failed:
+        raise RuntimeError(f"Failed benchmark stages: {failed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    pareto_parser = subparsers.add_parser("pareto", help="Seeded Pareto runs vs worker count.")
+    pareto_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    pareto_parser.add_argument("--seeds", type=int, default=8)
+    pareto_parser.add_argument("--generations", type=int, default=100)
+
+    inference_parser = subparsers.add_parser("inference", help="CPU model evaluations per second.")
+    inference_parser.add_argument("--batch-size", type=int, default=500)
+    inference_parser.add_argument("--batches", type=int, default=20)
+    inference_parser.add_argument("--threads", type=int, default=None)
+
+    balance_parser = subparsers.add_parser("balance", help="Evaluations to target hypervolume with and without the charge balance repair.")
+    balance_parser.add_argument("--generations", type=int, default=300)
+    balance_parser.add_argument("--seed", type=int, default=0)
+    balance_parser.add_argument("--target-fraction", type=float, default=0.95)
+
+    preprocess_parser = subparsers.add_parser("preprocess", help="Keyword dummification before/after on the clean data.")
+    preprocess_parser.add_argument("--repeats", type=int, default=3)
+
+    storage_parser = subparsers.add_parser("storage", help="Dataset load time as CSV, Parquet and Arrow IPC.")
+    storage_parser.add_argument("--repeats", type=int, default=5)
+    storage_parser.add_argument("--columns", type=int, default=10)
+
+    schema_parser = subparsers.add_parser("schema", help="Categorical reconstruction, library vs vectorized, at increasing row counts.")
+    schema_parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    schema_parser.add_argument("--repeats", type=int, default=3)
+
+    warm_start_parser = subparsers.add_parser("warmstart", help="Evaluations to target hypervolume from a random and an archive-seeded population.")
+    warm_start_parser.add_argument("--generations", type=int, default=300)
+    warm_start_parser.add_argument("--seed", type=int, default=0)
+    warm_start_parser.add_argument("--fraction", type=float, default=0.5)
+    warm_start_parser.add_argument("--target-fraction", type=float, default=0.95)
+
+    suite_parser = subparsers.add_parser("suite", help="Pipeline stages on synthetic data at increasing row counts, compared against a stored baseline.")
+    suite_parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    suite_parser.add_argument("--base-rows", type=int, default=2000)
+    suite_parser.add_argument("--seed", type=int, default=0)
+    suite_parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown (or memory growth) flagged as a regression.")
+    suite_parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing.")
+
+    stage_parser = subparsers.add_parser("stage", help="One suite stage inside a sandbox (started by 'suite').")
+    stage_parser.add_argument("name", choices=list(SUITE_STAGES))
+    stage_parser.add_argument("--sandbox", required=True)
+
+    args = parser.parse_args()
+
+    if args.benchmark == "pareto":
+        bench_pareto_workers(worker_counts=args.workers, n_seeds=args.seeds, generations=args.generations)
+    elif args.benchmark == "inference":
+        bench_inference(batch_size=args.batch_size, n_batches=args.batches, num_threads=args.threads)
+    elif args.benchmark == "balance":
+        bench_charge_balance(generations=args.generations, seed=args.seed, target_fraction=args.target_fraction)
+    elif args.benchmark == "preprocess":
+        bench_preprocess(repeats=args.repeats)
+    elif args.benchmark == "storage":
+        bench_storage(repeats=args.repeats, n_columns=args.columns)
+    elif args.benchmark == "schema":
+        bench_schema(scales=args.scales, repeats=args.repeats)
+    elif args.benchmark == "warmstart":
+        bench_warm_start(generations=args.generations, seed=args.seed, fraction=args.fraction, target_fraction=args.target_fraction)
+    elif args.benchmark == "suite":
+        bench_suite(scales=args.scales, base_rows=args.base_rows, seed=args.seed, threshold=args.threshold, save_baseline=args.save_baseline)
+    elif args.benchmark == "stage":
+        run_suite_stage(name=args.name, sandbox=args.sandbox)
@@ -1 +1 @@
-from .balance import balance_and_update_dataframe
\ No newline at end of file
+from .balance import ChargeBalancer, balance_and_update_dataframe
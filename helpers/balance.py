@@ -1,50 +1,118 @@
+import numpy as np
 import pandas as pd
+from functools import lru_cache
+from typing import Optional, Union
 
+from ml_tools._core import get_logger
 
-def balance_and_update_dataframe(df: pd.DataFrame, bounds: dict[str, float]) -> pd.DataFrame:
+
+_LOGGER = get_logger("Charge Balance")
+
+
+# Oxidation states (Valence)
+VALENCE_MAP = {
+    'Li': 1,
+    'Mg': 2,
+    'Al': 3,
+    'Ti': 4,
+    'Mn': 4,
+    'Co': 3,
+    'Ni': 2,
+    'Sr': 2,
+    'Nb': 5,
+    'Mo': 6,
+    'Sb': 5,
+    'Ta': 5,
+    'W': 6
+}
+
+OXYGEN_COLUMN = 'Fraction_O'
+
+
+class ChargeBalancer:
+    """
+    Computes the Fraction_O required for electroneutrality from the cationic fractions.
+
+    The cation columns and their valences are resolved once; balancing N rows is a single
+    matrix-vector product. Works on DataFrames and on raw (N, F) feature arrays in the column order
+    given at construction, so it can be used as a repair step inside the optimizer.
+    """
+    def __init__(self, feature_names: list[str], decimals: Optional[int] = 4):
+        """
+        Args:
+            feature_names (list[str]): Column order of the arrays to balance (e.g. the model schema or the bounds keys).
+            decimals (int | None): Decimal places of the computed Fraction_O. None disables rounding.
+        """
+        self.feature_names = list(feature_names)
+        self.decimals = decimals
+
+        # Fraction_<Element> columns with a known valence, excluding oxygen
+        self.cation_columns = [
+            name for name in self.feature_names
+            if name.startswith('Fraction_') and name != OXYGEN_COLUMN and name.split('_')[1] in VALENCE_MAP
+        ]
+        self.valences = np.array([VALENCE_MAP[col.split('_')[1]] for col in self.cation_columns], dtype=np.float64)
+
+        # Full-width weights: Charge_O = -2 -> Fraction_O = Sum(Fraction_Metal * Valence_Metal) / 2
+        self.charge_weights = np.zeros(len(self.feature_names))
+        self.charge_weights[[self.feature_names.index(col) for col in self.cation_columns]] = self.valences / 2.0
+
+        self.oxygen_index = self.feature_names.index(OXYGEN_COLUMN) if OXYGEN_COLUMN in self.feature_names else None
+
+    @classmethod
+    def from_bounds(cls, bounds: dict, decimals: Optional[int] = 4) -> "ChargeBalancer":
+        """Builds a balancer from the optimization bounds JSON (keys are the feature names)."""
+        return cls(feature_names=list(bounds.keys()), decimals=decimals)
+
+    def _round(self, values: np.ndarray) -> np.ndarray:
+        return values if self.decimals is None else np.round(values, self.decimals)
+
+    def oxygen_fraction(self, features: Union[np.ndarray, pd.DataFrame]) -> np.ndarray:
+        """Returns the balanced Fraction_O of every row."""
+        if isinstance(features, pd.DataFrame):
+            cations = features[self.cation_columns].to_numpy(dtype=np.float64)
+            return self._round(cations @ self.valences / 2.0)
+
+        return self._round(features @ self.charge_weights.astype(features.dtype, copy=False))
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        """Overwrites the Fraction_O column of an (N, F) array in place and returns it."""
+        if self.oxygen_index is None:
+            _LOGGER.error(f"'{OXYGEN_COLUMN}' is not one of the balancer features.")
+            raise ValueError()
+        features[:, self.oxygen_index] = self.oxygen_fraction(features)
+        return features
+
+    def balance_dataframe(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """Sets the Fraction_O column of a DataFrame."""
+        if not inplace:
+            df = df.copy()
+        df[OXYGEN_COLUMN] = self.oxygen_fraction(df)
+        return df
+
+
+@lru_cache(maxsize=8)
+def _balancer_for(feature_names: tuple[str, ...]) -> ChargeBalancer:
+    return ChargeBalancer(feature_names=list(feature_names))
+
+
+def balance_and_update_dataframe(df: pd.DataFrame, bounds: dict[str, float], inplace: bool = False) -> pd.DataFrame:
     """
     Reads a pandas DataFrame and a bounds dictionary, calculates the required Fraction_O
     to ensure electroneutrality based on cationic fractions, and returns
     the modified DataFrame.
     """
-    # Define oxidation states (Valence)
-    valence_map = {
-        'Li': 1,
-        'Mg': 2,
-        'Al': 3,
-        'Ti': 4,
-        'Mn': 4, 
-        'Co': 3,
-        'Ni': 2,
-        'Sr': 2,
-        'Nb': 5,
-        'Mo': 6,
-        'Sb': 5,
-        'Ta': 5,
-        'W': 6
-    }
-    
-    # Identify cation columns dynamically from the JSON keys
-    # look for keys starting with 'Fraction_' excluding 'Fraction_O'
-    cation_cols = [
-        key for key in bounds.keys() 
-        if key.startswith('Fraction_') and key != 'Fraction_O'
-    ]
-    
-    # Calculate total positive charge for each row
-    # Sum(Fraction_Metal * Valence_Metal)
-    total_cation_charge = 0
-    for col in cation_cols:
-        element_symbol = col.split('_')[1] # Extract 'Li' from 'Fraction_Li'
-        if element_symbol in valence_map:
-            charge = valence_map[element_symbol]
-            total_cation_charge += df[col] * charge
-    
-    # Calculate required Oxygen fraction to balance charge
-    # Charge_O = -2 -> 2 * Fraction_O = Total_Positive_Charge
-    df['Fraction_O'] = total_cation_charge / 2.0
-    
-    # Round to 4 decimal places for consistency
-    df['Fraction_O'] = df['Fraction_O'].round(4)
-    
-    return df
+    balancer = _balancer_for(tuple(bounds.keys()))
+    return balancer.balance_dataframe(df, inplace=inplace)
+
+
+def collapse_oxygen_bound(bounds: dict, value: float = 0.0) -> dict:
+    """
+    Returns a copy of a continuous bounds map with the Fraction_O interval collapsed to a single value.
+
+    Used when Fraction_O is derived from the cations by a `ChargeBalancer` repair step, so the optimizer
+    does not spend a search dimension on it.
+    """
+    collapsed = dict(bounds)
+    collapsed[OXYGEN_COLUMN] = [value, value]
+    return collapsed
@@ -0,0 +1,286 @@
+import random
+import resource
+import time
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import torch
+
+from ml_tools.ML_optimization import DragonParetoOptimizer
+from ml_tools.data_exploration import drop_outlier_samples
+from ml_tools._core import get_logger
+
+from .compact import split_continuous_binary
+from .constants import TARGETS, TARGETS_RANGE, CONTINUOUS_FEATURES_RANGE, CONTINUOUS_OPTIMIZATION_RANGE
+from .convergence import HypervolumeTrace, evaluations_to_target, log_convergence
+from .function_map import TRANSFORMATION_RECIPE
+from .keyword_matcher import MultiKeywordDummifier
+
+
+_LOGGER = get_logger("Benchmark Suite")
+
+
+# Labels of the free-text columns the recipe one-hot encodes (AutoDummifier), in the style of the source data
+_COATINGS = ["Al2O3", "ZrO2", "Li3PO4", "LiAlO2", "TiO2", "AlF3", "carbon"]
+_PRECURSOR_TYPES = ["hydroxide", "carbonate", "oxalate", "oxide", "acetate"]
+_ANODES = ["Li metal", "graphite", "Li4Ti5O12"]
+_SALTS = ["LiPF6", "LiPF6", "LiTFSI", "LiClO4"]
+_CRYSTALS = ["Polycrystalline", "Single-crystal"]
+
+# Cations of the layered oxides, the remaining fractions are dopants
+_TRANSITION_METALS = ["Mn", "Co", "Ni"]
+
+
+def _recipe_keywords(input_col: str) -> list[str]:
+    """Keywords of the keyword-dummified recipe step reading `input_col`, without regex word boundaries."""
+    for step in TRANSFORMATION_RECIPE:
+        if step["input_col"] == input_col and isinstance(step["transform"], MultiKeywordDummifier):
+            return [keyword.replace(r"\b", "") for keyword in step["transform"].keywords]
+    _LOGGER.error(f"No keyword step reads '{input_col}' in the transformation recipe.")
+    raise ValueError()
+
+
+def _formatted(values: np.ndarray, unit: str, decimals: int = 0) -> pl.Series:
+    series = pl.Series(values).round(decimals)
+    if decimals == 0:
+        series = series.cast(pl.Int64)
+    return series.cast(pl.String) + unit
+
+
+def synthetic_clean_data(n_rows: int, seed: int = 0, missing_rate: float = 0.1) -> pl.DataFrame:
+    """
+    Free-text frame with every input column of `TRANSFORMATION_RECIPE`, as found in the clean data.
+
+    Compositions and process conditions are drawn within `CONTINUOUS_OPTIMIZATION_RANGE`, targets well inside
+    `TARGETS_RANGE`, and the keyword columns from the recipe's own keyword lists, so the parsing work per row
+    (and the number of distinct cells) is close to the real data. Every column but the formula is missing
+    in `missing_rate` of the rows.
+
+    Args:
+        n_rows (int): Number of rows.
+        seed (int): Seed of the draws.
+        missing_rate (float): Share of missing cells per column.
+    """
+    rng = np.random.default_rng(seed)
+    ranges = CONTINUOUS_OPTIMIZATION_RANGE
+
+    def uniform(name: str, size: int = n_rows) -> np.ndarray:
+        low, high = ranges[name]
+        return rng.uniform(low, high, size)
+
+    def choice(options: list[str], max_items: int = 1, separator: str = ", ") -> pl.Series:
+        counts = rng.integers(1, max_items + 1, n_rows)
+        picks = rng.integers(0, len(options), (n_rows, max_items))
+        labels = np.array(options, dtype=object)[picks]
+        return pl.Series([separator.join(row[:count]) for row, count in zip(labels, counts)])
+
+    # Molecular formula: Li, O, one to three transition metals and occasional dopants
+    elements = [name.split("_")[1] for name in ranges if name.startswith("Fraction_")]
+    formula_parts = []
+    for element in elements:
+        fractions = uniform(f"Fraction_{element}")
+        if element == "O":
+            fractions = np.full(n_rows, 2.0)
+        elif element in _TRANSITION_METALS:
+            fractions[rng.random(n_rows) < 0.3] = 0.0
+        elif element != "Li":
+            fractions[rng.random(n_rows) < 0.85] = 0.0
+        series = pl.Series(fractions).round(3)
+        formula_parts.append(pl.when(series > 0).then(pl.lit(element) + series.cast(pl.String)).otherwise(pl.lit("")))
+    formula = pl.select(pl.concat_str(formula_parts).alias("formula")).to_series()
+
+    dopants = [element for element in elements if element not in ["Li", "O", *_TRANSITION_METALS]]
+    temperatures_c = [uniform(f"Annealing Temperature {i}(K)") - 273.15 for i in (1, 2)]
+    times_h = [uniform(f"Annealing Time {i}(h)") for i in (1, 2)]
+    # Second annealing step only in part of the rows
+    second_step = rng.random(n_rows) < 0.6
+
+    solvents = choice(["EC", "DMC", "EMC", "DEC", "PC", "FEC"], max_items=3, separator="/")
+    electrolyte = "1 M " + choice(_SALTS) + " in " + solvents
+
+    columns = {
+        "molecular formula": formula,
+        "coating material": choice(_COATINGS),
+        "dopant element": choice(dopants, max_items=2),
+        "crystal space group": choice(_recipe_keywords("crystal space group")),
+        "primary particle size": _formatted(uniform("Particle Size Primary(nm)"), " nm"),
+        "secondary particle size": _formatted(uniform("Particle Size Secondary(nm)"), " nm"),
+        "precursor type": choice(_PRECURSOR_TYPES),
+        "precursor preparation method": choice(_recipe_keywords("precursor preparation method"), max_items=3),
+        "annealing temperature": pl.Series(np.where(second_step,
+                                                    [f"{a:.0f} °C, {b:.0f} °C" for a, b in zip(*temperatures_c)],
+                                                    [f"{a:.0f} °C" for a in temperatures_c[1]])),
+        "annealing time": pl.Series(np.where(second_step,
+                                             [f"{a:.0f} h, {b:.0f} h" for a, b in zip(*times_h)],
+                                             [f"{a:.0f} h" for a in times_h[1]])),
+        "single crystal or polycrystalline": choice(_CRYSTALS),
+        # "to" keeps the maximum voltage from being read as a negative number
+        "voltage range": _formatted(uniform("Minimum Voltage(V)"), " to ", 1) + _formatted(uniform("Maximum Voltage(V)"), " V", 1),
+        "electrolyte system": electrolyte,
+        "cycles": _formatted(uniform("Cycles"), " cycles"),
+        "anode material": choice(_ANODES),
+        "capacity": _formatted(rng.uniform(100, 300, n_rows), " mAh/g", 1),
+        "capacity retention": _formatted(rng.uniform(60, 100, n_rows), "%", 1),
+        "first Coulombic efficiency": _formatted(rng.uniform(70, 95, n_rows), "%", 1),
+    }
+
+    recipe_columns = list(dict.fromkeys(step["input_col"] for step in TRANSFORMATION_RECIPE))
+    missing = [col for col in recipe_columns if col not in columns]
+    if missing:
+        _LOGGER.error(f"No synthetic values for the recipe input columns: {missing}")
+        raise ValueError()
+
+    df = pl.DataFrame({col: columns[col] for col in recipe_columns})
+    masks = rng.random((n_rows, len(recipe_columns))) < missing_rate
+    return df.with_columns(
+        pl.when(pl.Series(masks[:, j])).then(None).otherwise(pl.col(col)).alias(col)
+        for j, col in enumerate(recipe_columns) if col != "molecular formula"
+    )
+
+
+def synthetic_engineered_data(df_processed: pd.DataFrame, missing_threshold: float = 0.7) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Feature engineering of the processed data without the plots of the notebooks: features missing in more
+    than `missing_threshold` of the rows are dropped, rows outside the feature and target ranges are removed,
+    and the columns are ordered continuous, binary, targets.
+
+    Returns:
+        tuple: Engineered frame and its binary column names.
+    """
+    feature_columns = [col for col in df_processed.columns if col not in TARGETS]
+    sparse = [col for col in feature_columns if df_processed[col].isna().mean() > missing_threshold]
+    constant = [col for col in feature_columns if df_processed[col].nunique(dropna=True) <= 1]
+    df = df_processed.drop(columns=sorted(set(sparse + constant)))
+
+    df = drop_outlier_samples(df=df, bounds_dict=CONTINUOUS_FEATURES_RANGE | TARGETS_RANGE, verbose=False)
+    df_continuous, df_binary = split_continuous_binary(df.drop(columns=TARGETS))
+
+    engineered = pd.concat([df_continuous, df_binary, df[TARGETS]], axis=1).reset_index(drop=True)
+    return engineered, df_binary.columns.to_list()
+
+
+def tile_rows(df: pd.DataFrame, n_rows: int) -> pd.DataFrame:
+    """`df` repeated (and truncated) to exactly `n_rows` rows."""
+    return df.iloc[np.arange(n_rows) % len(df)].reset_index(drop=True)
+
+
+def best_time(fn: Callable[[], Any], repeats: int) -> tuple[float, Any]:
+    """Shortest wall time of `repeats` calls of `fn`, and the result of the last call."""
+    times = []
+    result = None
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def compare_hypervolume_traces(modes: dict[str, Callable[[], tuple[DragonParetoOptimizer, Any]]],
+                               reference: list[float],
+                               seed: int,
+                               target_fraction: float) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Runs one seeded optimization per mode, recording the hypervolume after every generation, and compares the
+    generations and evaluations each mode needs to reach `target_fraction` of the final hypervolume of the first mode.
+
+    Args:
+        modes (dict[str, Callable]): Mode name to a function building the optimizer and its `CachedInferenceHandler`
+            (whose request counter gives the evaluations), called after the global generators are seeded.
+        reference (list[float]): Hypervolume reference point in objective order.
+        seed (int): Seed of every run.
+        target_fraction (float): Target as a share of the final hypervolume of the first mode.
+
+    Returns:
+        tuple: One summary row per mode, and the per-generation traces of every mode (with a 'Mode' column).
+    """
+    traces = {}
+    for mode, build in modes.items():
+        # The GA draws from the global generators
+        torch.manual_seed(seed)
+        np.random.seed(seed)
+        random.seed(seed)
+
+        optimizer, inference_handler = build()
+        trace = HypervolumeTrace(optimizer, reference, inference_handler=inference_handler)
+        optimizer.algorithm.after_step_hook.append(trace)
+        optimizer.run(plots_and_log=False)
+        traces[mode] = trace.to_dataframe().assign(Mode=mode)
+
+    target = target_fraction * next(iter(traces.values()))["Hypervolume"].iloc[-1]
+    records = []
+    for mode, trace in traces.items():
+        log_convergence(trace, target, label=mode)
+        reached = trace.loc[trace["Hypervolume"] >= target, "Generation"]
+        records.append({"Mode": mode,
+                        "Final Hypervolume": trace["Hypervolume"].iloc[-1],
+                        "Target Hypervolume": target,
+                        "Generations To Target": int(reached.iloc[0]) if not reached.empty else None,
+                        "Evaluations To Target": evaluations_to_target(trace, target)})
+
+    return pd.DataFrame(records), pd.concat(traces.values(), ignore_index=True)
+
+
+def measure(fn: Callable[[], Optional[dict]]) -> dict:
+    """
+    Runs `fn` and returns its wall time, CPU time and peak resident memory, merged with the metrics it returns.
+
+    CPU time and peak memory include the worker processes `fn` starts and waits for. Peak memory is the high-water
+    mark of the process (and of its largest worker), so every measured stage should run in a fresh process.
+    Unix only (`resource`).
+    """
+    def cpu_seconds() -> float:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+    cpu_start = cpu_seconds()
+    start = time.perf_counter()
+    metrics = fn() or {}
+    wall = time.perf_counter() - start
+    cpu = cpu_seconds() - cpu_start
+
+    # ru_maxrss is in kilobytes on Linux
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {"Wall(s)": wall, "CPU(s)": cpu, "Peak RSS(MB)": peak_kb / 1024, **metrics}
+
+
+def compare_to_baseline(results: pd.DataFrame,
+                        baseline: pd.DataFrame,
+                        threshold: float = 0.2,
+                        min_seconds: float = 1.0) -> pd.DataFrame:
+    """
+    Joins two benchmark runs on (Stage, Scale) and flags the regressions: wall time or peak memory more than
+    `threshold` (relative) above the baseline, and throughput (Evaluations/s) more than `threshold` below it.
+    Stages under `min_seconds` in the baseline are too noisy to flag on wall time.
+
+    Returns:
+        pd.DataFrame: Baseline and current value, ratio and regression flag of every metric, one row per stage and scale.
+    """
+    keys = ["Stage", "Scale"]
+    merged = results.merge(baseline, on=keys, how="inner", suffixes=("", " Baseline"))
+
+    regression = pd.Series(False, index=merged.index)
+    columns = keys.copy()
+    for metric, higher_is_worse in (("Wall(s)", True), ("Peak RSS(MB)", True), ("Evaluations/s", False)):
+        if metric not in merged or f"{metric} Baseline" not in merged:
+            continue
+        ratio = merged[metric] / merged[f"{metric} Baseline"]
+        merged[f"{metric} Ratio"] = ratio
+        flagged = ratio > 1 + threshold if higher_is_worse else ratio < 1 - threshold
+        if metric == "Wall(s)":
+            flagged &= merged[f"{metric} Baseline"] >= min_seconds
+        regression |= flagged.fillna(False)
+        columns += [f"{metric} Baseline", metric, f"{metric} Ratio"]
+
+    merged["Regression"] = regression
+    comparison = merged[columns + ["Regression"]]
+
+    for _, row in comparison[comparison["Regression"]].iterrows():
+        ratios = ", ".join(f"{col.removesuffix(' Ratio')} x{row[col]:.2f}" for col in comparison.columns if col.endswith("Ratio") and pd.notna(row[col]))
+        _LOGGER.warning(f"Regression in {row['Stage']} at x{row['Scale']}: {ratios}.")
+    if not comparison["Regression"].any():
+        _LOGGER.info(f"No regression beyond {threshold:.0%} against the baseline ({len(comparison)} stage runs compared).")
+
+    return comparison
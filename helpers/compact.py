@@ -0,0 +1,90 @@
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from ml_tools.utilities import save_dataframe
+from ml_tools._core import get_logger
+
+
+_LOGGER = get_logger("Compact Frames")
+
+
+def is_binary(series: pd.Series) -> bool:
+    """True if every non-missing value is 0 or 1."""
+    if not pd.api.types.is_numeric_dtype(series):
+        return False
+    values = series.to_numpy()
+    present = values[~pd.isna(values)]
+    return bool(((present == 0) | (present == 1)).all())
+
+
+def compact_binaries(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Stores the 0/1 columns of a DataFrame as uint8 (float32 if they have missing values, which uint8 cannot hold).
+    Other columns are left untouched.
+    """
+    casts = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == np.uint8 or not is_binary(series):
+            continue
+        casts[col] = np.float32 if series.isna().any() else np.uint8
+    return df.astype(casts) if casts else df
+
+
+def split_continuous_binary(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Same split as `ml_tools.data_exploration.split_continuous_binary` (binary columns sorted by name),
+    with the binary frame in the compact layout of `compact_binaries`. The input is not modified.
+    """
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        _LOGGER.error("All columns must be numeric (int or float).")
+        raise TypeError()
+
+    binary_cols = sorted(col for col in df.columns if is_binary(df[col]))
+    continuous_cols = [col for col in df.columns if col not in set(binary_cols)]
+
+    df_cont = df[continuous_cols]
+    df_bin = compact_binaries(df[binary_cols])
+
+    print(f"Continuous columns shape: {df_cont.shape}")
+    print(f"Binary columns shape: {df_bin.shape}")
+
+    return df_cont, df_bin
+
+
+def record_memory(df: pd.DataFrame, stage: str, report_file: Union[str, Path]) -> pd.DataFrame:
+    """
+    Adds (or replaces) the row of `stage` in a CSV memory report: in-memory size of `df` against the same
+    frame with every numeric column widened to float64.
+
+    Returns:
+        pd.DataFrame: The whole report.
+    """
+    report_file = Path(report_file)
+    memory = df.memory_usage(deep=True, index=False)
+    numeric = df.select_dtypes(include="number").columns
+    widened = memory.drop(index=numeric).sum() + 8 * len(df) * len(numeric)
+
+    record = pd.DataFrame([{
+        "Stage": stage,
+        "Rows": len(df),
+        "Columns": df.shape[1],
+        "uint8 Columns": int((df.dtypes == np.uint8).sum()),
+        "Memory(MB)": memory.sum() / 1e6,
+        "float64 Memory(MB)": widened / 1e6,
+        "Reduction": widened / max(memory.sum(), 1),
+    }])
+
+    if report_file.exists():
+        report = pd.read_csv(report_file)
+        report = pd.concat([report[report["Stage"] != stage], record], ignore_index=True)
+    else:
+        report = record
+
+    save_dataframe(df=report, full_path=report_file, verbose=0)
+    _LOGGER.info(f"{stage}: {record['Memory(MB)'].iloc[0]:.1f} MB ({record['Reduction'].iloc[0]:.1f}x smaller than float64).")
+
+    return report
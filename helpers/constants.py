@@ -76,31 +76,34 @@ CONTINUOUS_OPTIMIZATION_RANGE = {
 }
 
 # Optimization focused to experimental formula: Li1.2Mn0.54Ni0.13Co0.13O2 and related
-# CONTINUOUS_OPTIMIZATION_RANGE = {
-#     'Fraction_Li': (1.20, 1.26),
-#     'Fraction_O': (2, 2),
-#     'Fraction_Mg': (0.0, 0.0),
-#     'Fraction_Al': (0.0, 0.0),
-#     'Fraction_Ti': (0.0, 0.0),
-#     'Fraction_Mn': (0.54, 0.54),
-#     'Fraction_Co': (0.12, 0.13),
-#     'Fraction_Ni': (0.13, 0.13),
-#     'Fraction_Sr': (0.0, 0.0),
-#     'Fraction_Nb': (0.0, 0.01),
-#     'Fraction_Mo': (0.0, 0.0),
-#     'Fraction_Sb': (0.0, 0.0),
-#     'Fraction_Ta': (0.0, 0.0),
-#     'Fraction_W': (0.0, 0.0),
-#     'Particle Size Primary(nm)': (120, 200),
-#     'Particle Size Secondary(nm)': (5000, 7000),
-#     'Annealing Temperature 1(K)': (700, 800),
-#     'Annealing Temperature 2(K)': (920, 1125),
-#     'Annealing Time 1(h)': (3, 6),
-#     'Annealing Time 2(h)': (12, 38),
-#     'Minimum Voltage(V)': (2.0, 2.1),
-#     'Maximum Voltage(V)': (4.7, 4.9),
-#     'Cycles': (5, 20)
-# }
+LI_RICH_OPTIMIZATION_RANGE = {
+    'Fraction_Li': (1.20, 1.26),
+    'Fraction_O': (2, 2),
+    'Fraction_Mg': (0.0, 0.0),
+    'Fraction_Al': (0.0, 0.0),
+    'Fraction_Ti': (0.0, 0.0),
+    'Fraction_Mn': (0.54, 0.54),
+    'Fraction_Co': (0.12, 0.13),
+    'Fraction_Ni': (0.13, 0.13),
+    'Fraction_Sr': (0.0, 0.0),
+    'Fraction_Nb': (0.0, 0.01),
+    'Fraction_Mo': (0.0, 0.0),
+    'Fraction_Sb': (0.0, 0.0),
+    'Fraction_Ta': (0.0, 0.0),
+    'Fraction_W': (0.0, 0.0),
+    'Particle Size Primary(nm)': (120, 200),
+    'Particle Size Secondary(nm)': (5000, 7000),
+    'Annealing Temperature 1(K)': (700, 800),
+    'Annealing Temperature 2(K)': (920, 1125),
+    'Annealing Time 1(h)': (3, 6),
+    'Annealing Time 2(h)': (12, 38),
+    'Minimum Voltage(V)': (2.0, 2.1),
+    'Maximum Voltage(V)': (4.7, 4.9),
+    'Cycles': (5, 20)
+}
+
+# Uncomment to focus the optimization on it
+# CONTINUOUS_OPTIMIZATION_RANGE = LI_RICH_OPTIMIZATION_RANGE
 
 
 CONTINUOUS_INTEGER_FEATURES = [
@@ -112,3 +115,16 @@ CONTINUOUS_INTEGER_FEATURES = [
     'Annealing Time 2(h)',
     'Cycles'
 ]
+
+# Reconstruction of the categorical features (optimization engineering)
+ONE_HOT_FEATURES = ["Coating", "Precursor Type", "Anode"]
+
+BINARY_RECONSTRUCTION_MAP = {
+    "Crystal Structure": ("is Polycrystalline", "Single-crystal", "Polycrystalline"),
+    "LiPF6 Electrolyte": ("Electrolyte LiPF6", "No", "Yes")
+}
+
+MULTIBINARY_PATTERN = r"Dopant|Space|Precursor Method|Electrolyte Solvent"
+
+# Multibinary groups of the optimization schema (GUI schema and readable recipes)
+MULTIBINARY_GROUPS = ["Dopant", "Electrolyte Solvent", "Precursor Method", "Space"]
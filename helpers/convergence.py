@@ -0,0 +1,179 @@
+import copy
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ml_tools.ML_optimization import DragonParetoOptimizer
+from ml_tools._core import get_logger
+
+from .pareto import hypervolume
+from .surrogate_cache import CachedInferenceHandler
+
+
+_LOGGER = get_logger("Convergence")
+
+
+def reference_point(objectives: dict[str, str], target_ranges: dict[str, tuple[float, float]]) -> list[float]:
+    """
+    Hypervolume reference point from the plausible target ranges: the worst end of each range
+    (lower bound for 'max' objectives, upper bound for 'min' objectives).
+    """
+    return [target_ranges[name][0] if sense == "max" else target_ranges[name][1] for name, sense in objectives.items()]
+
+
+class HypervolumeTrace:
+    """
+    Generation hook recording the hypervolume of the current population after every `algorithm.step()`.
+
+    Attach with `optimizer.algorithm.after_step_hook.append(trace)`.
+    """
+    def __init__(self,
+                 optimizer: DragonParetoOptimizer,
+                 reference: list[float],
+                 inference_handler: Optional[CachedInferenceHandler] = None):
+        """
+        Args:
+            optimizer (DragonParetoOptimizer): Optimizer whose population is traced.
+            reference (list[float]): Reference point in the order of `config.target_objectives`.
+            inference_handler (CachedInferenceHandler | None): If given, its request counter is used as the
+                number of evaluations. Otherwise one population-sized batch per generation is assumed.
+        """
+        self.optimizer = optimizer
+        self.reference = reference
+        self.inference_handler = inference_handler
+        self.senses = list(optimizer.config.target_objectives.values())
+        self.records: list[dict] = []
+
+    def __call__(self) -> None:
+        population = self.optimizer.algorithm.population
+        evals = population.evals.detach().cpu().numpy() # type: ignore
+        generation = len(self.records) + 1
+        if self.inference_handler is not None:
+            evaluations = self.inference_handler.requested
+        else:
+            # The initial population plus one batch of children per generation
+            evaluations = (generation + 1) * len(population)
+
+        self.records.append({
+            "Generation": generation,
+            "Evaluations": evaluations,
+            "Hypervolume": hypervolume(evals, self.senses, self.reference),
+        })
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records)
+
+
+def evaluations_to_target(trace: pd.DataFrame, target_hypervolume: float) -> Optional[int]:
+    """
+    First number of evaluations at which a `HypervolumeTrace` reaches `target_hypervolume`. None if never reached.
+    """
+    reached = trace.loc[trace["Hypervolume"] >= target_hypervolume, "Evaluations"]
+    return int(reached.iloc[0]) if not reached.empty else None
+
+
+def log_convergence(trace: pd.DataFrame, target_hypervolume: float, label: str = "Run") -> None:
+    evaluations = evaluations_to_target(trace, target_hypervolume)
+    final = trace["Hypervolume"].iloc[-1] if not trace.empty else np.nan
+    reached = f"{evaluations} evaluations" if evaluations is not None else "not reached"
+    _LOGGER.info(f"{label}: final hypervolume {final:.4g}, target {target_hypervolume:.4g} {reached}.")
+
+
+class HypervolumeEarlyStopping:
+    """
+    Stops a run once the population hypervolume has improved by less than `tolerance` (relative) over the last
+    `window` generations. Called after every generation by `evolve`, returns True to stop.
+    """
+    def __init__(self,
+                 optimizer: DragonParetoOptimizer,
+                 reference: list[float],
+                 tolerance: float = 1e-4,
+                 window: int = 50,
+                 min_generations: int = 0):
+        """
+        Args:
+            optimizer (DragonParetoOptimizer): Optimizer whose population is monitored.
+            reference (list[float]): Reference point in the order of `config.target_objectives`.
+            tolerance (float): Minimum relative hypervolume gain over `window` generations to keep going.
+            window (int): Generations the gain is measured over.
+            min_generations (int): Generations always run.
+        """
+        self.optimizer = optimizer
+        self.reference = reference
+        self.tolerance = tolerance
+        self.window = window
+        self.min_generations = max(min_generations, window)
+        self.senses = list(optimizer.config.target_objectives.values())
+        self.history: list[float] = []
+
+    def __call__(self) -> bool:
+        evals = self.optimizer.algorithm.population.evals.detach().cpu().numpy() # type: ignore
+        self.history.append(hypervolume(evals, self.senses, self.reference))
+
+        if len(self.history) <= self.min_generations:
+            return False
+        current, previous = self.history[-1], self.history[-1 - self.window]
+        return (current - previous) <= self.tolerance * max(abs(previous), np.finfo(float).tiny)
+
+
+def evolve(optimizer: DragonParetoOptimizer,
+           stopping: Optional[HypervolumeEarlyStopping] = None,
+           plots_and_log: bool = False) -> tuple[pd.DataFrame, int]:
+    """
+    Runs up to `config.generations` generations of `optimizer`, stopping early when `stopping` says so, and
+    returns the Pareto front as `optimizer.run` would.
+
+    Args:
+        optimizer (DragonParetoOptimizer): Optimizer to evolve.
+        stopping (HypervolumeEarlyStopping | None): Early stopping rule, None runs every generation.
+        plots_and_log (bool): Write the optimization log, history plot and front plots of `optimizer.run(plots_and_log=True)`
+            into `config.save_directory`, covering the generations actually run.
+
+    Returns:
+        tuple: The Pareto front and the number of generations run.
+    """
+    config = optimizer.config
+    targets = optimizer.ordered_target_names
+    history_records = []
+    log_lines = []
+    generations = 0
+    for generations in range(1, config.generations + 1):
+        optimizer.algorithm.step()
+
+        stop = stopping is not None and stopping()
+
+        if plots_and_log:
+            # Same population statistics and log lines as the library's loop, the last generation is always logged
+            evals = optimizer.algorithm.population.evals.detach().cpu().numpy() # type: ignore
+            stats = [(name, float(evals[:, i].mean()), float(evals[:, i].min()), float(evals[:, i].max())) for i, name in enumerate(targets)]
+            history_records += [{"Generation": generations, "Target": name, "Mean": mean, "Min": low, "Max": high}
+                                for name, mean, low, high in stats]
+            if stop or generations % config.log_interval == 0 or generations == config.generations:
+                log_lines.append(" | ".join([f"Gen {generations}:"] + [f"{name}: {mean:.3f} (Range: {low:.3f}-{high:.3f})" for name, mean, low, high in stats]))
+
+        if stop:
+            break
+
+    # A zero-generation run only extracts (and labels) the front of the evolved population, and plots it
+    optimizer.config = copy.copy(config)
+    optimizer.config.generations = 0
+    try:
+        front = optimizer.run(plots_and_log=plots_and_log)
+    finally:
+        optimizer.config = config
+
+    if plots_and_log and history_records:
+        # Replaces the log of the zero-generation run
+        save_dir = Path(config.save_directory)
+        with open(save_dir / "optimization_log.txt", "w") as f:
+            f.write(f"Pareto Optimization Log - {generations} Generations\n")
+            f.write("=" * 60 + "\n")
+            f.writelines(line + "\n" for line in log_lines)
+        optimizer._plot_optimization_history(pd.DataFrame(history_records), save_dir)
+
+    if generations < config.generations:
+        _LOGGER.info(f"Hypervolume converged after {generations} of {config.generations} generations.")
+
+    return front, generations
@@ -0,0 +1,271 @@
+"""
+CPU training of the NODE surrogate: pre-tensorized batches, bf16 autocast, batch-size ramp and parallel feature attributions.
+
+Relies on two private parts of `ml_tools` (pinned in pyproject.toml), to be checked on every library upgrade:
+`ML_callbacks._base._Callback`, the base class of `BatchSizeRamp`, and
+`ML_evaluation_captum._ML_evaluation_captum._process_single_target`, which reports the attributions.
+"""
+import contextlib
+import math
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+import torch
+from torch import nn
+from torch.utils.data import Dataset
+from captum.attr import IntegratedGradients
+
+from ml_tools.ML_trainer import DragonTrainer
+from ml_tools.ML_callbacks._base import _Callback
+from ml_tools.ML_evaluation_captum._ML_evaluation_captum import _process_single_target
+from ml_tools.path_manager import make_fullpath, sanitize_filename
+from ml_tools._core import get_logger
+
+
+_LOGGER = get_logger("CPU Training")
+
+
+class TensorBatchLoader:
+    """
+    Drop-in for the trainer's DataLoaders over a dataset already held as two tensors (`features`, `labels`).
+
+    The tensors are made contiguous (and pinned for CUDA) once, then every batch is a single index gather
+    instead of collating `batch_size` per-sample tuples. `batch_size` can be changed between epochs.
+    """
+    def __init__(self, dataset: Dataset, batch_size: int, shuffle: bool, drop_last: bool, pin_memory: bool = False):
+        features = dataset.features.contiguous() # type: ignore
+        labels = dataset.labels.contiguous() # type: ignore
+        if pin_memory:
+            features, labels = features.pin_memory(), labels.pin_memory()
+        self.features = features
+        self.labels = labels
+        # The trainer reads the sample count from `loader.dataset`
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+
+    def __len__(self) -> int:
+        n_samples = len(self.features)
+        return n_samples // self.batch_size if self.drop_last else math.ceil(n_samples / self.batch_size)
+
+    def __iter__(self) -> Iterator[tuple[torch.Tensor, torch.Tensor]]:
+        n_samples = len(self.features)
+        order = torch.randperm(n_samples) if self.shuffle else None
+        for start in range(0, len(self) * self.batch_size, self.batch_size):
+            if order is None:
+                yield self.features[start:start + self.batch_size], self.labels[start:start + self.batch_size]
+            else:
+                index = order[start:start + self.batch_size]
+                yield self.features[index], self.labels[index]
+
+
+class CPUTrainer(DragonTrainer):
+    """
+    `DragonTrainer` for CPU nodes: pre-tensorized batches, optional bf16 autocast of the forward pass and the
+    time and throughput of every epoch in the history (and therefore in the train log).
+    """
+    def __init__(self, *args, bf16: bool = False, num_threads: Optional[int] = None, **kwargs):
+        """
+        Args:
+            *args, **kwargs: Arguments of `DragonTrainer`.
+            bf16 (bool): Run the forward passes (training and validation) under bfloat16 autocast. Weights,
+                gradients and optimizer state stay float32.
+            num_threads (int | None): Intra-op threads of torch. None keeps the torch default.
+        """
+        super().__init__(*args, **kwargs)
+        self.bf16 = bf16
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+
+    def _create_dataloaders(self, batch_size: int, shuffle: bool):
+        pin_memory = "cuda" in self.device.type
+        self.train_loader = TensorBatchLoader(self.train_dataset, batch_size, shuffle, drop_last=True, pin_memory=pin_memory) # type: ignore
+        self.validation_loader = TensorBatchLoader(self.validation_dataset, batch_size, shuffle=False, drop_last=False, pin_memory=pin_memory) # type: ignore
+
+    @contextlib.contextmanager
+    def _autocast_forward(self):
+        """Autocasts only the model's forward calls: the loss, `backward()` and `optimizer.step()` run in float32."""
+        if not self.bf16:
+            yield
+            return
+
+        contexts = []
+
+        def enter(module, args):
+            context = torch.autocast(device_type=self.device.type, dtype=torch.bfloat16)
+            context.__enter__()
+            contexts.append(context)
+
+        def leave(module, args, output):
+            contexts.pop().__exit__(None, None, None)
+            return output.float() if isinstance(output, torch.Tensor) else output
+
+        handles = [self.model.register_forward_pre_hook(enter),
+                   self.model.register_forward_hook(leave, always_call=True)]
+        try:
+            yield
+        finally:
+            for handle in handles:
+                handle.remove()
+
+    def _train_step(self):
+        start = time.perf_counter()
+        with self._autocast_forward():
+            logs = super()._train_step()
+        elapsed = time.perf_counter() - start
+
+        n_samples = len(self.train_loader) * self.train_loader.batch_size # type: ignore
+        logs["epoch_seconds"] = elapsed
+        logs["samples_per_second"] = n_samples / elapsed if elapsed > 0 else 0.0
+        return logs
+
+    def _validation_step(self):
+        with self._autocast_forward():
+            return super()._validation_step()
+
+
+class BatchSizeRamp(_Callback):
+    """
+    Multiplies the training batch size by `growth` every `interval` epochs up to `max_batch_size`, scaling the
+    learning rate of every parameter group by (batch growth) ** `lr_exponent` at the same time: 1 is the linear
+    scaling rule, 0.5 the square-root rule suited to Adam-type optimizers.
+
+    Needs a trainer whose train loader takes a new `batch_size` between epochs (`CPUTrainer`).
+    The batch size of every epoch is recorded in the history.
+    """
+    def __init__(self, max_batch_size: int, interval: int = 10, growth: int = 2, lr_exponent: float = 0.5):
+        super().__init__()
+        if growth < 2 or interval < 1:
+            _LOGGER.error(f"'growth' must be at least 2 and 'interval' at least 1, got {growth} and {interval}.")
+            raise ValueError()
+        self.max_batch_size = max_batch_size
+        self.interval = interval
+        self.growth = growth
+        self.lr_exponent = lr_exponent
+
+    def on_epoch_begin(self, epoch, logs=None):
+        loader = self.trainer.train_loader # type: ignore
+        batch_size = loader.batch_size
+        if epoch > 1 and (epoch - 1) % self.interval == 0 and batch_size < self.max_batch_size:
+            new_batch_size = min(batch_size * self.growth, self.max_batch_size, len(loader.features))
+            if new_batch_size > batch_size:
+                lr_factor = (new_batch_size / batch_size) ** self.lr_exponent
+                for group in self.trainer.optimizer.param_groups: # type: ignore
+                    group["lr"] *= lr_factor
+                loader.batch_size = new_batch_size
+                self.trainer._batch_size = new_batch_size # type: ignore
+                _LOGGER.info(f"Epoch {epoch}: batch size {batch_size} -> {new_batch_size}, learning rate x{lr_factor:.3f}.")
+        if logs is not None:
+            logs["batch_size"] = loader.batch_size
+
+
+# Per-process state of the attribution workers
+_WORKER: dict = {}
+
+
+def _init_worker(model: nn.Module, num_threads: int) -> None:
+    torch.set_num_threads(num_threads)
+    _WORKER.update(model=model.eval())
+
+
+def _attribute_chunk(task: tuple[torch.Tensor, Optional[int], int]) -> tuple[np.ndarray, np.ndarray]:
+    """Integrated Gradients (and convergence deltas) of one chunk of samples for one model output."""
+    inputs, target_index, n_steps = task
+    inputs = inputs.clone().requires_grad_(True)
+    attributions, delta = IntegratedGradients(_WORKER["model"]).attribute(inputs,
+                                                                          baselines=torch.zeros_like(inputs),
+                                                                          target=target_index,
+                                                                          n_steps=n_steps,
+                                                                          internal_batch_size=inputs.shape[0],
+                                                                          return_convergence_delta=True)
+    return attributions.detach().numpy(), delta.detach().numpy()
+
+
+class _PrecomputedAttributions:
+    """Stands in for `IntegratedGradients` so the library's report (CSV, plot, delta check) is reused."""
+    def __init__(self, attributions: np.ndarray, delta: np.ndarray):
+        self.attributions = torch.from_numpy(attributions)
+        self.delta = torch.from_numpy(delta)
+
+    def attribute(self, inputs, **kwargs):
+        return self.attributions, self.delta
+
+
+def parallel_captum_importance(model: nn.Module,
+                               dataset: Dataset,
+                               save_dir: Union[str, Path],
+                               n_samples: int = 100,
+                               n_steps: int = 50,
+                               chunk_size: int = 25,
+                               n_workers: int = 1,
+                               seed: int = 0) -> None:
+    """
+    `DragonTrainer.explain_captum` for tabular models on CPU, with the Integrated Gradients of each
+    (chunk of samples, target) pair computed in a pool of worker processes.
+
+    Each forward pass holds `chunk_size * n_steps` interpolated rows instead of `n_samples * n_steps`,
+    and the reports (CSV and plot per target) are the ones `explain_captum` writes.
+
+    Args:
+        model (nn.Module): Trained model, explained on CPU.
+        dataset (Dataset): Dataset with `features`, `feature_names` and `target_names` (e.g. the validation dataset).
+        save_dir (str | Path): Output directory.
+        n_samples (int): Number of randomly drawn samples explained.
+        n_steps (int): Interpolation steps of the integral approximation.
+        chunk_size (int): Samples per attribution task.
+        n_workers (int): Worker processes. 1 computes every task in the current process.
+        seed (int): Seed of the sample draw.
+    """
+    save_dir_path = make_fullpath(save_dir, make=True, enforce="directory")
+    model = model.to("cpu").eval()
+
+    features: torch.Tensor = dataset.features # type: ignore
+    generator = torch.Generator().manual_seed(seed)
+    inputs = features[torch.randperm(len(features), generator=generator)[:n_samples]].contiguous()
+
+    with torch.no_grad():
+        output_is_1d = model(inputs[:1]).ndim == 1
+    target_names = list(dataset.target_names) # type: ignore
+    target_indices = [None] if output_is_1d else list(range(len(target_names)))
+
+    chunks = list(torch.split(inputs, chunk_size))
+    tasks = [(chunk, target_index, n_steps) for target_index in target_indices for chunk in chunks]
+
+    n_workers = max(1, min(n_workers, len(tasks)))
+    num_threads = max(1, (os.cpu_count() or 1) // n_workers)
+    _LOGGER.info(f"Calculating Captum importance of {len(inputs)} samples for {len(target_names)} target(s): "
+                 f"{len(tasks)} tasks on {n_workers} worker(s).")
+
+    start = time.perf_counter()
+    if n_workers == 1:
+        _init_worker(model, num_threads)
+        results = [_attribute_chunk(task) for task in tasks]
+    else:
+        # 'spawn' avoids inheriting torch thread pools from the parent process
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(model, num_threads)) as executor:
+            results = list(executor.map(_attribute_chunk, tasks))
+    _LOGGER.info(f"Attributions computed in {time.perf_counter() - start:.1f}s.")
+
+    for i, target_index in enumerate(target_indices):
+        name = target_names[i]
+        target_results = results[i * len(chunks):(i + 1) * len(chunks)]
+        attributions = np.concatenate([attr for attr, _ in target_results])
+        delta = np.concatenate([d for _, d in target_results])
+        _process_single_target(ig=_PrecomputedAttributions(attributions, delta),
+                               inputs=inputs,
+                               baseline=torch.zeros_like(inputs),
+                               target_index=target_index,
+                               feature_names=list(dataset.feature_names), # type: ignore
+                               save_dir=save_dir_path,
+                               n_steps=n_steps,
+                               file_suffix=f"_{sanitize_filename(name)}",
+                               target_name=name)
@@ -0,0 +1,212 @@
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+
+from ml_tools.ensemble_learning import RegressionTreeModels
+from ml_tools.ensemble_evaluation import evaluate_model_regression, get_shap_values
+from ml_tools.path_manager import make_fullpath, sanitize_filename
+from ml_tools.serde import serialize_object_filename
+from ml_tools.utilities import save_dataframe_filename
+from ml_tools.keys._keys import EnsembleKeys
+from ml_tools._core import get_logger
+
+from .storage import yield_dataframes_from_dir
+
+
+_LOGGER = get_logger("Ensemble Scheduler")
+
+
+# Per-process memory-mapped datasets, {dataset name: (features, targets, feature names, target names)}
+_DATASETS: dict = {}
+
+
+def _share_datasets(datasets_dir: Union[str, Path], target_columns: list[str], cache_dir: Path) -> dict[str, dict]:
+    """
+    Loads every CSV file of `datasets_dir` once and stores its features and targets as .npy files,
+    memory-mapped by the workers so all fits share the same pages.
+    """
+    manifest = {}
+    for df, df_name in yield_dataframes_from_dir(datasets_dir, verbose=False):
+        valid_targets = [col for col in target_columns if col in df.columns]
+        features = df.drop(columns=valid_targets)
+
+        features_file = cache_dir / f"{df_name}_features.npy"
+        targets_file = cache_dir / f"{df_name}_targets.npy"
+        np.save(features_file, features.to_numpy(dtype=np.float64))
+        np.save(targets_file, df[valid_targets].to_numpy(dtype=np.float64))
+
+        manifest[df_name] = {"features": features_file,
+                             "targets": targets_file,
+                             "feature_names": features.columns.to_list(),
+                             "target_names": valid_targets}
+    return manifest
+
+
+def _init_worker(manifest: dict[str, dict], num_threads: int) -> None:
+    # The native thread pools (OpenMP, BLAS) are already loaded here, environment variables would come too late
+    threadpool_limits(limits=num_threads)
+    _load_datasets(manifest)
+
+
+def _load_datasets(manifest: dict[str, dict]) -> None:
+    for df_name, entry in manifest.items():
+        _DATASETS[df_name] = (np.load(entry["features"], mmap_mode="r"),
+                              np.load(entry["targets"], mmap_mode="r"),
+                              entry["feature_names"],
+                              entry["target_names"])
+
+
+def _fit_with_early_stopping(model, model_name: str, X_fit, y_fit, X_val, y_val, early_stopping_rounds: int):
+    if model_name == "LightGBM":
+        model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)],
+                  callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)])
+        return model, model.best_iteration_
+    # XGBoost
+    model.set_params(early_stopping_rounds=early_stopping_rounds)
+    model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    return model, model.best_iteration + 1
+
+
+def _run_fit(job: tuple) -> dict:
+    """Trains, saves and evaluates one (dataset, target, model) combination, like `train_test_pipeline`."""
+    df_name, target_index, model_name, model_object, settings = job
+    start = time.perf_counter()
+
+    features, targets, feature_names, target_names = _DATASETS[df_name]
+    target_name = target_names[target_index]
+    target = targets[:, target_index]
+
+    # Same test split as `dataset_pipeline`, it only depends on the row count and the seed
+    train_idx, test_idx = train_test_split(np.arange(len(target)), test_size=settings["test_size"], random_state=model_object.random_state)
+    X_train, y_train = np.asarray(features[train_idx]), target[train_idx]
+    X_test, y_test = np.asarray(features[test_idx]), target[test_idx]
+
+    model = model_object()[model_name]
+    model.set_params(n_jobs=settings["num_threads"])
+
+    fit_start = time.perf_counter()
+    if settings["early_stopping_rounds"]:
+        # The validation rows come out of the training split, the test split stays untouched
+        fit_idx, val_idx = train_test_split(np.arange(len(y_train)), test_size=settings["validation_size"], random_state=model_object.random_state)
+        model, rounds = _fit_with_early_stopping(model, model_name, X_train[fit_idx], y_train[fit_idx],
+                                                 X_train[val_idx], y_train[val_idx], settings["early_stopping_rounds"])
+    else:
+        model.fit(X_train, y_train)
+        rounds = model_object.n_estimators
+    fit_time = time.perf_counter() - fit_start
+
+    model_dir = make_fullpath(Path(settings["save_dir"]) / df_name / model_name, make=True)
+    if settings["save_model"]:
+        serialize_object_filename(obj={EnsembleKeys.MODEL: model, EnsembleKeys.FEATURES: feature_names, EnsembleKeys.TARGET: target_name},
+                                  save_dir=model_dir,
+                                  filename=f"{model_name}_{sanitize_filename(target_name)}",
+                                  verbose=False,
+                                  raise_on_error=True)
+
+    evaluate_model_regression(model=model, model_name=model_name, save_dir=model_dir,
+                              x_test_scaled=X_test, single_y_test=y_test, target_name=target_name)
+    get_shap_values(model=model, model_name=model_name, save_dir=model_dir,
+                    features_to_explain=X_train, feature_names=feature_names, target_name=target_name, task="regression")
+
+    return {"Dataset": df_name,
+            "Target": target_name,
+            "Model": model_name,
+            "Threads": settings["num_threads"],
+            "Rounds": rounds,
+            "Fit Time(s)": fit_time,
+            "Total Time(s)": time.perf_counter() - start}
+
+
+def run_ensemble_scheduler(datasets_dir: Union[str, Path],
+                           save_dir: Union[str, Path],
+                           target_columns: list[str],
+                           model_object: RegressionTreeModels,
+                           n_jobs: int = 1,
+                           num_threads: Optional[int] = None,
+                           early_stopping_rounds: Optional[int] = None,
+                           validation_size: float = 0.1,
+                           test_size: float = 0.2,
+                           save_model: bool = True) -> pd.DataFrame:
+    """
+    Parallel counterpart of `run_ensemble_pipeline` for regression models, with the same saved models and metrics.
+
+    Every dataset is read once and shared with the workers through memory-mapped arrays. Each
+    (dataset, target, model) fit is a job; `n_jobs` run at a time with `num_threads` threads each,
+    so `n_jobs * num_threads` never exceeds the available cores.
+
+    Args:
+        datasets_dir (str | Path): Directory with the training datasets (CSV, Parquet or Arrow).
+        save_dir (str | Path): Metrics directory, one subdirectory per dataset and model.
+        target_columns (list[str]): Target columns, one model per target.
+        model_object (RegressionTreeModels): Model factory.
+        n_jobs (int): Concurrent fits, each in its own worker process.
+        num_threads (int | None): Threads per fit. None splits the cores evenly between the jobs.
+        early_stopping_rounds (int | None): Stop boosting once the validation loss has not improved for this many rounds.
+            None trains all `n_estimators` rounds, as `run_ensemble_pipeline` does.
+        validation_size (float): Fraction of the training split held out for early stopping.
+        test_size (float): Test split, the same as in `run_ensemble_pipeline`.
+        save_model (bool): Save the trained models.
+
+    Returns:
+        pd.DataFrame: Per-fit timing and boosting rounds, also saved as 'fit_timings.csv' in `save_dir`.
+    """
+    if not isinstance(model_object, RegressionTreeModels):
+        _LOGGER.error(f"Only RegressionTreeModels are supported, got {type(model_object)}.")
+        raise TypeError()
+
+    save_path = make_fullpath(save_dir, make=True)
+    cpu_count = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, cpu_count))
+    if num_threads is None:
+        num_threads = max(1, cpu_count // n_jobs)
+    elif n_jobs * num_threads > cpu_count:
+        num_threads = max(1, cpu_count // n_jobs)
+        _LOGGER.warning(f"Thread budget capped to {num_threads} per fit to avoid oversubscribing {cpu_count} cores.")
+
+    settings = {"num_threads": num_threads,
+                "early_stopping_rounds": early_stopping_rounds,
+                "validation_size": validation_size,
+                "test_size": test_size,
+                "save_dir": str(save_path),
+                "save_model": save_model}
+
+    _LOGGER.info("🏁 Training starting...")
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        manifest = _share_datasets(datasets_dir, target_columns, Path(cache_dir))
+
+        jobs = [(df_name, target_index, model_name, model_object, settings)
+                for df_name, entry in manifest.items()
+                for target_index in range(len(entry["target_names"]))
+                for model_name in model_object()]
+
+        _LOGGER.info(f"Scheduling {len(jobs)} fits on {n_jobs} worker(s) with {num_threads} thread(s) each.")
+
+        if n_jobs == 1:
+            _load_datasets(manifest)
+            # The limits of the calling process are restored afterwards
+            with threadpool_limits(limits=num_threads):
+                records = [_run_fit(job) for job in jobs]
+            _DATASETS.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs,
+                                     mp_context=mp.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(manifest, num_threads)) as executor:
+                records = list(executor.map(_run_fit, jobs))
+
+    report = pd.DataFrame(records)
+    save_dataframe_filename(df=report, save_dir=save_path, filename="fit_timings.csv")
+    _LOGGER.info(f"Training and evaluation complete in {time.perf_counter() - start:.1f}s ({report['Total Time(s)'].sum():.1f}s of job time).")
+
+    return report
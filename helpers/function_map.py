@@ -1,8 +1,8 @@
 from helpers.constants import TARGETS
+from helpers.keyword_matcher import MultiKeywordDummifier
 from ml_tools.constants import CHEMICAL_ELEMENT_SYMBOLS
 from ml_tools.ETL_engineering import (DragonTransformRecipe,
                                       BinaryTransformer,
-                                      MultiBinaryDummifier,
                                       NumberExtractor,
                                       MultiNumberExtractor,
                                       MultiTemperatureExtractor,
@@ -36,7 +36,7 @@ regex_elements = [fr"\b{element}\b" for element in CHEMICAL_ELEMENT_SYMBOLS]
 TRANSFORMATION_RECIPE.add(
     input_col_name = "dopant element",
     output_col_names="Dopant",
-    transform=MultiBinaryDummifier(
+    transform=MultiKeywordDummifier(
         keywords=regex_elements,
         case_insensitive=False,
         use_regex=True
@@ -66,7 +66,7 @@ _space_groups = [
 TRANSFORMATION_RECIPE.add(
     input_col_name="crystal space group",
     output_col_names="Space",
-    transform=MultiBinaryDummifier(
+    transform=MultiKeywordDummifier(
         keywords=_space_groups,
         case_insensitive=False
     )
@@ -144,7 +144,7 @@ _precursor_preparation_methods = [
 TRANSFORMATION_RECIPE.add(
     input_col_name="precursor preparation method",
     output_col_names="Precursor Method",
-    transform=MultiBinaryDummifier(
+    transform=MultiKeywordDummifier(
         keywords=_precursor_preparation_methods,
         case_insensitive=True
     )
@@ -258,7 +258,7 @@ regex_solvents = [fr"\b{solvent}\b" for solvent in _solvent_list]
 TRANSFORMATION_RECIPE.add(
     input_col_name="electrolyte system",
     output_col_names="Electrolyte Solvent",
-    transform=MultiBinaryDummifier(
+    transform=MultiKeywordDummifier(
         keywords = regex_solvents,
         case_insensitive=True,
         use_regex=True
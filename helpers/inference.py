@@ -0,0 +1,169 @@
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import torch
+
+from ml_tools.ML_inference import DragonInferenceHandler
+from ml_tools.ML_models import DragonNodeModel
+from ml_tools.schema import FeatureSchema
+from ml_tools.keys import InferenceKeys
+from ml_tools._core import get_logger
+
+from .profiling import profiled
+
+
+_LOGGER = get_logger("CPU Inference")
+
+
+# One handler per (artifacts, device, freeze) in each process
+_HANDLERS: dict[tuple, "CPUInferenceHandler"] = {}
+
+
+class CPUInferenceHandler(DragonInferenceHandler):
+    """
+    `DragonInferenceHandler` that predicts under `torch.inference_mode` and can run a frozen TorchScript graph.
+    """
+    def freeze(self, schema: FeatureSchema) -> bool:
+        """
+        Replaces the eager model with a traced, frozen and inference-optimized graph.
+
+        The frozen graph is checked against the eager model on a batch of a different size;
+        the eager model is kept if tracing fails or the outputs differ.
+
+        Returns:
+            bool: True if the frozen graph is in use.
+        """
+        eager_model = self.model
+        example = _random_features(schema, n_rows=8)
+        check = _random_features(schema, n_rows=37)
+
+        try:
+            with torch.no_grad():
+                traced = torch.jit.trace(eager_model, example.to(self.device), check_trace=False)
+                frozen = torch.jit.optimize_for_inference(torch.jit.freeze(traced.eval()))
+                expected = eager_model(check.to(self.device))
+                actual = frozen(check.to(self.device))
+        except Exception as e:
+            _LOGGER.warning(f"Could not freeze the model, using eager mode: {e}")
+            return False
+
+        if not torch.allclose(expected, actual, rtol=1e-4, atol=1e-5):
+            _LOGGER.warning("Frozen model output differs from eager mode, using eager mode.")
+            return False
+
+        self.model = frozen
+        _LOGGER.info("Using frozen TorchScript graph for inference.")
+        return True
+
+    @profiled(name="surrogate inference")
+    def predict_batch(self, features: Union[np.ndarray, torch.Tensor]) -> dict[str, torch.Tensor]:
+        with torch.inference_mode():
+            output = super().predict_batch(features)
+        # Inference tensors cannot be modified in place outside inference mode, hand out regular copies
+        return {key: value.clone() for key, value in output.items()}
+
+
+def load_inference_handler(architecture_path: Union[str, Path],
+                           weights_path: Union[str, Path],
+                           scaler_path: Optional[Union[str, Path]] = None,
+                           device: str = "cpu",
+                           num_threads: Optional[int] = None,
+                           freeze: bool = True) -> CPUInferenceHandler:
+    """
+    Loads the NODE surrogate once per process and returns the shared handler on later calls.
+
+    Args:
+        architecture_path (str | Path): Model architecture JSON.
+        weights_path (str | Path): Model weights file.
+        scaler_path (str | Path | None): Scaler file.
+        device (str): Inference device.
+        num_threads (int | None): Intra-op threads for CPU inference. None keeps the torch default.
+        freeze (bool): Run a frozen TorchScript graph instead of the eager model.
+    """
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+
+    key = (str(architecture_path), str(weights_path), str(scaler_path), device, freeze)
+    if key in _HANDLERS:
+        return _HANDLERS[key]
+
+    model = DragonNodeModel.load_architecture(architecture_path, verbose=False)
+    inference_handler = CPUInferenceHandler(model=model,
+                                            state_dict=weights_path,
+                                            device=device,
+                                            scaler=scaler_path)
+
+    if freeze:
+        inference_handler.freeze(model.schema) # type: ignore
+
+    _HANDLERS[key] = inference_handler
+    return inference_handler
+
+
+def _random_features(schema: FeatureSchema, n_rows: int, seed: int = 0) -> torch.Tensor:
+    """Random model inputs with valid (zero-based) category codes."""
+    generator = torch.Generator().manual_seed(seed)
+    features = torch.rand(n_rows, len(schema.feature_names), generator=generator)
+    for col_idx, cardinality in (schema.categorical_index_map or {}).items():
+        features[:, col_idx] = torch.randint(0, cardinality, (n_rows,), generator=generator).float()
+    return features
+
+
+def encode_features(df: pd.DataFrame, schema: FeatureSchema) -> np.ndarray:
+    """
+    Builds the float32 model input for a solutions frame, mapping categorical labels back to their codes.
+    """
+    features = np.empty((len(df), len(schema.feature_names)), dtype=np.float32)
+    mappings = schema.categorical_mappings or {}
+
+    for i, name in enumerate(schema.feature_names):
+        column = df[name]
+        if name in mappings and not pd.api.types.is_numeric_dtype(column):
+            column = column.astype(str).map(mappings[name])
+        features[:, i] = column.to_numpy(dtype=np.float32)
+
+    return features
+
+
+def score_dataframe(inference_handler: DragonInferenceHandler, df: pd.DataFrame, schema: FeatureSchema) -> pd.DataFrame:
+    """
+    Predicts every target for the rows of a solutions frame.
+
+    Returns:
+        pd.DataFrame: One column per model target, aligned with `df`.
+    """
+    predictions = inference_handler.predict_batch(encode_features(df, schema))[InferenceKeys.PREDICTIONS]
+    return pd.DataFrame(predictions.cpu().numpy(), columns=inference_handler.target_ids, index=df.index)
+
+
+def benchmark_inference(inference_handler: DragonInferenceHandler,
+                        schema: FeatureSchema,
+                        batch_size: int = 1000,
+                        n_batches: int = 20) -> dict[str, float]:
+    """
+    Measures candidate evaluations per second of an inference handler.
+    """
+    features = _random_features(schema, n_rows=batch_size)
+
+    # Warm-up (allocations, graph optimization passes)
+    inference_handler.predict_batch(features)
+
+    start = time.perf_counter()
+    for _ in range(n_batches):
+        inference_handler.predict_batch(features)
+    elapsed = time.perf_counter() - start
+
+    evaluations = batch_size * n_batches
+    result = {
+        "Batch Size": batch_size,
+        "Threads": torch.get_num_threads(),
+        "Evaluations": evaluations,
+        "Seconds": elapsed,
+        "Evaluations/s": evaluations / elapsed,
+    }
+    _LOGGER.info(f"Inference throughput: {result['Evaluations/s']:.0f} evaluations/s (batch size {batch_size}).")
+
+    return result
@@ -0,0 +1,112 @@
+import re
+
+import numpy as np
+import polars as pl
+
+from ml_tools.ETL_engineering import MultiBinaryDummifier
+
+
+# '\bWORD\b' keywords can be matched as whole word tokens
+_WORD_KEYWORD = re.compile(r"^\\b(\w+)\\b$")
+
+
+class MultiKeywordDummifier(MultiBinaryDummifier):
+    """
+    Drop-in replacement for `MultiBinaryDummifier` that scans each distinct cell once for the whole keyword family,
+    instead of running one `str.contains` per keyword over the full column.
+
+    - Word-bounded keywords (regex `\\bWORD\\b`): each cell is split once into word tokens and looked up in a set.
+    - Literal keywords: a single Aho-Corasick pass (`str.extract_many`) reporting all, overlapping, occurrences.
+    - Any other regex falls back to one pattern per keyword, still evaluated on distinct cells only.
+
+    The match is computed on the distinct values of the column and gathered back as a dense uint8 block.
+    Output columns, values and null propagation are identical to `MultiBinaryDummifier`.
+    """
+    def __init__(self,
+                 keywords: list[str],
+                 case_insensitive: bool = True,
+                 use_regex: bool = False):
+        super().__init__(keywords=keywords, case_insensitive=case_insensitive, use_regex=use_regex)
+
+        words = [_WORD_KEYWORD.match(keyword) for keyword in keywords]
+        if use_regex and all(words):
+            self.mode = "words"
+            self.targets = [match.group(1) for match in words] # type: ignore
+        elif not use_regex:
+            self.mode = "literals"
+            self.targets = list(keywords)
+        else:
+            self.mode = "regex"
+            self.targets = list(keywords)
+
+        # Matched text -> keyword indices (several keywords may collapse to the same text when case-insensitive)
+        self._lookup: dict[str, list[int]] = {}
+        for i, target in enumerate(self.targets):
+            self._lookup.setdefault(self._normalize(target), []).append(i)
+
+        self.column_suffixes = [self._column_suffix(keyword) for keyword in keywords]
+
+    def _normalize(self, text: str) -> str:
+        return text.lower() if self.case_insensitive else text
+
+    def _column_suffix(self, keyword: str) -> str:
+        # Same naming as MultiBinaryDummifier
+        name = re.sub(r"\\[a-zA-Z]", "", keyword) if self.use_regex else keyword
+        name = re.sub(r"\s+", "-", name.strip())
+        return re.sub(r"[^a-zA-Z0-9\-]+", "", name)
+
+    def _match_unique(self, values: pl.Series) -> np.ndarray:
+        """(n_values, n_keywords) uint8 matches of distinct, non-null cells."""
+        matrix = np.zeros((len(values), len(self.keywords)), dtype=np.uint8)
+        if len(values) == 0:
+            return matrix
+
+        if self.mode == "regex":
+            for j, keyword in enumerate(self.keywords):
+                pattern = f"(?i){keyword}" if self.case_insensitive else keyword
+                matrix[:, j] = values.str.contains(pattern).to_numpy()
+            return matrix
+
+        if self.mode == "words":
+            found = values.str.extract_all(r"\w+")
+        else:
+            found = values.str.extract_many(self.targets, overlapping=True, ascii_case_insensitive=self.case_insensitive)
+
+        for row, matches in enumerate(found.to_list()):
+            for text in matches or []:
+                for j in self._lookup.get(self._normalize(text), ()):
+                    matrix[row, j] = 1
+
+        return matrix
+
+    def match_matrix(self, column: pl.Series) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the dense (N, n_keywords) uint8 match block of a column and its null mask.
+        Null cells have all zeros in the block.
+        """
+        str_column = column.cast(pl.Utf8)
+        null_mask = str_column.is_null().to_numpy()
+
+        uniques = str_column.drop_nulls().unique().sort()
+        unique_matrix = self._match_unique(uniques)
+
+        if len(uniques) == 0:
+            return np.zeros((len(column), len(self.keywords)), dtype=np.uint8), null_mask
+
+        codes = uniques.search_sorted(str_column.fill_null(uniques[0])).to_numpy()
+        block = unique_matrix[codes]
+        block[null_mask] = 0
+
+        return block, null_mask
+
+    def __call__(self, column: pl.Series) -> pl.DataFrame:
+        block, null_mask = self.match_matrix(column)
+        names = [f"{column.name}_{suffix}" for suffix in self.column_suffixes]
+
+        result = pl.from_numpy(block, schema=names, orient="row")
+        if null_mask.any():
+            # Propagate nulls from the original column
+            result = result.with_columns(
+                pl.when(pl.lit(pl.Series(null_mask))).then(None).otherwise(pl.all()).name.keep()
+            )
+        return result
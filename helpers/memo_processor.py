@@ -0,0 +1,138 @@
+import hashlib
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import polars as pl
+
+from ml_tools.ETL_engineering import (DragonTransformRecipe,
+                                      DragonProcessor,
+                                      NumberExtractor,
+                                      MultiNumberExtractor,
+                                      MultiTemperatureExtractor,
+                                      MolecularFormulaTransformer)
+from ml_tools._core import get_logger
+
+from .profiling import profiled
+
+
+_LOGGER = get_logger("Memoized Processor")
+
+
+# Row-wise transforms whose output columns do not depend on the other values of the column,
+# so their parsed values can be stored on disk and reused across runs
+CACHEABLE_TRANSFORMS = (NumberExtractor, MultiNumberExtractor, MultiTemperatureExtractor, MolecularFormulaTransformer)
+
+_INPUT_KEY = "__input__"
+_SERIES_KEY = "__series__"
+
+
+class _ColumnFactorizer:
+    """Distinct values and integer codes of each input column, computed once per DataFrame."""
+    def __init__(self):
+        self._columns: dict[str, tuple[pl.Series, pl.Series]] = {}
+
+    def clear(self) -> None:
+        self._columns.clear()
+
+    def __call__(self, column: pl.Series) -> tuple[pl.Series, pl.Series]:
+        if column.name not in self._columns:
+            uniques = column.unique(maintain_order=True)
+            codes = (column.to_frame(_INPUT_KEY)
+                     .join(uniques.to_frame(_INPUT_KEY).with_row_index("code"),
+                           on=_INPUT_KEY, how="left", nulls_equal=True, maintain_order="left")
+                     .get_column("code"))
+            self._columns[column.name] = (uniques, codes)
+        return self._columns[column.name]
+
+
+class _MemoizedTransform:
+    """Runs a recipe transform on the distinct values of its input column and broadcasts the result back."""
+    def __init__(self,
+                 transform: Callable,
+                 input_col: str,
+                 factorizer: _ColumnFactorizer,
+                 cache_dir: Optional[Path]):
+        self.transform = transform
+        self.factorizer = factorizer
+        self.cache_file = None
+        self._cache: Optional[pl.DataFrame] = None
+        self._returns_series = False
+
+        if cache_dir is not None and isinstance(transform, CACHEABLE_TRANSFORMS):
+            # The file name changes whenever the column or any transform parameter changes
+            signature = f"{input_col}|{type(transform).__qualname__}|{sorted(vars(transform).items())!r}"
+            self.cache_file = cache_dir / f"{hashlib.sha256(signature.encode()).hexdigest()[:16]}.parquet"
+            if self.cache_file.exists():
+                self._cache = pl.read_parquet(self.cache_file)
+
+    def _apply(self, values: pl.Series) -> pl.DataFrame:
+        """Transform output for `values` as a DataFrame with the input value as key column."""
+        result = self.transform(values)
+        if isinstance(result, pl.Series):
+            self._returns_series = True
+            result = result.alias(_SERIES_KEY).to_frame()
+        return result.with_columns(values.alias(_INPUT_KEY))
+
+    def __call__(self, column: pl.Series) -> Union[pl.Series, pl.DataFrame]:
+        uniques, codes = self.factorizer(column)
+
+        if self.cache_file is None:
+            unique_result = self._apply(uniques)
+        else:
+            # Parse only the values not seen in previous runs
+            if self._cache is not None:
+                missing = uniques.filter(~uniques.is_in(self._cache.get_column(_INPUT_KEY), nulls_equal=True))
+                self._returns_series = _SERIES_KEY in self._cache.columns
+            else:
+                missing = uniques
+
+            if len(missing) > 0:
+                parsed = self._apply(missing)
+                self._cache = parsed if self._cache is None else pl.concat([self._cache, parsed], how="vertical_relaxed")
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                self._cache.write_parquet(self.cache_file)
+
+            unique_result = (uniques.to_frame(_INPUT_KEY)
+                             .join(self._cache, on=_INPUT_KEY, how="left", nulls_equal=True, maintain_order="left")) # type: ignore
+
+        broadcast = unique_result.drop(_INPUT_KEY)[codes]
+        if self._returns_series:
+            return broadcast.get_column(_SERIES_KEY).alias(column.name)
+        return broadcast
+
+
+class MemoizedProcessor(DragonProcessor):
+    """
+    `DragonProcessor` that factorizes every input column once and runs each recipe step on its distinct values only,
+    broadcasting the results back by integer codes. A column used by several steps is factorized once.
+
+    With a `cache_dir`, the parsed values of the free-text extractors (`CACHEABLE_TRANSFORMS`) persist across runs,
+    one Parquet file per step.
+    """
+    def __init__(self, recipe: DragonTransformRecipe, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            recipe (DragonTransformRecipe): Recipe to apply.
+            cache_dir (str | Path | None): Directory of the persistent parse cache. None keeps everything in memory.
+        """
+        super().__init__(recipe)
+        cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+        self._factorizer = _ColumnFactorizer()
+        memo_recipe = DragonTransformRecipe()
+        for step in recipe:
+            transform = step["transform"]
+            if callable(transform):
+                name = f"{step['input_col']} ({type(transform).__name__})"
+                transform = profiled(_MemoizedTransform(transform, step["input_col"], self._factorizer, cache_dir), name=name)
+            memo_recipe.add(input_col_name=step["input_col"], transform=transform, output_col_names=step["output_col"])
+
+        # Same renaming rules as the plain processor
+        self._memo_processor = DragonProcessor(memo_recipe)
+
+    def transform(self, df: pl.DataFrame) -> pl.DataFrame:
+        self._factorizer.clear()
+        try:
+            return self._memo_processor.transform(df)
+        finally:
+            self._factorizer.clear()
@@ -0,0 +1,241 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import miceforest as mf
+
+from ml_tools.MICE import get_convergence_diagnostic, get_imputed_distributions
+from ml_tools.math_utilities import threshold_binary_values
+from ml_tools.path_manager import make_fullpath
+from ml_tools.utilities import merge_dataframes, save_dataframe_filename
+from ml_tools._core import get_logger
+
+from .compact import compact_binaries, record_memory
+from .storage import list_dataset_paths, load_dataframe, save_dataframe_filename as save_dataset
+
+
+_LOGGER = get_logger("Parallel MICE")
+
+
+def dataset_seeds(random_state: int, resulting_datasets: int) -> list[int]:
+    """Independent seed of each imputed dataset, a function of `random_state` and the dataset index only."""
+    children = np.random.SeedSequence(random_state).spawn(resulting_datasets)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def _imputed_moments(imputed_df: pd.DataFrame, missing_masks: dict[str, np.ndarray]) -> np.ndarray:
+    """(n_columns, 2) mean and standard deviation of the imputed values of each column."""
+    return np.array([
+        [imputed_df[col].to_numpy()[mask].mean(), imputed_df[col].to_numpy()[mask].std()]
+        for col, mask in missing_masks.items()
+    ])
+
+
+def _impute_dataset(df: pd.DataFrame,
+                    dataset_name: str,
+                    distribution_name: str,
+                    seed: int,
+                    max_iterations: int,
+                    tolerance: float,
+                    patience: int,
+                    num_threads: int,
+                    save_metrics_dir: Optional[Path]) -> tuple[pd.DataFrame, int]:
+    """
+    Imputes one dataset with its own single-dataset kernel, one MICE iteration at a time,
+    stopping once the imputed means and standard deviations of every column have moved less than
+    `tolerance` (relative to the observed standard deviation of the column) for `patience` consecutive iterations.
+    """
+    kernel = mf.ImputationKernel(data=df, num_datasets=1, random_state=seed)
+
+    missing_masks = {col: df[col].isna().to_numpy() for col in df.columns if df[col].isna().any()}
+    scale = np.array([df[col].std() for col in missing_masks])
+    scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)[:, None]
+
+    previous = None
+    stable = 0
+    iterations = 0
+    while iterations < max_iterations:
+        # LightGBM is run deterministically, each model fit uses `num_threads`
+        kernel.mice(1, num_threads=num_threads, deterministic=True, force_col_wise=True)
+        iterations += 1
+
+        if tolerance <= 0:
+            continue
+        moments = _imputed_moments(kernel.complete_data(dataset=0), missing_masks)
+        if previous is not None:
+            shift = np.abs(moments - previous) / scale
+            stable = stable + 1 if shift.max(initial=0.0) < tolerance else 0
+            if stable >= patience:
+                break
+        previous = moments
+
+    imputed_df: pd.DataFrame = kernel.complete_data(dataset=0) # type: ignore
+
+    if save_metrics_dir is not None:
+        column_names = list(missing_masks)
+        get_convergence_diagnostic(kernel=kernel, imputed_dataset_names=[dataset_name], column_names=column_names, root_dir=save_metrics_dir)
+        get_imputed_distributions(kernel=kernel, df_name=distribution_name, root_dir=save_metrics_dir, column_names=column_names)
+
+    return imputed_df, iterations
+
+
+def _impute_dataset_star(args: tuple) -> tuple[pd.DataFrame, int]:
+    return _impute_dataset(*args)
+
+
+def parallel_mice(df: pd.DataFrame,
+                  df_name: str,
+                  binary_columns: Optional[list[str]] = None,
+                  resulting_datasets: int = 1,
+                  iterations: int = 20,
+                  random_state: int = 101,
+                  tolerance: float = 0.0,
+                  patience: int = 2,
+                  n_workers: Optional[int] = None,
+                  num_threads: int = 1,
+                  save_metrics_dir: Optional[Union[str, Path]] = None) -> tuple[list[pd.DataFrame], list[str], list[int]]:
+    """
+    Parallel counterpart of `apply_mice`: every imputed dataset is an independent single-dataset kernel
+    run in its own worker process, with early stopping on the imputed moments.
+
+    Each dataset is seeded from `random_state` and its index (`dataset_seeds`) and every LightGBM fit runs
+    deterministically on `num_threads` threads, so the output is bit-identical for a fixed seed and thread count,
+    whatever the number of workers.
+
+    Args:
+        df (pd.DataFrame): Features to impute.
+        df_name (str): Base name of the imputed datasets.
+        binary_columns (list[str] | None): Columns thresholded to 0/1 after imputation.
+        resulting_datasets (int): Number of imputed datasets.
+        iterations (int): Maximum MICE iterations per dataset.
+        random_state (int): Base seed.
+        tolerance (float): Early stopping threshold on the change of the imputed means and standard deviations,
+            relative to the observed standard deviation of each column. 0 always runs `iterations`.
+        patience (int): Consecutive stable iterations required to stop.
+        n_workers (int | None): Worker processes. None uses one per dataset, up to `cpu_count // num_threads`.
+        num_threads (int): Threads of each LightGBM model fit.
+        save_metrics_dir (str | Path | None): If given, convergence and distribution plots are saved here by the workers.
+
+    Returns:
+        tuple: imputed datasets, their names and the number of iterations each one ran.
+    """
+    if resulting_datasets == 1:
+        imputed_dataset_names = [f"{df_name}_MICE"]
+    else:
+        imputed_dataset_names = [f"{df_name}_MICE_{i+1}" for i in range(resulting_datasets)]
+
+    metrics_path = make_fullpath(save_metrics_dir, make=True) if save_metrics_dir is not None else None
+
+    if n_workers is None:
+        n_workers = max(1, (os.cpu_count() or 1) // num_threads)
+    n_workers = max(1, min(n_workers, resulting_datasets))
+
+    tasks = [
+        # Distribution plots are named after the dataset, single datasets keep the name used by `run_mice_pipeline`
+        (df, name, name if resulting_datasets > 1 else df_name, seed, iterations, tolerance, patience, num_threads, metrics_path)
+        for name, seed in zip(imputed_dataset_names, dataset_seeds(random_state, resulting_datasets))
+    ]
+
+    _LOGGER.info(f"➡️ MICE imputation of {resulting_datasets} dataset(s) on {n_workers} worker(s) with {num_threads} thread(s) each...")
+
+    if n_workers == 1:
+        results = [_impute_dataset_star(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn")) as executor:
+            # map() preserves the dataset order
+            results = list(executor.map(_impute_dataset_star, tasks))
+
+    imputed_datasets = [imputed_df for imputed_df, _ in results]
+    iterations_run = [n for _, n in results]
+
+    if binary_columns is not None:
+        invalid_binary_columns = set(binary_columns) - set(df.columns)
+        if invalid_binary_columns:
+            _LOGGER.warning(f"These 'binary columns' are not in the dataset: {sorted(invalid_binary_columns)}")
+        valid_binary_columns = [col for col in binary_columns if col not in invalid_binary_columns]
+        for imputed_df in imputed_datasets:
+            for binary_column_name in valid_binary_columns:
+                imputed_df[binary_column_name] = threshold_binary_values(imputed_df[binary_column_name]) # type: ignore
+            # Imputed binaries go back to the compact uint8 layout
+            imputed_df[valid_binary_columns] = imputed_df[valid_binary_columns].astype(np.uint8)
+
+    for imputed_df, subname in zip(imputed_datasets, imputed_dataset_names):
+        if imputed_df.shape[0] != df.shape[0] or not all(imputed_df.index == df.index):
+            _LOGGER.error(f"Row mismatch between the input and the imputed dataset '{subname}'.")
+            raise ValueError()
+
+    for subname, n in zip(imputed_dataset_names, iterations_run):
+        _LOGGER.info(f"'{subname}' converged after {n} iteration(s).")
+
+    return imputed_datasets, imputed_dataset_names, iterations_run
+
+
+def run_parallel_mice_pipeline(df_path_or_dir: Union[str, Path],
+                               target_columns: list[str],
+                               save_datasets_dir: Union[str, Path],
+                               save_metrics_dir: Union[str, Path],
+                               binary_columns: Optional[list[str]] = None,
+                               resulting_datasets: int = 1,
+                               iterations: int = 20,
+                               random_state: int = 101,
+                               tolerance: float = 0.0,
+                               patience: int = 2,
+                               n_workers: Optional[int] = None,
+                               num_threads: int = 1,
+                               memory_report_file: Optional[Union[str, Path]] = None) -> pd.DataFrame:
+    """
+    Same steps and outputs as `run_mice_pipeline` (imputed datasets, convergence and distribution metrics)
+    using `parallel_mice`. Imputed datasets are saved in the file format of their input. Also saves the iterations run by each dataset as 'MICE_iterations.csv' in the metrics directory.
+
+    Binary columns are imputed as float32 and stored back as uint8. With a `memory_report_file`,
+    the memory of each imputed dataset is recorded with `record_memory`.
+
+    Returns:
+        pd.DataFrame: Dataset name and iterations run.
+    """
+    save_datasets_path = make_fullpath(save_datasets_dir, make=True)
+    save_metrics_path = make_fullpath(save_metrics_dir, make=True)
+
+    input_path = make_fullpath(df_path_or_dir)
+    if input_path.is_file():
+        all_file_paths = [input_path]
+    else:
+        all_file_paths = list(list_dataset_paths(input_path).values())
+
+    records = []
+    for df_path in all_file_paths:
+        df: pd.DataFrame
+        df, df_name = load_dataframe(df_path=df_path, kind="pandas") # type: ignore
+        df = compact_binaries(df)
+
+        valid_targets = [col for col in target_columns if col in df.columns]
+        df_targets = df[valid_targets]
+        df = df.drop(columns=valid_targets)
+
+        imputed_datasets, imputed_dataset_names, iterations_run = parallel_mice(df=df,
+                                                                                df_name=df_name,
+                                                                                binary_columns=binary_columns,
+                                                                                resulting_datasets=resulting_datasets,
+                                                                                iterations=iterations,
+                                                                                random_state=random_state,
+                                                                                tolerance=tolerance,
+                                                                                patience=patience,
+                                                                                n_workers=n_workers,
+                                                                                num_threads=num_threads,
+                                                                                save_metrics_dir=save_metrics_path)
+
+        for imputed_df, subname, n in zip(imputed_datasets, imputed_dataset_names, iterations_run):
+            merged_df = merge_dataframes(imputed_df, df_targets, direction="horizontal", verbose=False)
+            save_dataset(df=merged_df, save_dir=save_datasets_path, filename=subname + df_path.suffix, verbose=2)
+            records.append({"Dataset": subname, "Iterations": n})
+            if memory_report_file is not None:
+                record_memory(df=merged_df, stage=subname, report_file=memory_report_file)
+
+    report = pd.DataFrame(records)
+    save_dataframe_filename(df=report, save_dir=save_metrics_path, filename="MICE_iterations.csv")
+
+    return report
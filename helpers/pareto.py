@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Optional, Union
+
+from .storage import load_dataframe, save_dataframe
+from ml_tools._core import get_logger
+
+
+_LOGGER = get_logger("Pareto Archive")
+
+
+def to_maximization(objectives: np.ndarray, senses: list[str]) -> np.ndarray:
+    """
+    Returns a float64 copy of an (N, M) objectives array where every column is to be maximized.
+    Columns with sense 'min' are negated.
+    """
+    signs = np.array([1.0 if sense == "max" else -1.0 for sense in senses])
+    return np.asarray(objectives, dtype=np.float64) * signs
+
+
+def non_dominated_mask(objectives: np.ndarray, senses: list[str], chunk_size: int = 256) -> np.ndarray:
+    """
+    Returns a boolean mask of the rows of an (N, M) objectives array that are not dominated by any other row.
+
+    Up to 3 objectives use an O(N log N) sort-and-sweep; more objectives fall back to chunked pairwise comparison.
+    Identical rows do not dominate each other, so duplicates are all kept.
+    """
+    points = to_maximization(objectives, senses)
+    n_points, n_objectives = points.shape
+
+    if n_objectives <= 3:
+        # A constant padding column never changes dominance
+        padding = np.zeros((n_points, 3 - n_objectives))
+        return _sweep_mask_3d(np.hstack([points, padding]))
+
+    mask = np.ones(n_points, dtype=bool)
+
+    # Compare in row chunks to keep the (chunk, N, M) comparison tensor bounded
+    for start in range(0, n_points, chunk_size):
+        block = points[start:start + chunk_size]
+        greater_equal = (points[None, :, :] >= block[:, None, :]).all(axis=2)
+        strictly_greater = (points[None, :, :] > block[:, None, :]).any(axis=2)
+        mask[start:start + chunk_size] = ~(greater_equal & strictly_greater).any(axis=1)
+
+    return mask
+
+
+def dominated_by(points: np.ndarray, front: np.ndarray, chunk_size: int = 256) -> np.ndarray:
+    """
+    Returns a boolean mask of the rows of `points` dominated by at least one row of `front`.
+    Both are (N, M) and (K, M) arrays of objectives to be maximized (see `to_maximization`).
+    """
+    mask = np.zeros(len(points), dtype=bool)
+    if len(front) == 0:
+        return mask
+
+    for start in range(0, len(points), chunk_size):
+        block = points[start:start + chunk_size]
+        greater_equal = (front[None, :, :] >= block[:, None, :]).all(axis=2)
+        strictly_greater = (front[None, :, :] > block[:, None, :]).any(axis=2)
+        mask[start:start + chunk_size] = (greater_equal & strictly_greater).any(axis=1)
+
+    return mask
+
+
+def _sweep_mask_3d(points: np.ndarray) -> np.ndarray:
+    """
+    Non-dominated mask for 3 maximized objectives.
+
+    Points are visited in decreasing lexicographic order, so every earlier point is at least as good in the
+    first objective. A 2D staircase of the (second, third) objectives seen so far, kept as two sorted lists
+    (second ascending, third descending), answers "is there an earlier point at least as good in both" with a bisection.
+    """
+    n_points = points.shape[0]
+    order = np.lexsort((-points[:, 2], -points[:, 1], -points[:, 0]))
+    sorted_points = points[order]
+    mask = np.zeros(n_points, dtype=bool)
+
+    stair_y: list[float] = []
+    stair_z: list[float] = []
+
+    i = 0
+    while i < n_points:
+        # Identical points are judged together and never dominate each other
+        j = i + 1
+        while j < n_points and (sorted_points[j] == sorted_points[i]).all():
+            j += 1
+
+        _, y, z = sorted_points[i]
+        k = bisect_left(stair_y, y)
+
+        if k == len(stair_y) or stair_z[k] < z:
+            mask[order[i:j]] = True
+
+            # Drop staircase points now dominated in (y, z), then insert the new corner
+            right = bisect_right(stair_y, y)
+            left = right
+            while left > 0 and stair_z[left - 1] <= z:
+                left -= 1
+            stair_y[left:right] = [y]
+            stair_z[left:right] = [z]
+
+        i = j
+
+    return mask
+
+
+def hypervolume(objectives: np.ndarray, senses: list[str], reference: list[float]) -> float:
+    """
+    Exact hypervolume dominated by the rows of an (N, M) objectives array, for up to 3 objectives.
+
+    Rows that do not strictly improve on the reference point in every objective contribute nothing.
+    Runs in O(N log N) plus list insertions: the points are swept by decreasing first objective while
+    the dominated area of the (second, third) staircase is updated incrementally.
+
+    Args:
+        objectives (np.ndarray): Objective values.
+        senses (list[str]): 'min' or 'max' for each column.
+        reference (list[float]): Reference point, in the original objective units.
+    """
+    points = to_maximization(objectives, senses) - to_maximization(np.asarray([reference]), senses)
+    n_objectives = points.shape[1]
+    if n_objectives > 3:
+        _LOGGER.error(f"Exact hypervolume supports up to 3 objectives, got {n_objectives}.")
+        raise ValueError()
+
+    points = points[(points > 0).all(axis=1)]
+    # A unit padding column leaves the volume unchanged
+    points = np.hstack([points, np.ones((points.shape[0], 3 - n_objectives))])
+    points = points[np.argsort(-points[:, 0], kind="stable")]
+
+    # 2D staircase in (y ascending, z descending) and its dominated area
+    stair_y: list[float] = []
+    stair_z: list[float] = []
+    area = 0.0
+    volume = 0.0
+    previous_x = None
+
+    for x, y, z in points:
+        if previous_x is not None:
+            volume += area * (previous_x - x)
+        previous_x = x
+
+        k = bisect_left(stair_y, y)
+        height = stair_z[k] if k < len(stair_y) else 0.0
+        if height >= z:
+            continue
+
+        # Area gained on (y_{k-1}, y], then on every lower step the new point covers
+        left_y = stair_y[k - 1] if k > 0 else 0.0
+        area += (y - left_y) * (z - height)
+        right = k + 1 if k < len(stair_y) and stair_y[k] == y else k
+
+        j = k - 1
+        while j >= 0 and stair_z[j] < z:
+            step_left = stair_y[j - 1] if j > 0 else 0.0
+            area += (stair_y[j] - step_left) * (z - stair_z[j])
+            j -= 1
+
+        stair_y[j + 1:right] = [y]
+        stair_z[j + 1:right] = [z]
+
+    if previous_x is not None:
+        volume += area * previous_x
+
+    return float(volume)
+
+
+def crowding_distance(objectives: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance of each row of an (N, M) objectives array. Boundary points get infinity."""
+    n_points, n_objectives = objectives.shape
+    distance = np.zeros(n_points)
+    if n_points <= 2:
+        return np.full(n_points, np.inf)
+
+    for m in range(n_objectives):
+        order = np.argsort(objectives[:, m], kind="stable")
+        values = objectives[order, m]
+        span = values[-1] - values[0]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        if span > 0:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+
+    return distance
+
+
+def merge_fronts(fronts: list[pd.DataFrame], objectives: dict[str, str]) -> pd.DataFrame:
+    """
+    Concatenates several Pareto fronts and keeps only the globally non-dominated, unique rows.
+
+    Args:
+        fronts (list[pd.DataFrame]): Fronts with the same columns, in a deterministic order.
+        objectives (dict[str, str]): Mapping of target column to 'min' or 'max'.
+    """
+    merged = pd.concat(fronts, ignore_index=True).drop_duplicates(ignore_index=True)
+
+    target_columns = list(objectives.keys())
+    mask = non_dominated_mask(merged[target_columns].to_numpy(), list(objectives.values()))
+
+    return merged.loc[mask].reset_index(drop=True)
+
+
+class ParetoArchive:
+    """
+    Persistent archive of non-dominated solutions backed by a CSV file.
+
+    Every insertion rounds integer features, drops duplicate designs and removes dominated rows,
+    so the file only ever holds the current global front. An optional `max_size` caps the archive
+    by discarding the most crowded solutions.
+    """
+    def __init__(self,
+                 file_path: Union[str, Path],
+                 objectives: dict[str, str],
+                 integer_columns: Optional[list[str]] = None,
+                 float_precision: int = 4,
+                 max_size: Optional[int] = None):
+        """
+        Args:
+            file_path (str | Path): CSV, Parquet or Arrow file of the archive. Loaded (and cleaned) if it exists.
+            objectives (dict[str, str]): Mapping of target column to 'min' or 'max'.
+            integer_columns (list[str] | None): Continuous features rounded to integers before de-duplication.
+            float_precision (int): Decimal places kept for the remaining float columns.
+            max_size (int | None): Maximum number of archived solutions. None keeps the whole front.
+        """
+        self.file_path = Path(file_path)
+        self.objectives = objectives
+        self.integer_columns = integer_columns or []
+        self.float_precision = float_precision
+        self.max_size = max_size
+
+        self.solutions = pd.DataFrame()
+        if self.file_path.exists():
+            loaded, _ = load_dataframe(df_path=self.file_path, kind="pandas", verbose=False)
+            self.add(loaded)
+            _LOGGER.info(f"Loaded archive '{self.file_path.name}' with {len(self.solutions)} non-dominated solutions.")
+
+    def __len__(self) -> int:
+        return len(self.solutions)
+
+    def _round(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        for col in self.integer_columns:
+            df[col] = df[col].round().astype(int)
+        float_cols = df.select_dtypes(include=['float']).columns
+        df[float_cols] = df[float_cols].round(self.float_precision)
+        return df
+
+    def add(self, front: pd.DataFrame) -> int:
+        """
+        Inserts a batch of solutions and keeps only the non-dominated, unique ones.
+
+        Returns:
+            int: Number of inserted solutions that survived in the archive.
+        """
+        if front.empty:
+            return 0
+
+        candidates = self._round(front)
+        candidates["_new"] = True
+
+        combined = pd.concat([self.solutions.assign(_new=False), candidates], ignore_index=True)
+        # Existing rows come first, so an already archived design wins over its duplicate
+        feature_columns = [col for col in combined.columns if col not in self.objectives and col != "_new"]
+        combined = combined.drop_duplicates(subset=feature_columns, ignore_index=True)
+
+        target_columns = list(self.objectives.keys())
+        mask = non_dominated_mask(combined[target_columns].to_numpy(), list(self.objectives.values()))
+        combined = combined.loc[mask].reset_index(drop=True)
+
+        if self.max_size is not None and len(combined) > self.max_size:
+            points = to_maximization(combined[target_columns].to_numpy(), list(self.objectives.values()))
+            keep = np.sort(np.argsort(-crowding_distance(points), kind="stable")[:self.max_size])
+            combined = combined.iloc[keep].reset_index(drop=True)
+
+        inserted = int(combined["_new"].sum())
+        self.solutions = combined.drop(columns="_new")
+
+        return inserted
+
+    def save(self) -> None:
+        """Writes the archive, replacing the previous file."""
+        save_dataframe(df=self.solutions, full_path=self.file_path, verbose=1)
+        _LOGGER.info(f"💾 Pareto archive saved to '{self.file_path.name}'. Shape: {self.solutions.shape}")
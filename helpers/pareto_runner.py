@@ -0,0 +1,257 @@
+import os
+import random
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+import pandas as pd
+import torch
+
+from ml_tools.ML_optimization import DragonParetoOptimizer
+from ml_tools.ML_configuration import DragonParetoConfig
+from ml_tools.schema import FeatureSchema
+from ml_tools._core import get_logger
+
+from .balance import ChargeBalancer
+from .convergence import HypervolumeEarlyStopping, evolve
+from .inference import load_inference_handler
+from .pareto import merge_fronts
+from .profiling import profiled, start_worker_trace, trace_settings
+from .storage import save_dataframe_filename
+from .surrogate_cache import CachedInferenceHandler
+from .telemetry import GenerationTelemetry
+from .warm_start import warm_start
+
+if TYPE_CHECKING:
+    from .screening import TreeScreen
+
+
+_LOGGER = get_logger("Pareto Runner")
+
+
+# Per-process state, populated once by the pool initializer
+_WORKER: dict = {}
+
+
+def _init_worker(config: DragonParetoConfig,
+                 schema: FeatureSchema,
+                 architecture_path: Path,
+                 weights_path: Path,
+                 scaler_path: Optional[Path],
+                 num_threads: int,
+                 cache_size: int,
+                 charge_balance: bool,
+                 archive_solutions: Optional[pd.DataFrame],
+                 warm_start_fraction: float,
+                 hv_reference: Optional[list[float]],
+                 hv_tolerance: float,
+                 hv_window: int,
+                 telemetry_dir: Optional[Path],
+                 screen: Optional["TreeScreen"],
+                 screening_margin: float,
+                 screening_audit: float) -> None:
+    """Loads the inference model once per worker process, behind a prediction cache shared by all its seeds."""
+    inference_handler = load_inference_handler(architecture_path=architecture_path,
+                                               weights_path=weights_path,
+                                               scaler_path=scaler_path,
+                                               device="cpu",
+                                               num_threads=num_threads)
+
+    # Fraction_O is derived from the cations before every evaluation
+    balancer = ChargeBalancer(feature_names=list(schema.feature_names)) if charge_balance else None
+
+    integer_indices = [schema.feature_names.index(col) for col in (config.columns_to_round or [])]
+    inference_handler = CachedInferenceHandler(inference_handler=inference_handler,
+                                               integer_indices=integer_indices,
+                                               canonicalize=balancer,
+                                               max_size=cache_size)
+
+    # Only candidates the tree screen cannot rule out reach the cached model
+    if screen is not None:
+        from .screening import ScreenedInferenceHandler
+        inference_handler = ScreenedInferenceHandler(inference_handler=inference_handler,
+                                                     screen=screen,
+                                                     objectives=config.target_objectives,
+                                                     margin=screening_margin,
+                                                     audit_rate=screening_audit)
+
+    _WORKER.update(config=config, schema=schema, inference_handler=inference_handler, balancer=balancer,
+                   archive_solutions=archive_solutions, warm_start_fraction=warm_start_fraction,
+                   hv_reference=hv_reference, hv_tolerance=hv_tolerance, hv_window=hv_window,
+                   telemetry_dir=telemetry_dir)
+
+
+def _init_pool_worker(trace: Optional[tuple[str, str, str]], *init_args) -> None:
+    """`_init_worker` of a pool process, continuing the parent's profiling trace (if any) so its steps are recorded."""
+    start_worker_trace(trace)
+    _init_worker(*init_args)
+
+
+@profiled(name="pareto seed")
+def _run_seed(seed: int) -> tuple[pd.DataFrame, dict]:
+    """Runs one seeded optimization in the current worker and returns its Pareto front and inference stats."""
+    # The GA draws from the global generators, seeding them makes each run reproducible
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    random.seed(seed)
+
+    inference_handler = _WORKER["inference_handler"]
+    # The cache is kept across seeds: predictions do not depend on the batch they were computed in, so a seed's
+    # front does not depend on the seeds its worker ran before
+    inference_handler.reset_stats()
+
+    optimizer = DragonParetoOptimizer(inference_handler=inference_handler,
+                                      schema=_WORKER["schema"],
+                                      config=_WORKER["config"])
+
+    warm_start(optimizer, _WORKER["archive_solutions"], _WORKER["warm_start_fraction"], seed)
+
+    telemetry = None
+    if _WORKER["hv_reference"] is not None and _WORKER["telemetry_dir"] is not None:
+        telemetry = GenerationTelemetry(optimizer,
+                                        reference=_WORKER["hv_reference"],
+                                        log_file=Path(_WORKER["telemetry_dir"]) / f"seed_{seed}.jsonl",
+                                        inference_handler=inference_handler,
+                                        run_id=seed)
+        optimizer.algorithm.after_step_hook.append(telemetry)
+
+    try:
+        if _WORKER["hv_reference"] is not None and _WORKER["hv_tolerance"] > 0:
+            stopping = HypervolumeEarlyStopping(optimizer,
+                                                reference=_WORKER["hv_reference"],
+                                                tolerance=_WORKER["hv_tolerance"],
+                                                window=_WORKER["hv_window"])
+            front, generations = evolve(optimizer, stopping)
+        else:
+            front = optimizer.run(plots_and_log=False)
+            generations = optimizer.config.generations
+    finally:
+        if telemetry is not None:
+            telemetry.close()
+    inference_handler.log_stats(label=f"Seed {seed} ({generations} generations)")
+    stats = {"Seed": seed, "Generations": generations, **inference_handler.stats()}
+
+    # Screened-out front rows carry tree estimates, the returned targets are surrogate predictions
+    if hasattr(inference_handler, "surrogate_front"):
+        front = inference_handler.surrogate_front(front, _WORKER["schema"])
+
+    # Store the composition that was actually evaluated
+    if _WORKER["balancer"] is not None:
+        front = _WORKER["balancer"].balance_dataframe(front, inplace=True)
+
+    return front, stats
+
+
+def run_pareto_seeds(seeds: list[int],
+                     config: DragonParetoConfig,
+                     schema: FeatureSchema,
+                     architecture_path: Path,
+                     weights_path: Path,
+                     scaler_path: Optional[Path] = None,
+                     num_threads: int = 1,
+                     n_workers: Optional[int] = None,
+                     cache_size: int = 200_000,
+                     charge_balance: bool = False,
+                     archive_solutions: Optional[pd.DataFrame] = None,
+                     warm_start_fraction: float = 0.0,
+                     hv_reference: Optional[list[float]] = None,
+                     hv_tolerance: float = 0.0,
+                     hv_window: int = 50,
+                     telemetry_dir: Optional[Path] = None,
+                     screen: Optional["TreeScreen"] = None,
+                     screening_margin: float = 2.0,
+                     screening_audit: float = 0.0,
+                     stats_file: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Runs one independent Pareto optimization per seed across a process pool and merges
+    the resulting fronts into a single global non-dominated set.
+
+    Each worker loads the model once behind a prediction cache shared by its seeds, and runs on CPU with the same
+    fixed `num_threads`, so the result is deterministic for a given seed list and thread count, whatever the number
+    of workers or the machine.
+
+    Args:
+        seeds (list[int]): One optimization run per seed.
+        config (DragonParetoConfig): Shared optimizer configuration.
+        schema (FeatureSchema): Feature schema of the trained model.
+        architecture_path (Path): Model architecture JSON.
+        weights_path (Path): Model weights file.
+        scaler_path (Path | None): Scaler file.
+        num_threads (int): Intra-op threads of the model in every worker, part of the reproducible setup with the seeds.
+        n_workers (int | None): Number of worker processes, 1 runs every seed in the current process.
+            None uses `cpu_count // num_threads`.
+        cache_size (int): Maximum cached predictions per worker.
+        charge_balance (bool): Derive Fraction_O from the cation fractions before each evaluation and in the returned fronts.
+            Pair with a collapsed Fraction_O bound (`helpers.balance.collapse_oxygen_bound`).
+        archive_solutions (pd.DataFrame | None): Archived non-dominated solutions used to warm-start every run.
+        warm_start_fraction (float): Share of each initial population sampled (per seed) from `archive_solutions`.
+        hv_reference (list[float] | None): Hypervolume reference point of the early stopping, in objective order.
+        hv_tolerance (float): Relative hypervolume gain over `hv_window` generations below which a run stops. 0 runs every generation.
+        hv_window (int): Generations the hypervolume gain is measured over.
+        telemetry_dir (Path | None): Directory of the per-generation telemetry logs (`seed_<seed>.jsonl`, see
+            `helpers.telemetry`). Needs `hv_reference`. None records nothing.
+        screen (TreeScreen | None): Tree-ensemble approximation screening the candidates before the model (see `helpers.screening`).
+        screening_margin (float): Screening margin in residual standard deviations of `screen`.
+        screening_audit (float): Share of the screened-out candidates still checked against the model.
+        stats_file (Path | None): CSV of the per-seed inference stats (cache, screening), e.g. for `screening_report`.
+
+    Returns:
+        pd.DataFrame: The merged non-dominated solutions.
+    """
+    if n_workers is None:
+        n_workers = (os.cpu_count() or 1) // num_threads
+    n_workers = max(1, min(n_workers, len(seeds)))
+    init_args = (config, schema, architecture_path, weights_path, scaler_path, num_threads, cache_size, charge_balance,
+                 archive_solutions, warm_start_fraction, hv_reference, hv_tolerance, hv_window, telemetry_dir,
+                 screen, screening_margin, screening_audit)
+
+    _LOGGER.info(f"Running {len(seeds)} seeded optimizations on {n_workers} worker(s) with {num_threads} thread(s) each.")
+
+    if n_workers == 1:
+        _init_worker(*init_args)
+        results = [_run_seed(seed) for seed in seeds]
+    else:
+        # 'spawn' avoids inheriting torch thread pools from the parent process
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=mp.get_context("spawn"),
+                                 initializer=_init_pool_worker,
+                                 initargs=(trace_settings(), *init_args)) as executor:
+            # map() preserves the seed order, keeping the merge deterministic
+            results = list(executor.map(_run_seed, seeds))
+
+    fronts = [front for front, _ in results]
+    if stats_file is not None:
+        save_dataframe_filename(df=pd.DataFrame([stats for _, stats in results]), save_dir=stats_file.parent, filename=stats_file.name)
+
+    merged_front = merge_fronts(fronts, config.target_objectives)
+    _LOGGER.info(f"Merged {sum(len(front) for front in fronts)} solutions into {len(merged_front)} non-dominated solutions.")
+
+    return merged_front
+
+
+def benchmark_workers(worker_counts: list[int], seeds: list[int], **run_kwargs) -> pd.DataFrame:
+    """
+    Times `run_pareto_seeds` for each worker count and reports the wall-clock speedup
+    relative to the first entry of `worker_counts`.
+
+    Args:
+        worker_counts (list[int]): Worker counts to try, e.g. [1, 2, 4, 8].
+        seeds (list[int]): Seeds used for every measurement.
+        **run_kwargs: Remaining arguments of `run_pareto_seeds`.
+    """
+    records = []
+    for n_workers in worker_counts:
+        start = time.perf_counter()
+        front = run_pareto_seeds(seeds=seeds, n_workers=n_workers, **run_kwargs)
+        elapsed = time.perf_counter() - start
+        records.append({"Workers": n_workers, "Seeds": len(seeds), "Wall Time(s)": elapsed, "Front Size": len(front)})
+
+    report = pd.DataFrame(records)
+    report["Speedup"] = report["Wall Time(s)"].iloc[0] / report["Wall Time(s)"]
+
+    _LOGGER.info(f"Pareto worker benchmark:\n{report.to_string(index=False)}")
+
+    return report
@@ -0,0 +1,265 @@
+import cProfile
+import datetime
+import json
+import multiprocessing as mp
+import os
+import pstats
+import resource
+import time
+from collections import defaultdict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import pandas as pd
+import polars as pl
+
+from ml_tools._core import get_logger
+
+
+_LOGGER = get_logger("Profiling")
+
+
+# "1" writes the trace, "cprofile" also dumps the cProfile stats of the step with the longest own time. Unset or "0" is off.
+ENV_VARIABLE = "PIPELINE_PROFILE"
+
+PROFILE_MODE = os.environ.get(ENV_VARIABLE, "0").strip().lower()
+# Read once at import: with profiling off, `profiled` returns the function itself and nothing is wrapped
+ENABLED = PROFILE_MODE not in ("", "0", "false", "off")
+DUMP = ENABLED and PROFILE_MODE == "cprofile"
+
+# State of the trace of the current process, empty when no trace is open
+_TRACE: dict = {}
+
+
+class _Span:
+    """Open step: start counters, time and peak memory of its nested steps, and its profiler."""
+    def __init__(self, name: str):
+        self.name = name
+        self.start_wall = time.perf_counter()
+        self.start_cpu = _cpu_seconds()
+        self.child_wall = 0.0
+        self.peak = 0.0
+        self.profile: Optional[cProfile.Profile] = None
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _reset_peak_rss() -> None:
+    # Linux only: sets the high-water mark (VmHWM) back to the current RSS
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak of the whole process (kilobytes on Linux)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _shape(obj: Any) -> tuple[Optional[int], Optional[int]]:
+    if isinstance(obj, (pd.DataFrame, pl.DataFrame)):
+        return obj.shape
+    if isinstance(obj, (pd.Series, pl.Series)):
+        return len(obj), 1
+    # Arrays and tensors
+    shape = getattr(obj, "shape", None)
+    if isinstance(shape, tuple) or type(shape).__name__ == "Size":
+        if len(shape) == 2:
+            return int(shape[0]), int(shape[1])
+    return None, None
+
+
+def _input_frame(args: tuple, kwargs: dict) -> Any:
+    """First DataFrame, Series or 2D array among the arguments of a call, if any."""
+    for value in (*args, *kwargs.values()):
+        if _shape(value) != (None, None):
+            return value
+    return None
+
+
+def _enter(name: str) -> _Span:
+    stack: list[_Span] = _TRACE["stack"]
+    if stack:
+        parent = stack[-1]
+        # Keep the parent's peak so far, the counter is reset for the nested step
+        parent.peak = max(parent.peak, _peak_rss_mb())
+        if parent.profile is not None:
+            parent.profile.disable()
+    _reset_peak_rss()
+
+    span = _Span(name)
+    if DUMP:
+        # One profiler per step name, paused while nested steps run, so it only holds the step's own time
+        span.profile = _TRACE["profiles"].setdefault(name, cProfile.Profile())
+        span.profile.enable()
+    stack.append(span)
+    return span
+
+
+def _exit(span: _Span, data_in: Any, data_out: Any, status: str) -> None:
+    if span.profile is not None:
+        span.profile.disable()
+    wall = time.perf_counter() - span.start_wall
+    cpu = _cpu_seconds() - span.start_cpu
+    peak = max(span.peak, _peak_rss_mb())
+
+    stack: list[_Span] = _TRACE["stack"]
+    stack.pop()
+    if stack:
+        parent = stack[-1]
+        parent.child_wall += wall
+        parent.peak = max(parent.peak, peak)
+        if parent.profile is not None:
+            parent.profile.enable()
+
+    self_wall = wall - span.child_wall
+    _TRACE["self_seconds"][span.name] += self_wall
+
+    rows_in, columns_in = _shape(data_in)
+    rows_out, columns_out = _shape(data_out)
+    record = {
+        "Run": _TRACE["run"],
+        "Stage": _TRACE["stage"],
+        "Step": span.name,
+        "Depth": len(stack),
+        "Status": status,
+        "Wall(s)": wall,
+        "Self(s)": self_wall,
+        "CPU(s)": cpu,
+        "Peak RSS(MB)": peak,
+        "Rows In": rows_in,
+        "Columns In": columns_in,
+        "Rows Out": rows_out,
+        "Columns Out": columns_out,
+    }
+    _TRACE["file"].write(json.dumps(record) + "\n")
+    _TRACE["file"].flush()
+
+
+def profiled(fn: Optional[Callable] = None, *, name: Optional[str] = None) -> Callable:
+    """
+    Records every call of `fn` as a step of the open trace: wall time, own time (without nested steps), CPU time
+    (including waited-for worker processes), peak RSS and the shape of the first DataFrame argument and of the result.
+
+    Returns `fn` unchanged when profiling is off. Usable as `@profiled`, `@profiled(name=...)` or `profiled(fn)`.
+    """
+    if fn is None:
+        return lambda f: profiled(f, name=name)
+    if not ENABLED:
+        return fn
+
+    step_name = name or getattr(fn, "__name__", type(fn).__name__)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _TRACE:
+            return fn(*args, **kwargs)
+        span = _enter(step_name)
+        result, status = None, "failed"
+        try:
+            result = fn(*args, **kwargs)
+            status = "ok"
+            return result
+        finally:
+            _exit(span, _input_frame(args, kwargs), result, status)
+
+    return wrapper
+
+
+def start_trace(stage: str, trace_file: Union[str, Path], dump_dir: Optional[Union[str, Path]] = None) -> None:
+    """
+    Opens the trace of a stage: `profiled` steps append one JSON line each to `trace_file`. No-op with profiling off.
+
+    Args:
+        stage (str): Stage name written on every line.
+        trace_file (str | Path): JSONL trace, appended to.
+        dump_dir (str | Path | None): Directory of the cProfile dump. None uses the directory of the trace.
+    """
+    if not ENABLED:
+        return
+    trace_file = Path(trace_file)
+    trace_file.parent.mkdir(parents=True, exist_ok=True)
+    _TRACE.update(stage=stage,
+                  run=datetime.datetime.now().isoformat(timespec="seconds"),
+                  trace_file=trace_file,
+                  file=open(trace_file, "a"),
+                  dump_dir=Path(dump_dir) if dump_dir is not None else trace_file.parent,
+                  stack=[],
+                  profiles={},
+                  self_seconds=defaultdict(float))
+    _LOGGER.info(f"Profiling '{stage}' into '{trace_file.name}'.")
+
+
+def stop_trace() -> None:
+    """Closes the trace, logs the steps with the longest own time and writes the cProfile dump of the first one."""
+    if not _TRACE:
+        return
+    try:
+        _TRACE["file"].close()
+        ranking = sorted(_TRACE["self_seconds"].items(), key=lambda item: item[1], reverse=True)
+        if ranking:
+            lines = "\n".join(f"  {seconds:10.2f}s  {name}" for name, seconds in ranking[:10])
+            _LOGGER.info(f"Own time of the slowest steps of '{_TRACE['stage']}':\n{lines}")
+
+        if DUMP and ranking:
+            slowest = ranking[0][0]
+            stem = "".join(c if c.isalnum() else "_" for c in f"{_TRACE['stage']}_{slowest}")
+            dump_file = _TRACE["dump_dir"] / f"{stem}.prof"
+            dump_file.parent.mkdir(parents=True, exist_ok=True)
+            stats = pstats.Stats(_TRACE["profiles"][slowest])
+            stats.dump_stats(dump_file)
+            with open(dump_file.with_suffix(".txt"), "w") as f:
+                pstats.Stats(_TRACE["profiles"][slowest], stream=f).sort_stats("cumulative").print_stats(40)
+            _LOGGER.info(f"cProfile stats of '{slowest}' saved to '{dump_file.name}' (open with pstats or snakeviz).")
+    finally:
+        _TRACE.clear()
+
+
+def trace_settings() -> Optional[tuple[str, str, str]]:
+    """(stage, trace file, dump directory) of the open trace, to continue it in worker processes. None when no trace is open."""
+    if not _TRACE:
+        return None
+    return _TRACE["stage"], str(_TRACE["trace_file"]), str(_TRACE["dump_dir"])
+
+
+def start_worker_trace(settings: Optional[tuple[str, str, str]]) -> None:
+    """
+    Opens the trace of a pool worker process from the `trace_settings` of its parent, as stage '<stage> (worker <pid>)'.
+    Its lines are appended to the parent's trace file. The trace is closed when the worker exits.
+    """
+    if settings is None or not ENABLED:
+        return
+    stage, trace_file, dump_dir = settings
+    start_trace(f"{stage} (worker {os.getpid()})", trace_file, dump_dir)
+    # Pool workers are never stopped by the caller's code, the multiprocessing exit handlers close the trace
+    mp.util.Finalize(None, stop_trace, exitpriority=0)
+
+
+def run_stage(fn: Callable, stage: str, trace_file: Union[str, Path], dump_dir: Optional[Union[str, Path]] = None):
+    """Calls a stage entry point, traced as the outermost step of `stage` when profiling is on."""
+    if not ENABLED:
+        return fn()
+    start_trace(stage, trace_file, dump_dir)
+    try:
+        return profiled(fn, name=stage)()
+    finally:
+        stop_trace()
+
+
+def load_trace(trace_file: Union[str, Path]) -> pd.DataFrame:
+    """Every step of a JSONL trace."""
+    return pd.read_json(trace_file, lines=True)
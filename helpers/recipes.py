@@ -0,0 +1,227 @@
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from ml_tools.schema import FeatureSchema
+from ml_tools._core import get_logger
+
+from .storage import is_columnar
+
+
+_LOGGER = get_logger("Recipe Decoder")
+
+
+# Order of the elements in the composition string, oxygen last
+COMPOSITION_ORDER = ['Li', 'Mn', 'Ni', 'Co', 'Mg', 'Al', 'Ti', 'Sr', 'Nb', 'Mo', 'Sb', 'Ta', 'W', 'O']
+
+FRACTION_PREFIX = 'Fraction_'
+
+
+def _format_amount(symbol: str, amount: float, decimals: int) -> str:
+    """'Mn0.54', 'O2' or 'Li' (amount 1), empty for missing or non-positive amounts."""
+    if not np.isfinite(amount) or amount <= 0:
+        return ""
+    text = f"{amount:.{decimals}f}".rstrip("0").rstrip(".")
+    return symbol if text == "1" else f"{symbol}{text}"
+
+
+class RecipeDecoder:
+    """
+    Turns optimization solutions (one row per design, encoded or already labelled categoricals) into readable
+    synthesis recipes: a composition string built from the `Fraction_<Element>` features, one list per multibinary
+    group (e.g. the dopants) and the label of every other categorical feature.
+
+    Every lookup is precomputed from the schema, so decoding N rows is a handful of array gathers. Distinct
+    amounts and distinct multibinary combinations are formatted once per chunk.
+    """
+    def __init__(self,
+                 schema: FeatureSchema,
+                 multibinary_groups: Optional[dict[str, list[str]]] = None,
+                 integer_columns: Optional[list[str]] = None,
+                 pos_label: str = "Yes",
+                 empty_label: str = "None",
+                 list_separator: str = ", ",
+                 decimals: int = 4,
+                 keep_fractions: bool = False):
+        """
+        Args:
+            schema (FeatureSchema): Schema of the optimized model.
+            multibinary_groups (dict[str, list[str]] | None): Group name to its columns, as made by `make_multibinary_groups`.
+            integer_columns (list[str] | None): Continuous features written as integers.
+            pos_label (str): Label of the multibinary columns marking a group member.
+            empty_label (str): Value of a group list without members.
+            list_separator (str): Separator of the group lists.
+            decimals (int): Maximum decimal places of the composition amounts.
+            keep_fractions (bool): Keep the `Fraction_<Element>` columns next to the composition string.
+        """
+        self.schema = schema
+        self.integer_columns = [col for col in (integer_columns or []) if col in schema.feature_names]
+        self.pos_label = pos_label
+        self.empty_label = empty_label
+        self.list_separator = list_separator
+        self.decimals = decimals
+        self.keep_fractions = keep_fractions
+
+        mappings = schema.categorical_mappings or {}
+
+        # Composition: fraction columns in COMPOSITION_ORDER, unknown elements after them in schema order
+        fraction_columns = [col for col in schema.feature_names if col.startswith(FRACTION_PREFIX)]
+        rank = {symbol: i for i, symbol in enumerate(COMPOSITION_ORDER)}
+        self.fraction_columns = sorted(fraction_columns, key=lambda col: rank.get(col[len(FRACTION_PREFIX):], len(rank)))
+        self.symbols = [col[len(FRACTION_PREFIX):] for col in self.fraction_columns]
+
+        # Multibinary groups: member names and the encoded value of a member
+        self.groups: dict[str, tuple[list[str], list[str], np.ndarray]] = {}
+        for group, columns in (multibinary_groups or {}).items():
+            members = [col[len(group) + 1:] if col.startswith(f"{group}_") else col for col in columns]
+            pos_codes = np.array([mappings[col].get(pos_label, -1) if col in mappings else 1 for col in columns], dtype=np.float64)
+            self.groups[group] = (list(columns), members, pos_codes)
+        grouped = {col for columns, _, _ in self.groups.values() for col in columns}
+
+        # Other categoricals: label of each code, the trailing NaN catches unknown codes
+        self.lookups: dict[str, np.ndarray] = {}
+        for col in schema.categorical_feature_names:
+            if col in grouped or col not in mappings:
+                continue
+            lookup = np.full(max(mappings[col].values()) + 2, np.nan, dtype=object)
+            for label, code in mappings[col].items():
+                lookup[code] = label
+            self.lookups[col] = lookup
+
+        self.decoded_features = set(self.fraction_columns) | grouped | set(self.lookups)
+
+    def _composition(self, df: pd.DataFrame) -> np.ndarray:
+        composition = np.full(len(df), "", dtype=object)
+        block = df[self.fraction_columns].to_numpy(dtype=np.float64)
+        for j, symbol in enumerate(self.symbols):
+            amounts, inverse = np.unique(np.round(block[:, j], self.decimals), return_inverse=True)
+            labels = np.array([_format_amount(symbol, amount, self.decimals) for amount in amounts], dtype=object)
+            composition = composition + labels[inverse.reshape(-1)]
+        return composition
+
+    def _is_member(self, values: pd.Series, pos_code: float) -> np.ndarray:
+        if pd.api.types.is_numeric_dtype(values):
+            return values.to_numpy(dtype=np.float64) == pos_code
+        return values.to_numpy(dtype=object) == self.pos_label
+
+    def _group_list(self, df: pd.DataFrame, group: str) -> np.ndarray:
+        columns, members, pos_codes = self.groups[group]
+        if not columns:
+            return np.full(len(df), self.empty_label, dtype=object)
+        block = np.column_stack([self._is_member(df[col], code) for col, code in zip(columns, pos_codes)])
+
+        # Rows as bit keys, each distinct combination of members is joined once
+        packed = np.ascontiguousarray(np.packbits(block, axis=1))
+        keys = packed.view(np.dtype((np.void, packed.shape[1]))).reshape(-1)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        combinations = np.unpackbits(unique_keys.view(np.uint8).reshape(len(unique_keys), -1), axis=1, count=len(columns)).astype(bool)
+
+        member_names = np.array(members, dtype=object)
+        labels = np.array([self.list_separator.join(member_names[row]) or self.empty_label for row in combinations], dtype=object)
+        return labels[inverse.reshape(-1)]
+
+    def _categorical(self, values: pd.Series, lookup: np.ndarray) -> np.ndarray:
+        if not pd.api.types.is_numeric_dtype(values):
+            # Already labelled (e.g. a library Pareto front)
+            return values.to_numpy(dtype=object)
+        codes = values.to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            valid = (codes == np.round(codes)) & (codes >= 0) & (codes < len(lookup) - 1)
+        return lookup[np.where(valid, codes, len(lookup) - 1).astype(np.int64)]
+
+    def decode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Readable recipes of a solutions frame: 'Composition', one column per multibinary group, the other features
+        in schema order (categoricals as labels) and then every non-feature column (e.g. the targets).
+        """
+        missing = [col for col in self.schema.feature_names if col not in df.columns]
+        if missing:
+            _LOGGER.error(f"Solutions are missing schema features: {missing}")
+            raise ValueError()
+
+        recipes: dict[str, Union[np.ndarray, pd.arrays.IntegerArray]] = {}
+        if self.fraction_columns:
+            recipes["Composition"] = self._composition(df)
+        for group in self.groups:
+            recipes[group] = self._group_list(df, group)
+        for col in self.schema.feature_names:
+            if col in self.lookups:
+                recipes[col] = self._categorical(df[col], self.lookups[col])
+            elif col not in self.decoded_features or (self.keep_fractions and col in self.fraction_columns):
+                values = df[col].to_numpy()
+                recipes[col] = self._integers(values) if col in self.integer_columns else values
+        for col in df.columns:
+            if col not in self.schema.feature_names:
+                recipes[col] = df[col].to_numpy()
+
+        return pd.DataFrame(recipes, index=df.index)
+
+    __call__ = decode
+
+    @staticmethod
+    def _integers(values: np.ndarray) -> Union[np.ndarray, pd.arrays.IntegerArray]:
+        """Rounded integer values, nullable (Int64) if any is missing instead of cast to the int64 minimum."""
+        rounded = np.round(values.astype(np.float64))
+        missing = np.isnan(rounded)
+        if missing.any():
+            return pd.arrays.IntegerArray(np.where(missing, 0, rounded).astype(np.int64), missing)
+        return rounded.astype(np.int64)
+
+
+def iter_dataframe_chunks(input_path: Union[str, Path], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yields a CSV, Parquet or Arrow IPC file as pandas DataFrames of at most `chunk_size` rows."""
+    input_path = Path(input_path)
+    if input_path.suffix == ".parquet":
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif is_columnar(input_path):
+        with pa.memory_map(str(input_path), "r") as source:
+            for batch in ipc.open_file(source).read_all().to_batches(max_chunksize=chunk_size):
+                yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+
+def stream_decode_solutions(decoder: RecipeDecoder,
+                            input_path: Union[str, Path],
+                            output_path: Union[str, Path],
+                            chunk_size: int = 100_000) -> int:
+    """
+    Decodes a solutions file chunk by chunk into readable recipes, appending every chunk to the output
+    (CSV, or Parquet/Arrow IPC by suffix). Peak memory depends on `chunk_size`, not on the archive size.
+
+    Returns:
+        int: Number of decoded solutions.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    n_rows = 0
+    schema: Optional[pa.Schema] = None
+    writer = None
+    with open(output_path, "wb") as f:
+        for chunk in iter_dataframe_chunks(input_path, chunk_size):
+            table = pa.Table.from_pandas(decoder(chunk), preserve_index=False)
+            if schema is None:
+                # Later chunks take the column types of the first one, all-missing columns are typed as labels
+                schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema])
+                if output_path.suffix == ".parquet":
+                    writer = pq.ParquetWriter(f, schema)
+                elif is_columnar(output_path):
+                    writer = ipc.new_file(f, schema)
+                else:
+                    writer = pa_csv.CSVWriter(f, schema)
+            writer.write_table(table.cast(schema)) # type: ignore
+            n_rows += table.num_rows
+
+        if writer is not None:
+            writer.close()
+
+    _LOGGER.info(f"Decoded {n_rows} solutions into '{output_path.name}'.")
+    return n_rows
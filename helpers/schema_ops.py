@@ -0,0 +1,235 @@
+import re
+from typing import Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_object_dtype
+
+from ml_tools.schema import FeatureSchema
+from ml_tools._core import get_logger
+
+
+_LOGGER = get_logger("Schema Ops")
+
+
+def _decode_block(block: pd.DataFrame, labels: np.ndarray, mapping: dict) -> pd.DataFrame:
+    """
+    Decodes a numeric block of codes with one gather of `labels[code]` over the whole block. Missing, non-integer
+    or out-of-range codes give NaN and each column gets the dtype `Series.map(mapping)` would give it.
+    """
+    codes = block.to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        valid = (codes == np.round(codes)) & (codes >= 0) & (codes < len(labels))
+    # Invalid codes point to the trailing NaN of the lookup
+    positions = np.where(valid, codes, len(labels)).astype(np.int64)
+    lookup = pd.Series(np.append(labels, np.nan)).array
+
+    decoded = {}
+    for j, col in enumerate(block.columns):
+        if valid[:, j].any():
+            decoded[col] = pd.Series(lookup.take(positions[:, j]), index=block.index)
+        else:
+            # Nothing to decode, the dtype of an all-NaN column is left to pandas
+            decoded[col] = block[col].map(mapping)
+    return pd.DataFrame(decoded, index=block.index)
+
+
+def reconstruct_one_hot(df: pd.DataFrame,
+                        features_to_reconstruct: list[Union[str, tuple[str, Optional[str]]]],
+                        separator: str = '_',
+                        baseline_category_name: Optional[str] = "Other",
+                        drop_original: bool = True,
+                        verbose: bool = True) -> pd.DataFrame:
+    """
+    Same output as `ml_tools.data_exploration.reconstruct_one_hot`, with one argmax over each group of columns.
+    Rows with several maxima take the first column, rows whose group sums to 0 take the baseline category.
+    """
+    new_df = df.copy()
+    columns_to_drop: list[str] = []
+
+    config: dict[str, Optional[str]] = {}
+    for item in features_to_reconstruct:
+        if isinstance(item, str):
+            config[item] = baseline_category_name
+        elif isinstance(item, tuple) and len(item) == 2:
+            config[item[0]] = item[1]
+        else:
+            _LOGGER.error(f"Invalid item '{item}'. Must be str or (str, str|None) tuple.")
+            raise ValueError()
+
+    for base_name, baseline_category in config.items():
+        pattern = re.compile(f"^{re.escape(base_name)}{re.escape(separator)}")
+        ohe_cols = [col for col in df.columns if pattern.match(col)]
+        if not ohe_cols:
+            _LOGGER.warning(f"No one-hot encoded columns found for base feature '{base_name}'. Skipping.")
+            continue
+
+        block = new_df[ohe_cols].to_numpy(dtype=np.float64)
+        labels = np.array([col.split(separator, 1)[1] for col in ohe_cols], dtype=object)
+
+        # NaN never wins the argmax and is skipped by the sum, as with `idxmax` and `sum`
+        values = labels[np.argmax(np.where(np.isnan(block), -np.inf, block), axis=1)]
+        values[np.nansum(block, axis=1) == 0] = baseline_category if baseline_category is not None else np.nan
+
+        new_df[base_name] = pd.Series(values, index=new_df.index, dtype=object)
+        columns_to_drop.extend(ohe_cols)
+        if verbose:
+            print(f"  - Reconstructed '{base_name}' from {len(ohe_cols)} columns (all-zero rows: '{baseline_category}').")
+
+    if drop_original and columns_to_drop:
+        new_df = new_df.drop(columns=list(dict.fromkeys(columns_to_drop)))
+
+    return new_df
+
+
+def reconstruct_binary(df: pd.DataFrame,
+                       reconstruction_map: dict[str, tuple[str, Any, Any]],
+                       drop_original: bool = True,
+                       verbose: bool = True) -> pd.DataFrame:
+    """Same output as `ml_tools.data_exploration.reconstruct_binary`, with the 0/1 values gathered from a label array."""
+    new_df = df.copy()
+    columns_to_drop: list[str] = []
+
+    for new_col_name, (source_col, label_for_0, label_for_1) in reconstruction_map.items():
+        if source_col not in new_df.columns:
+            _LOGGER.error(f"Source column '{source_col}' for new column '{new_col_name}' not found.")
+            raise ValueError()
+
+        mapping = {0: label_for_0, 1: label_for_1}
+        if is_numeric_dtype(new_df[source_col]):
+            labels = np.array([label_for_0, label_for_1], dtype=object)
+            new_df[new_col_name] = _decode_block(new_df[[source_col]], labels, mapping)[source_col]
+        else:
+            new_df[new_col_name] = new_df[source_col].map(mapping)
+
+        if source_col != new_col_name:
+            columns_to_drop.append(source_col)
+        if verbose:
+            print(f"  - Reconstructed '{new_col_name}' from '{source_col}' (0='{label_for_0}', 1='{label_for_1}').")
+
+    if drop_original and columns_to_drop:
+        new_df = new_df.drop(columns=list(dict.fromkeys(columns_to_drop)))
+
+    return new_df
+
+
+def reconstruct_multibinary(df: pd.DataFrame,
+                            pattern: str,
+                            pos_label: str = "Yes",
+                            neg_label: str = "No",
+                            case_sensitive: bool = False,
+                            verbose: bool = True) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Same output as `ml_tools.data_exploration.reconstruct_multibinary`, every numeric column matching `pattern`
+    is relabelled in a single pass over the column block.
+    """
+    new_df = df.copy()
+    target_columns = new_df.columns[new_df.columns.str.contains(pattern, case=case_sensitive, regex=True)].to_list()
+    if not target_columns:
+        _LOGGER.warning(f"No columns found matching pattern '{pattern}'. Returning original DataFrame.")
+        return new_df, []
+
+    mapping = {0: neg_label, 0.0: neg_label, False: neg_label, 1: pos_label, 1.0: pos_label, True: pos_label}
+
+    numeric_cols = [col for col in target_columns if is_numeric_dtype(new_df[col])]
+    if numeric_cols:
+        labels = np.array([neg_label, pos_label], dtype=object)
+        new_df[numeric_cols] = _decode_block(new_df[numeric_cols], labels, mapping)
+
+    # String columns keep the element-wise mapping
+    for col in target_columns:
+        if col not in numeric_cols and is_object_dtype(new_df[col]):
+            new_df[col] = new_df[col].map(mapping)
+
+    if verbose:
+        _LOGGER.info(f"Reconstructed {len(target_columns)} binary columns matching '{pattern}'.")
+
+    return new_df, target_columns
+
+
+def _mapping_groups(schema: FeatureSchema) -> list[tuple[list[str], np.ndarray, dict[str, int]]]:
+    """Categorical features grouped by identical mapping: (columns, labels indexed by code, mapping)."""
+    groups: dict[tuple, tuple[list[str], np.ndarray, dict[str, int]]] = {}
+    for col in schema.categorical_feature_names:
+        mapping = (schema.categorical_mappings or {}).get(col)
+        if mapping is None:
+            continue
+        signature = tuple(sorted(mapping.items(), key=lambda item: item[1]))
+        if signature not in groups:
+            labels = np.full(max(mapping.values()) + 1, np.nan, dtype=object)
+            for label, code in mapping.items():
+                labels[code] = label
+            groups[signature] = ([], labels, mapping)
+        groups[signature][0].append(col)
+    return list(groups.values())
+
+
+def _schema_columns(df: pd.DataFrame, schema: FeatureSchema, targets: list[str]) -> list[str]:
+    """Features followed by targets, after checking that all of them are in `df`."""
+    missing = [col for col in [*schema.feature_names, *targets] if col not in df.columns]
+    if missing:
+        _LOGGER.error(f"Schema Reconstruction Mismatch: Missing required columns: {missing}")
+        raise ValueError()
+    return list(schema.feature_names) + targets
+
+
+def reconstruct_from_schema(df: pd.DataFrame,
+                            schema: FeatureSchema,
+                            targets: Optional[list[str]] = None,
+                            verbose: int = 3) -> pd.DataFrame:
+    """
+    Same output as `ml_tools.data_exploration.reconstruct_from_schema`. Categorical features sharing a mapping
+    (e.g. every 'No'/'Yes' multibinary feature) are decoded together with one gather.
+    """
+    valid_columns = _schema_columns(df, schema, targets or [])
+    extra_cols = set(df.columns) - set(valid_columns)
+    if extra_cols and verbose >= 1:
+        _LOGGER.warning(f"Dropping extra columns not present in schema or targets: {extra_cols}")
+    df_decoded = df[valid_columns].copy()
+
+    for columns, labels, mapping in _mapping_groups(schema):
+        reverse_mapping = {code: label for label, code in mapping.items()}
+
+        numeric_cols = [col for col in columns if is_numeric_dtype(df_decoded[col])]
+        if numeric_cols:
+            if verbose >= 1:
+                codes = df_decoded[numeric_cols].to_numpy(dtype=np.float64)
+                unknown = [code for code in np.unique(codes[~np.isnan(codes)]) if code not in reverse_mapping]
+                if unknown:
+                    _LOGGER.warning(f"Found unknown encoded values {unknown} in {numeric_cols}. These will be mapped to NaN.")
+            df_decoded[numeric_cols] = _decode_block(df_decoded[numeric_cols], labels, reverse_mapping)
+
+        for col in columns:
+            if col not in numeric_cols:
+                df_decoded[col] = df_decoded[col].map(reverse_mapping)
+
+    if verbose >= 2:
+        _LOGGER.info(f"Schema reconstruction successful. Final shape: {df_decoded.shape}")
+
+    return df_decoded
+
+
+def encode_from_schema(df: pd.DataFrame,
+                       schema: FeatureSchema,
+                       targets: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    Inverse of `reconstruct_from_schema`: categorical labels back to their integer codes, one lookup per
+    group of features sharing a mapping. Missing or unknown labels become NaN (the feature is then float64,
+    otherwise int64).
+    """
+    valid_columns = _schema_columns(df, schema, targets or [])
+    df_encoded = df[valid_columns].copy()
+
+    for columns, _, mapping in _mapping_groups(schema):
+        categories = pd.Index(list(mapping.keys()), dtype=object)
+        category_codes = np.append(np.array(list(mapping.values()), dtype=np.float64), np.nan)
+
+        # get_indexer gives -1 for unknown labels, which picks the trailing NaN
+        labels = df_encoded[columns].to_numpy(dtype=object)
+        codes = category_codes[categories.get_indexer(labels.ravel())].reshape(labels.shape)
+
+        for j, col in enumerate(columns):
+            column_codes = codes[:, j]
+            df_encoded[col] = column_codes if np.isnan(column_codes).any() else column_codes.astype(np.int64)
+
+    return df_encoded
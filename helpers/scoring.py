@@ -0,0 +1,255 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ml_tools.keys import InferenceKeys
+from ml_tools.schema import FeatureSchema
+from ml_tools._core import get_logger
+
+from .inference import encode_features
+from .surrogate_cache import CachedInferenceHandler
+
+
+_LOGGER = get_logger("Scoring Server")
+
+
+class MicroBatcher:
+    """
+    Scores feature arrays submitted from many threads with one model call per micro-batch.
+
+    A single worker thread owns the model: it takes the first pending request, waits up to `max_wait_ms` for
+    more (until `max_batch_rows` rows are pending), runs one forward pass on the stacked rows and hands every
+    request its own slice. Latencies (submit to result) of the last `window` requests are kept for `stats`.
+    """
+    def __init__(self,
+                 inference_handler: CachedInferenceHandler,
+                 max_batch_rows: int = 256,
+                 max_wait_ms: float = 2.0,
+                 window: int = 10_000):
+        """
+        Args:
+            inference_handler (CachedInferenceHandler): Handler that rounds, balances and caches the candidates.
+            max_batch_rows (int): Rows after which a micro-batch is run without waiting further.
+            max_wait_ms (float): Longest wait for more requests after the first one of a batch.
+            window (int): Number of recent requests used for the latency percentiles.
+        """
+        self.inference_handler = inference_handler
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: queue.Queue = queue.Queue()
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features: np.ndarray) -> "Future[np.ndarray]":
+        """Queues an (N, F) float32 array, the future resolves to its (N, T) predictions."""
+        future: Future = Future()
+        self._queue.put((features, future, time.perf_counter()))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_batch(self) -> Optional[list[tuple]]:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        n_rows = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_rows:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.perf_counter(), 0.0))
+            except queue.Empty:
+                break
+            if item is None:
+                # Score what is pending, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            try:
+                features = np.concatenate([item[0] for item in batch])
+                predictions = self.inference_handler.predict_batch(features)[InferenceKeys.PREDICTIONS].cpu().numpy()
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            done = time.perf_counter()
+            start = 0
+            with self._lock:
+                for rows, future, submitted in batch:
+                    future.set_result(predictions[start:start + len(rows)])
+                    start += len(rows)
+                    self._latencies.append(done - submitted)
+                self.requests += len(batch)
+                self.rows += len(features)
+                self.batches += 1
+
+    def stats(self) -> dict[str, float]:
+        """Latency percentiles (ms) of the recent requests and throughput since start."""
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000.0
+            requests, rows, batches = self.requests, self.rows, self.batches
+        elapsed = time.perf_counter() - self._started
+        has_latencies = len(latencies) > 0
+        return {
+            "Requests": requests,
+            "Rows": rows,
+            "Batches": batches,
+            "Rows/Batch": rows / batches if batches else 0.0,
+            "p50(ms)": float(np.percentile(latencies, 50)) if has_latencies else 0.0,
+            "p99(ms)": float(np.percentile(latencies, 99)) if has_latencies else 0.0,
+            "Requests/s": requests / elapsed,
+            "Rows/s": rows / elapsed,
+            **self.inference_handler.stats(),
+        }
+
+
+class RecipeScorer:
+    """
+    Converts JSON recipes (one object per candidate, categorical features as labels or codes) into model inputs,
+    scores them through a `MicroBatcher` and returns the canonical recipes (rounded integer features, balanced
+    Fraction_O) with their predicted targets.
+    """
+    def __init__(self, batcher: MicroBatcher, schema: FeatureSchema):
+        self.batcher = batcher
+        self.schema = schema
+        self.target_ids = list(batcher.inference_handler.target_ids)
+        self._labels = {col: {code: label for label, code in mapping.items()}
+                        for col, mapping in (schema.categorical_mappings or {}).items()}
+
+    def features(self, recipes: list[dict]) -> np.ndarray:
+        df = pd.DataFrame(recipes)
+        missing = [col for col in self.schema.feature_names if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+        features = encode_features(df, self.schema)
+        invalid = [self.schema.feature_names[i] for i in np.flatnonzero(np.isnan(features).any(axis=0))]
+        if invalid:
+            raise ValueError(f"Missing values or unknown categories in: {invalid}")
+        return features
+
+    def score(self, recipes: list[dict], timeout: Optional[float] = 30.0) -> list[dict]:
+        canonical = self.batcher.inference_handler.canonical_features(self.features(recipes))
+        predictions = self.batcher.submit(canonical).result(timeout=timeout)
+
+        # float32 noise is dropped from the reply (e.g. 1.2 instead of 1.2000000476837158)
+        canonical = np.round(canonical.astype(np.float64), 6)
+        predictions = np.round(predictions.astype(np.float64), 4)
+
+        results = []
+        for row, prediction in zip(canonical, predictions):
+            result = {}
+            for name, value in zip(self.schema.feature_names, row.tolist()):
+                result[name] = self._labels[name].get(int(value), value) if name in self._labels else value
+            result.update(zip(self.target_ids, prediction.tolist()))
+            results.append(result)
+        return results
+
+
+def _make_request_handler(scorer: RecipeScorer) -> type:
+    class ScoringRequestHandler(BaseHTTPRequestHandler):
+        """POST /score with a recipe object or a list of them, GET /stats and GET /health."""
+        def _reply(self, status: int, payload) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                self._reply(200, {"status": "ok", "features": list(scorer.schema.feature_names), "targets": scorer.target_ids})
+            elif self.path == "/stats":
+                self._reply(200, scorer.batcher.stats())
+            else:
+                self._reply(404, {"error": f"Unknown path '{self.path}'."})
+
+        def do_POST(self) -> None:
+            if self.path != "/score":
+                self._reply(404, {"error": f"Unknown path '{self.path}'."})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                recipes = payload if isinstance(payload, list) else [payload]
+                self._reply(200, {"predictions": scorer.score(recipes)})
+            except (ValueError, TypeError) as e:
+                self._reply(400, {"error": str(e)})
+            except TimeoutError:
+                self._reply(504, {"error": "Scoring timed out."})
+            except Exception as e:
+                # Model failures set on the batcher future, the client still gets a reply
+                _LOGGER.error(f"Scoring failed: {type(e).__name__}: {e}")
+                self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args) -> None:
+            # Request lines would drown the periodic stats
+            pass
+
+    return ScoringRequestHandler
+
+
+class _ScoringHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Bursts of concurrent clients queue instead of being refused
+    request_queue_size = 128
+
+
+def serve(scorer: RecipeScorer, host: str = "127.0.0.1", port: int = 8765, stats_interval: Optional[float] = 60.0) -> None:
+    """
+    Serves `scorer` over HTTP until interrupted, logging the latency/throughput stats every `stats_interval` seconds.
+    Each connection is handled in its own thread; their requests meet in the micro-batcher.
+    """
+    server = _ScoringHTTPServer((host, port), _make_request_handler(scorer))
+
+    stop = threading.Event()
+
+    def log_stats() -> None:
+        s = scorer.batcher.stats()
+        _LOGGER.info(f"{s['Requests']} requests, {s['Rows/Batch']:.1f} rows/batch, p50 {s['p50(ms)']:.2f} ms, "
+                     f"p99 {s['p99(ms)']:.2f} ms, {s['Rows/s']:.0f} rows/s.")
+
+    def log_periodically() -> None:
+        while not stop.wait(stats_interval):
+            log_stats()
+
+    if stats_interval:
+        threading.Thread(target=log_periodically, daemon=True).start()
+
+    _LOGGER.info(f"Scoring server listening on http://{host}:{port} (POST /score, GET /stats, GET /health).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        scorer.batcher.close()
+        log_stats()
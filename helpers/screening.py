@@ -0,0 +1,338 @@
+import time
+from typing import TYPE_CHECKING, Optional, Union
+
+import numpy as np
+import pandas as pd
+import torch
+
+from ml_tools.ML_inference import DragonInferenceHandler
+from ml_tools.ML_optimization import DragonParetoOptimizer
+from ml_tools.keys import InferenceKeys
+from ml_tools.schema import FeatureSchema
+from ml_tools._core import get_logger
+
+from .inference import encode_features, score_dataframe
+from .pareto import dominated_by, non_dominated_mask, to_maximization
+
+# The tree models need the 'ensemble' extra (xgboost, lightgbm), only the screen's callers import them
+if TYPE_CHECKING:
+    from ml_tools.ensemble_learning import RegressionTreeModels
+
+
+_LOGGER = get_logger("Surrogate Screening")
+
+
+class TreeScreen:
+    """
+    Gradient-boosted approximation of the surrogate, one regressor per model target.
+
+    `residual_scale` is the standard deviation of (surrogate - approximation) on held-out candidates,
+    the unit of the screening margin.
+    """
+    def __init__(self, models: list, residual_scale: np.ndarray, target_ids: list[str]):
+        self.models = models
+        self.residual_scale = residual_scale
+        self.target_ids = target_ids
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """(N, T) float32 approximate predictions of an (N, F) feature array."""
+        return np.column_stack([model.predict(features) for model in self.models]).astype(np.float32)
+
+
+def screening_features(optimizer: DragonParetoOptimizer,
+                       extra_features: Optional[list[np.ndarray]] = None,
+                       n_random: int = 20_000,
+                       seed: int = 0) -> np.ndarray:
+    """
+    Training candidates of a `TreeScreen`: uniform samples within the search bounds of `optimizer`
+    (categorical codes rounded) plus known designs such as the dataset or the archived front.
+
+    Returns:
+        np.ndarray: (N, F) float32 array.
+    """
+    rng = np.random.default_rng(seed)
+    lower = np.asarray(optimizer.lower_bounds, dtype=np.float64)
+    upper = np.asarray(optimizer.upper_bounds, dtype=np.float64)
+    random_features = rng.uniform(lower, upper, size=(n_random, len(lower)))
+    for col_idx, cardinality in (optimizer.schema.categorical_index_map or {}).items():
+        random_features[:, col_idx] = np.clip(np.floor(random_features[:, col_idx] + 0.5), 0, cardinality - 1)
+
+    blocks = [random_features.astype(np.float32)]
+    for block in extra_features or []:
+        # Rows with unknown categories cannot be scored
+        block = np.asarray(block, dtype=np.float32)
+        blocks.append(np.clip(block[~np.isnan(block).any(axis=1)], lower, upper).astype(np.float32))
+    return np.concatenate(blocks)
+
+
+def fit_tree_screen(inference_handler: DragonInferenceHandler,
+                    features: np.ndarray,
+                    model_object: "RegressionTreeModels",
+                    model_name: str = "LightGBM",
+                    validation_size: float = 0.2,
+                    batch_size: int = 4096) -> TreeScreen:
+    """
+    Distills the surrogate into one gradient-boosted regressor per target: the labels are the surrogate
+    predictions of `features` (canonicalized first if the handler canonicalizes), not the measured targets,
+    so the screen approximates exactly what it stands in for.
+
+    Args:
+        inference_handler (DragonInferenceHandler): Surrogate to approximate, e.g. a `CachedInferenceHandler`.
+        features (np.ndarray): (N, F) training candidates, see `screening_features`.
+        model_object (RegressionTreeModels): Model factory.
+        model_name (str): 'LightGBM' or 'XGBoost'.
+        validation_size (float): Held-out share used for the residual scale.
+        batch_size (int): Rows per surrogate call while labelling.
+    """
+    if hasattr(inference_handler, "canonical_features"):
+        features = inference_handler.canonical_features(features) # type: ignore
+    features = np.asarray(features, dtype=np.float32)
+
+    labels = np.concatenate([inference_handler.predict_batch(features[start:start + batch_size])[InferenceKeys.PREDICTIONS].cpu().numpy()
+                             for start in range(0, len(features), batch_size)])
+
+    rng = np.random.default_rng(model_object.random_state)
+    is_validation = rng.random(len(features)) < validation_size
+    X_fit, X_val = features[~is_validation], features[is_validation]
+
+    target_ids = list(inference_handler.target_ids) # type: ignore
+    models = []
+    residual_scale = np.empty(len(target_ids))
+    for j, target in enumerate(target_ids):
+        model = model_object()[model_name]
+        model.fit(X_fit, labels[~is_validation, j])
+        residuals = labels[is_validation, j] - model.predict(X_val)
+        residual_scale[j] = residuals.std()
+        r2 = 1.0 - residuals.var() / max(labels[is_validation, j].var(), np.finfo(float).tiny)
+        _LOGGER.info(f"{model_name} screen of '{target}': R2 {r2:.4f}, residual std {residual_scale[j]:.4g}.")
+        models.append(model)
+
+    return TreeScreen(models=models, residual_scale=residual_scale, target_ids=target_ids)
+
+
+class ScreenedInferenceHandler:
+    """
+    Two-tier evaluator for `DragonParetoOptimizer`: a `TreeScreen` scores every candidate, and only candidates whose
+    optimistic estimate (approximation shifted by `margin` residual deviations towards better) is not dominated by the
+    current front of surrogate-evaluated candidates reach the wrapped surrogate.
+
+    Rejected candidates get their pessimistic estimate (shifted by the margin towards worse), which the front
+    dominates, so they can only survive selection as dominated individuals and never replace a front point.
+    The front is the running non-dominated set of the surrogate predictions since the last `reset_stats`.
+
+    A share `audit_rate` of the rejected candidates is still sent to the surrogate (their returned fitness stays
+    pessimistic) to measure false rejections: audited candidates the front would not have dominated.
+    With `audit_rate=1` the report is exact, at the cost of every surrogate call.
+
+    Every other attribute (`task`, `target_ids`, `device`, ...) is forwarded to the wrapped handler.
+    """
+    def __init__(self,
+                 inference_handler: DragonInferenceHandler,
+                 screen: TreeScreen,
+                 objectives: dict[str, str],
+                 margin: float = 2.0,
+                 audit_rate: float = 0.0,
+                 seed: int = 0):
+        """
+        Args:
+            inference_handler (DragonInferenceHandler): Surrogate, e.g. a `CachedInferenceHandler`.
+            screen (TreeScreen): Approximation of the surrogate.
+            objectives (dict[str, str]): Objective target names and their sense ('max' or 'min').
+            margin (float): Screening margin in residual standard deviations. Larger rejects less.
+            audit_rate (float): Share of the rejected candidates checked against the surrogate, in [0, 1].
+            seed (int): Seed of the audit sample.
+        """
+        self.inference_handler = inference_handler
+        self.screen = screen
+        self.margin = margin
+        self.audit_rate = audit_rate
+        self.seed = seed
+
+        target_ids = list(inference_handler.target_ids) # type: ignore
+        missing = [name for name in objectives if name not in target_ids]
+        if missing:
+            _LOGGER.error(f"Objectives {missing} are not targets of the inference handler: {target_ids}")
+            raise ValueError()
+        self.objective_indices = [target_ids.index(name) for name in objectives]
+        self.senses = list(objectives.values())
+
+        # Shift of a 'better by the margin' estimate, in the original units of every target
+        signs = np.zeros(len(target_ids), dtype=np.float32)
+        signs[self.objective_indices] = [1.0 if sense == "max" else -1.0 for sense in self.senses]
+        self._shift = (signs * margin * screen.residual_scale).astype(np.float32)
+
+        self.reset_stats()
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the proxy itself
+        if name == "inference_handler":
+            raise AttributeError(name)
+        return getattr(self.inference_handler, name)
+
+    def reset_stats(self) -> None:
+        """Clears the front and the counters, e.g. before a new seed. The wrapped handler is reset too."""
+        if hasattr(self.inference_handler, "reset_stats"):
+            self.inference_handler.reset_stats() # type: ignore
+        self._rng = np.random.default_rng(self.seed)
+        self._front = np.empty((0, len(self.objective_indices)))
+        # Surrogate predictions (maximization form) of audited rejections the front did not dominate
+        self._false_rejections: list[np.ndarray] = []
+        self.requested = 0
+        self.screened_out = 0
+        self.audited = 0
+        self.false_rejections = 0
+        self.front_entries = 0
+        self.inference_seconds = 0.0
+        self.screening_seconds = 0.0
+
+    def _canonical(self, features: Union[np.ndarray, torch.Tensor]) -> np.ndarray:
+        if hasattr(self.inference_handler, "canonical_features"):
+            return self.inference_handler.canonical_features(features) # type: ignore
+        if isinstance(features, torch.Tensor):
+            features = features.detach().cpu().numpy()
+        return np.array(features, dtype=np.float32, order="C")
+
+    def _objectives(self, predictions: np.ndarray) -> np.ndarray:
+        return to_maximization(predictions[:, self.objective_indices], self.senses)
+
+    def predict_batch(self, features: Union[np.ndarray, torch.Tensor]) -> dict[str, torch.Tensor]:
+        start = time.perf_counter()
+        canonical = self._canonical(features)
+        n_rows = canonical.shape[0]
+
+        estimates = self.screen.predict(canonical)
+        accepted = ~dominated_by(self._objectives(estimates + self._shift), self._front)
+        audited = ~accepted & (self._rng.random(n_rows) < self.audit_rate)
+        self.screening_seconds += time.perf_counter() - start
+
+        predictions = estimates - self._shift
+        to_model = accepted | audited
+        if to_model.any():
+            model_predictions = self.inference_handler.predict_batch(canonical[to_model])[InferenceKeys.PREDICTIONS].cpu().numpy()
+            is_accepted = accepted[to_model]
+            predictions[np.flatnonzero(accepted)] = model_predictions[is_accepted]
+
+            # Audited rejections are checked against the front they were rejected by
+            audit_points = self._objectives(model_predictions[~is_accepted])
+            missed = audit_points[~dominated_by(audit_points, self._front)]
+            if len(missed):
+                self._false_rejections.append(missed)
+            self.audited += len(audit_points)
+            self.false_rejections += len(missed)
+
+            self._update_front(self._objectives(model_predictions[is_accepted]))
+
+        self.requested += n_rows
+        self.screened_out += int((~accepted).sum())
+
+        output = torch.from_numpy(np.ascontiguousarray(predictions, dtype=np.float32)).to(self.inference_handler.device) # type: ignore
+        self.inference_seconds += time.perf_counter() - start
+        return {InferenceKeys.PREDICTIONS: output}
+
+    def surrogate_front(self, front: pd.DataFrame, schema: FeatureSchema) -> pd.DataFrame:
+        """
+        `front` with its targets predicted by the wrapped surrogate, without the rows those predictions dominate.
+
+        `DragonParetoOptimizer.run` scores its final front through this handler, so rows the screen rejected would
+        carry pessimistic tree estimates: only surrogate predictions may leave the optimization.
+        """
+        front = front.copy()
+        predictions = score_dataframe(self.inference_handler, front, schema) # type: ignore
+        front[predictions.columns] = predictions
+        objective_names = [predictions.columns[i] for i in self.objective_indices]
+        keep = non_dominated_mask(front[objective_names].to_numpy(dtype=np.float64), self.senses)
+        return front.loc[keep].reset_index(drop=True)
+
+    def _update_front(self, points: np.ndarray) -> None:
+        if len(points) == 0:
+            return
+        self.front_entries += int((~dominated_by(points, self._front)).sum())
+        combined = np.vstack([self._front, points])
+        self._front = combined[non_dominated_mask(combined, ["max"] * combined.shape[1])]
+
+    def stats(self) -> dict[str, float]:
+        """
+        Screening counters since the last reset, on top of the wrapped handler's stats.
+
+        'Front Loss Rate' is the estimated share of front entries lost to false rejections (audited misses scaled by
+        1 / `audit_rate`), 'Final Front Loss Rate' the estimated share of the final front made of falsely rejected candidates.
+        """
+        stats = dict(self.inference_handler.stats()) if hasattr(self.inference_handler, "stats") else {} # type: ignore
+
+        # Without audits the losses are unknown
+        audit_scale = 1.0 / self.audit_rate if self.audit_rate > 0 else np.nan
+        lost_entries = self.false_rejections * audit_scale
+        lost_final = audit_scale * (int((~dominated_by(np.vstack(self._false_rejections), self._front)).sum()) if self._false_rejections else 0)
+
+        stats.update({
+            "Requested": self.requested,
+            "Screened Out": self.screened_out,
+            "Calls Avoided": self.screened_out / self.requested if self.requested else 0.0,
+            "Audited": self.audited,
+            "False Rejections": self.false_rejections,
+            "Front Entries": self.front_entries,
+            "Front Size": len(self._front),
+            "Front Loss Rate": lost_entries / (self.front_entries + lost_entries) if self.front_entries else np.nan,
+            "Final Front Loss Rate": lost_final / (len(self._front) + lost_final) if len(self._front) else np.nan,
+            "Screening(s)": self.screening_seconds,
+            "Inference(s)": self.inference_seconds,
+        })
+        return stats
+
+    def log_stats(self, label: str = "Run") -> None:
+        s = self.stats()
+        _LOGGER.info(f"{label}: {s['Requested']} candidates, {s['Screened Out']} screened out ({s['Calls Avoided']:.1%} of surrogate calls avoided), "
+                     f"{s['False Rejections']} of {s['Audited']} audited rejections would have entered the front.")
+
+
+def check_surrogate_predictions(df: pd.DataFrame,
+                                inference_handler: DragonInferenceHandler,
+                                schema: FeatureSchema,
+                                rtol: float = 1e-4,
+                                atol: float = 1e-4) -> None:
+    """
+    Raises if the targets of a solutions frame are not the direct predictions of the surrogate, e.g. before archiving
+    a front optimized with a `ScreenedInferenceHandler`.
+
+    Args:
+        df (pd.DataFrame): Solutions with every schema feature and model target.
+        inference_handler (DragonInferenceHandler): Surrogate. A `CachedInferenceHandler` canonicalizes the features
+            and its wrapped model predicts them, bypassing the cache.
+        schema (FeatureSchema): Feature schema of the surrogate.
+        rtol (float): Relative tolerance of the comparison.
+        atol (float): Absolute tolerance of the comparison.
+    """
+    features = encode_features(df, schema)
+    if hasattr(inference_handler, "canonical_features"):
+        features = inference_handler.canonical_features(features) # type: ignore
+    surrogate = getattr(inference_handler, "inference_handler", inference_handler)
+
+    target_ids = list(surrogate.target_ids) # type: ignore
+    predictions = surrogate.predict_batch(features)[InferenceKeys.PREDICTIONS].cpu().numpy()
+    mismatch = ~np.isclose(df[target_ids].to_numpy(dtype=np.float64), predictions, rtol=rtol, atol=atol).all(axis=1)
+    if mismatch.any():
+        _LOGGER.error(f"{int(mismatch.sum())} of {len(df)} solutions have targets that are not surrogate predictions.")
+        raise ValueError()
+    _LOGGER.info(f"All {len(df)} solutions match a direct surrogate prediction.")
+
+
+def screening_report(stats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calibration report of screened runs from their per-run stats (one row per run, e.g. per seed), with a final
+    'Total' row: share of surrogate calls avoided and rates of front points lost to false rejections.
+    """
+    columns = ["Requested", "Screened Out", "Calls Avoided", "Audited", "False Rejections",
+               "Front Entries", "Front Loss Rate", "Final Front Size", "Final Front Loss Rate"]
+    report = stats.rename(columns={"Front Size": "Final Front Size"})
+    report = report[[col for col in ["Seed"] + columns if col in report.columns]].copy()
+
+    totals = report[["Requested", "Screened Out", "Audited", "False Rejections", "Front Entries", "Final Front Size"]].sum()
+    total = dict(totals)
+    total["Calls Avoided"] = totals["Screened Out"] / totals["Requested"] if totals["Requested"] else 0.0
+    # Rates are averaged over the runs, weighted by the front entries and the final front sizes
+    total["Front Loss Rate"] = np.average(report["Front Loss Rate"], weights=report["Front Entries"]) if totals["Front Entries"] else np.nan
+    total["Final Front Loss Rate"] = np.average(report["Final Front Loss Rate"], weights=report["Final Front Size"]) if totals["Final Front Size"] else np.nan
+    if "Seed" in report.columns:
+        total["Seed"] = "Total"
+
+    return pd.concat([report, pd.DataFrame([total])], ignore_index=True)
@@ -0,0 +1,213 @@
+"""
+CSV, Parquet and Arrow IPC counterparts of the `ml_tools.utilities` dataset loaders and savers.
+
+Relies on one private part of `ml_tools` (pinned in pyproject.toml), to be checked on every library upgrade:
+`utilities._utility_save_load._validate_and_reorder_schema`, so schema validation matches the library's CSV savers.
+"""
+from pathlib import Path
+from typing import Iterator, Literal, Optional, Union
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from ml_tools.schema import FeatureSchema
+from ml_tools.path_manager import make_fullpath, sanitize_filename
+from ml_tools import utilities as csv_storage
+from ml_tools.utilities._utility_save_load import _validate_and_reorder_schema
+from ml_tools._core import get_logger
+
+
+_LOGGER = get_logger("Storage")
+
+
+# Parquet (compressed, column-projected reads) and Arrow IPC (uncompressed, memory-mapped reads)
+COLUMNAR_SUFFIXES = (".parquet", ".arrow")
+DATA_SUFFIXES = (".csv", *COLUMNAR_SUFFIXES)
+
+
+def is_columnar(path: Union[str, Path]) -> bool:
+    return Path(path).suffix in COLUMNAR_SUFFIXES
+
+
+def load_dataframe(df_path: Union[str, Path],
+                   use_columns: Optional[list[str]] = None,
+                   kind: Literal["pandas", "polars"] = "pandas",
+                   all_strings: bool = False,
+                   verbose: bool = True) -> tuple:
+    """
+    `ml_tools.utilities.load_dataframe` for CSV, Parquet and Arrow IPC files, chosen by the file suffix.
+
+    Columnar files keep their stored dtypes and only read the `use_columns` columns.
+    """
+    if not is_columnar(df_path):
+        return csv_storage.load_dataframe(df_path=df_path, use_columns=use_columns, kind=kind, all_strings=all_strings, verbose=verbose) # type: ignore
+
+    path = make_fullpath(df_path, enforce="file")
+    df_name = path.stem
+
+    try:
+        if path.suffix == ".parquet":
+            df = pl.read_parquet(path, columns=use_columns)
+        else:
+            df = pl.read_ipc(path, columns=use_columns, memory_map=True)
+    except pl.exceptions.ColumnNotFoundError as e:
+        _LOGGER.error(f"Failed to load '{df_name}'. A specified column may not exist in the file.")
+        raise e
+
+    if df.height == 0:
+        _LOGGER.error(f"DataFrame '{df_name}' loaded from '{path}' is empty.")
+        raise ValueError()
+
+    if all_strings:
+        df = df.with_columns(pl.all().cast(pl.Utf8))
+
+    if kind == "pandas":
+        df = df.to_pandas()
+    elif kind != "polars":
+        _LOGGER.error(f"Invalid kind '{kind}'. Must be one of 'pandas' or 'polars'.")
+        raise ValueError()
+
+    if verbose:
+        _LOGGER.info(f"💾 Loaded {kind.upper()} dataset: '{df_name}' with shape: {df.shape}")
+
+    return df, df_name
+
+
+def save_dataframe_filename(df: Union[pd.DataFrame, pl.DataFrame], save_dir: Union[str, Path], filename: str, verbose: int = 3) -> None:
+    """
+    `ml_tools.utilities.save_dataframe_filename` that writes Parquet or Arrow IPC when `filename` ends with
+    '.parquet' or '.arrow', and CSV otherwise. Dtypes are stored as they are in `df`.
+    """
+    if not is_columnar(filename):
+        csv_storage.save_dataframe_filename(df=df, save_dir=save_dir, filename=filename, verbose=verbose)
+        return
+
+    if df.shape[0] == 0:
+        _LOGGER.warning(f"Attempting to save an empty DataFrame: '{filename}'. Process Skipped.")
+        return
+
+    output_path = make_fullpath(save_dir, make=True, enforce="directory") / sanitize_filename(filename)
+
+    if isinstance(df, pd.DataFrame):
+        # Same blank string handling as the CSV writer
+        string_cols = df.select_dtypes(include=["object", "string"]).columns
+        if len(string_cols) > 0:
+            df = df.copy()
+            df[string_cols] = df[string_cols].replace(r'^\s*$', np.nan, regex=True)
+        df = pl.from_pandas(df)
+    elif isinstance(df, pl.DataFrame):
+        df = df.with_columns(
+            pl.when(pl.col(pl.String).str.strip_chars() == "")
+            .then(None)
+            .otherwise(pl.col(pl.String))
+            .name.keep()
+        )
+    else:
+        _LOGGER.error(f"Unsupported DataFrame type: {type(df)}. Must be pandas or polars.")
+        raise TypeError()
+
+    if output_path.suffix == ".parquet":
+        df.write_parquet(output_path)
+    else:
+        df.write_ipc(output_path)
+
+    if verbose >= 2:
+        _LOGGER.info(f"Saved dataset: '{output_path.name}' with shape: {df.shape}")
+
+
+def save_dataframe(df: Union[pd.DataFrame, pl.DataFrame], full_path: Path, verbose: int = 3) -> None:
+    """`ml_tools.utilities.save_dataframe` for CSV, Parquet and Arrow IPC paths."""
+    if not isinstance(full_path, Path) or full_path.suffix not in DATA_SUFFIXES:
+        _LOGGER.error(f"A path object pointing to a {'/'.join(DATA_SUFFIXES)} file must be provided.")
+        raise ValueError()
+
+    save_dataframe_filename(df=df, save_dir=full_path.parent, filename=full_path.name, verbose=verbose)
+
+
+def schema_dtypes(df: pd.DataFrame, schema: FeatureSchema) -> pd.DataFrame:
+    """
+    Copy of `df` with the categorical schema features stored as integers: uint8 for binary features,
+    int32 for the other categoricals. Columns with missing or non-integer values are left unchanged.
+    """
+    df = df.copy()
+    cardinalities = schema.categorical_index_map or {}
+    for index, cardinality in cardinalities.items():
+        col = schema.feature_names[index]
+        values = df[col]
+        if values.isna().any() or not np.array_equal(values, np.round(values)):
+            continue
+        df[col] = values.astype(np.uint8 if cardinality <= 2 else np.int32)
+    return df
+
+
+def load_dataframe_with_schema(df_path: Union[str, Path], schema: FeatureSchema, all_strings: bool = False) -> tuple[pd.DataFrame, str]:
+    """`ml_tools.utilities.load_dataframe_with_schema` for CSV, Parquet and Arrow IPC files."""
+    df, df_name = load_dataframe(df_path=df_path, kind="pandas", all_strings=all_strings)
+    return _validate_and_reorder_schema(df=df, schema=schema), df_name
+
+
+def save_dataframe_with_schema(df: pd.DataFrame, full_path: Path, schema: FeatureSchema, verbose: int = 3) -> None:
+    """
+    `ml_tools.utilities.save_dataframe_with_schema` for CSV, Parquet and Arrow IPC paths.
+    Columnar files store the categorical features with the compact integer dtypes of `schema_dtypes`.
+    """
+    df_to_save = _validate_and_reorder_schema(df=df, schema=schema, verbose=verbose)
+    if is_columnar(full_path):
+        df_to_save = schema_dtypes(df_to_save, schema)
+    save_dataframe(df=df_to_save, full_path=full_path, verbose=verbose)
+
+
+def list_dataset_paths(directory: Union[str, Path], raise_on_empty: bool = True) -> dict[str, Path]:
+    """
+    {file stem: path} of the CSV, Parquet and Arrow IPC files in a directory, sorted by name.
+
+    Raises if one stem is stored in several formats (e.g. a stale CSV left next to the Parquet file written
+    after changing `DATA_SUFFIX`), rather than silently picking one of them.
+    """
+    dir_path = make_fullpath(directory, enforce="directory")
+    files = [path for path in sorted(dir_path.iterdir()) if path.is_file() and path.suffix in DATA_SUFFIXES]
+    paths = {path.stem: path for path in files}
+    if len(paths) < len(files):
+        duplicates = sorted(path.name for path in files if sum(other.stem == path.stem for other in files) > 1)
+        _LOGGER.error(f"Datasets stored in several formats in '{dir_path}', remove the stale files: {duplicates}")
+        raise IOError()
+    if not paths and raise_on_empty:
+        _LOGGER.error(f"No dataset files found in '{dir_path}'.")
+        raise IOError()
+    return paths
+
+
+def load_dataframe_greedy(directory: Union[str, Path],
+                          use_columns: Optional[list[str]] = None,
+                          all_strings: bool = False,
+                          verbose: bool = True) -> pd.DataFrame:
+    """`ml_tools.utilities.load_dataframe_greedy` for directories holding a CSV, Parquet or Arrow IPC dataset."""
+    paths = list_dataset_paths(directory)
+    if len(paths) > 1:
+        _LOGGER.warning(f"Multiple datasets found in '{directory}'. Only one will be loaded.")
+    df, _ = load_dataframe(df_path=next(iter(paths.values())), use_columns=use_columns, kind="pandas", all_strings=all_strings, verbose=verbose)
+    return df
+
+
+def yield_dataframes_from_dir(datasets_dir: Union[str, Path], verbose: bool = True) -> Iterator[tuple[pd.DataFrame, str]]:
+    """`ml_tools.utilities.yield_dataframes_from_dir` for CSV, Parquet and Arrow IPC files."""
+    for path in list_dataset_paths(datasets_dir).values():
+        df, df_name = load_dataframe(df_path=path, kind="pandas", verbose=verbose)
+        yield df, df_name
+
+
+def train_dataset_orchestrator(list_of_dirs: list[Union[str, Path]], target_columns: list[str], save_dir: Union[str, Path]) -> None:
+    """
+    `ml_tools.utilities.train_dataset_orchestrator` for CSV, Parquet and Arrow IPC files.
+    Each single-target dataset is saved in the format of its source file.
+    """
+    total_saved = 0
+    for directory in list_of_dirs:
+        for df_name, df_path in list_dataset_paths(directory).items():
+            df, _ = load_dataframe(df_path=df_path, kind="pandas", verbose=False)
+            for target_name, target_df in csv_storage.distribute_dataset_by_target(df_or_path=df, target_columns=target_columns):
+                save_dataframe_filename(df=target_df, save_dir=save_dir, filename=f"{target_name}_{df_name}{df_path.suffix}")
+                total_saved += 1
+
+    _LOGGER.info(f"{total_saved} single-target datasets were created.")
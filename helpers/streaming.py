@@ -0,0 +1,175 @@
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import polars as pl
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from ml_tools.ETL_engineering import DragonTransformRecipe, AutoDummifier
+from ml_tools.IO_tools import load_json, save_json
+from ml_tools._core import get_logger
+
+from .memo_processor import MemoizedProcessor
+from .storage import is_columnar
+
+
+_LOGGER = get_logger("Streaming ETL")
+
+
+def iter_csv_chunks(input_path: Union[str, Path],
+                    chunk_size: int,
+                    columns: Optional[list[str]] = None) -> Iterator[pl.DataFrame]:
+    """
+    Yields a CSV file as all-string Polars DataFrames of about `chunk_size` rows,
+    with the same null handling as `load_dataframe(kind="polars", all_strings=True)`.
+    """
+    reader = pl.read_csv_batched(input_path,
+                                 columns=columns,
+                                 infer_schema_length=0,
+                                 null_values=["", " "],
+                                 batch_size=chunk_size)
+
+    # The reader's batch size is only a hint, regroup into chunks of the requested size
+    pending: list[pl.DataFrame] = []
+    pending_rows = 0
+    while True:
+        batches = reader.next_batches(1)
+        if not batches:
+            break
+        pending.append(batches[0])
+        pending_rows += batches[0].height
+        if pending_rows >= chunk_size:
+            yield pl.concat(pending)
+            pending, pending_rows = [], 0
+
+    if pending:
+        yield pl.concat(pending)
+
+
+class VocabularyDummifier:
+    """
+    One-hot encoder with a fixed category list, producing the same columns as `AutoDummifier`
+    ('{column}_{category}', sorted, nulls dropped) for every chunk of a file.
+    """
+    def __init__(self, vocabulary: list[str], drop_first: bool = False):
+        self.vocabulary = sorted(vocabulary)
+        if drop_first:
+            self.vocabulary = self.vocabulary[1:]
+
+    def __call__(self, column: pl.Series) -> pl.DataFrame:
+        values = column.cast(pl.Utf8)
+        return pl.DataFrame([
+            (values == category).fill_null(False).cast(pl.UInt8).alias(f"{column.name}_{category}")
+            for category in self.vocabulary
+        ])
+
+
+def scan_vocabularies(input_path: Union[str, Path],
+                      recipe: DragonTransformRecipe,
+                      chunk_size: int = 50_000) -> dict[str, list[str]]:
+    """
+    First pass over the input file collecting the categories of every `AutoDummifier` input column.
+    Only those columns are read.
+    """
+    columns = sorted({step["input_col"] for step in recipe if isinstance(step["transform"], AutoDummifier)})
+    vocabularies: dict[str, set[str]] = {col: set() for col in columns}
+
+    if columns:
+        for chunk in iter_csv_chunks(input_path, chunk_size, columns=columns):
+            for col in columns:
+                vocabularies[col].update(chunk.get_column(col).drop_nulls().unique().to_list())
+
+    return {col: sorted(values) for col, values in vocabularies.items()}
+
+
+def streaming_recipe(recipe: DragonTransformRecipe, vocabularies: dict[str, list[str]]) -> DragonTransformRecipe:
+    """Copy of a recipe where every `AutoDummifier` is replaced by a `VocabularyDummifier`."""
+    chunk_recipe = DragonTransformRecipe()
+    for step in recipe:
+        transform = step["transform"]
+        if isinstance(transform, AutoDummifier):
+            if step["input_col"] not in vocabularies:
+                _LOGGER.error(f"No vocabulary for the one-hot encoded column '{step['input_col']}'.")
+                raise ValueError()
+            transform = VocabularyDummifier(vocabularies[step["input_col"]], drop_first=transform.drop_first)
+        chunk_recipe.add(input_col_name=step["input_col"], transform=transform, output_col_names=step["output_col"])
+    return chunk_recipe
+
+
+def stream_transform_save(recipe: DragonTransformRecipe,
+                          input_path: Union[str, Path],
+                          output_path: Union[str, Path],
+                          chunk_size: int = 50_000,
+                          vocabulary_path: Optional[Union[str, Path]] = None,
+                          cache_dir: Optional[Union[str, Path]] = None) -> None:
+    """
+    Chunked equivalent of `DragonProcessor.load_transform_save`: reads the input in row chunks,
+    applies every recipe step and appends the result to the output file (CSV, or Parquet/Arrow IPC by suffix).
+    Peak memory depends on `chunk_size`, not on the file size.
+
+    One-hot columns are fixed before the first chunk is transformed, from the vocabulary file if it
+    exists, otherwise from a first-pass scan of the input (then written to `vocabulary_path`, if given).
+
+    Args:
+        recipe (DragonTransformRecipe): Recipe to apply.
+        input_path (str | Path): Input CSV.
+        output_path (str | Path): Output file, overwritten.
+        chunk_size (int): Rows per chunk.
+        vocabulary_path (str | Path | None): JSON mapping of one-hot input column to its accepted categories.
+        cache_dir (str | Path | None): Persistent parse cache of the `MemoizedProcessor`.
+    """
+    vocabulary_path = Path(vocabulary_path) if vocabulary_path is not None else None
+
+    if vocabulary_path is not None and vocabulary_path.exists():
+        vocabularies = load_json(vocabulary_path, expected_type="dict", verbose=False)
+        _LOGGER.info(f"Loaded one-hot vocabularies from '{vocabulary_path.name}'.")
+    else:
+        vocabularies = scan_vocabularies(input_path, recipe, chunk_size)
+        if vocabulary_path is not None:
+            save_json(data=vocabularies, directory=vocabulary_path.parent, filename=vocabulary_path.name, verbose=False)
+
+    processor = MemoizedProcessor(streaming_recipe(recipe, vocabularies), cache_dir=cache_dir)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    n_rows = 0
+    columns: Optional[list[str]] = None
+    schema: Optional[pl.Schema] = None
+    columnar_writer = None
+    with open(output_path, "wb") as f:
+        for chunk in iter_csv_chunks(input_path, chunk_size):
+            processed = processor.transform(chunk)
+
+            if columns is None:
+                columns = processed.columns
+                schema = processed.schema
+            elif processed.columns != columns:
+                _LOGGER.error(f"Chunk at row {n_rows} produced a different column set than the first chunk.")
+                raise ValueError()
+
+            # Same empty string handling as save_dataframe_filename
+            processed = processed.with_columns(
+                pl.when(pl.col(pl.String).str.strip_chars() == "")
+                .then(None)
+                .otherwise(pl.col(pl.String))
+                .name.keep()
+            )
+
+            if not is_columnar(output_path):
+                processed.write_csv(f, include_header=(n_rows == 0))
+            else:
+                # Columnar files need one schema, later chunks take the dtypes of the first one
+                table = processed.cast(dict(schema)).to_arrow() # type: ignore
+                if columnar_writer is None:
+                    if output_path.suffix == ".parquet":
+                        columnar_writer = pq.ParquetWriter(f, table.schema)
+                    else:
+                        columnar_writer = ipc.new_file(f, table.schema)
+                columnar_writer.write_table(table)
+            n_rows += processed.height
+
+        if columnar_writer is not None:
+            columnar_writer.close()
+
+    _LOGGER.info(f"Streamed {n_rows} rows into '{output_path.name}' ({len(columns or [])} columns).")
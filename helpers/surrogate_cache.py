@@ -0,0 +1,155 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Union
+
+import numpy as np
+import torch
+
+from ml_tools.ML_inference import DragonInferenceHandler
+from ml_tools.keys import InferenceKeys
+from ml_tools._core import get_logger
+
+
+_LOGGER = get_logger("Surrogate Cache")
+
+
+class CachedInferenceHandler:
+    """
+    Drop-in replacement for a `DragonInferenceHandler` that memoizes predictions of canonical candidates.
+
+    Candidates are canonicalized (integer features rounded, optional in-place hook such as charge balancing),
+    de-duplicated within the batch and looked up in a bounded LRU cache keyed by the bytes of the feature vector.
+    Only cache misses reach the model, in batches padded to exactly `batch_size` rows, so the model only ever
+    sees one batch shape and every prediction is independent of the other rows it was computed with.
+
+    Every other attribute (`task`, `target_ids`, `device`, ...) is forwarded to the wrapped handler.
+    """
+    def __init__(self,
+                 inference_handler: DragonInferenceHandler,
+                 integer_indices: Optional[list[int]] = None,
+                 canonicalize: Optional[Callable[[np.ndarray], None]] = None,
+                 max_size: int = 200_000,
+                 batch_size: int = 512):
+        """
+        Args:
+            inference_handler (DragonInferenceHandler): Handler used for cache misses.
+            integer_indices (list[int] | None): Feature columns rounded to integers.
+            canonicalize (Callable | None): Function modifying an (N, F) float32 array in place, applied after rounding.
+            max_size (int): Maximum number of cached feature vectors.
+            batch_size (int): Rows of every model call, shorter chunks are padded to it. Close to the population size
+                keeps the padding cheap.
+        """
+        self.inference_handler = inference_handler
+        self.integer_indices = integer_indices or []
+        self.canonicalize = canonicalize
+        self.max_size = max_size
+        self.batch_size = batch_size
+
+        self._cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self.reset_stats()
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the proxy itself
+        if name == "inference_handler":
+            raise AttributeError(name)
+        return getattr(self.inference_handler, name)
+
+    def reset_stats(self) -> None:
+        self.requested = 0
+        self.model_evaluations = 0
+        # Seconds spent in predict_batch (canonicalization, cache and model) and in the model alone
+        self.inference_seconds = 0.0
+        self.model_seconds = 0.0
+
+    def clear(self) -> None:
+        """Empties the cache, e.g. to bound the memory between independent runs."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Requested rows, rows sent to the model, evaluations saved, hit rate and inference time since the last reset."""
+        saved = self.requested - self.model_evaluations
+        return {
+            "Requested": self.requested,
+            "Model Evaluations": self.model_evaluations,
+            "Evaluations Saved": saved,
+            "Hit Rate": saved / self.requested if self.requested else 0.0,
+            "Cache Size": len(self._cache),
+            "Inference(s)": self.inference_seconds,
+            "Model(s)": self.model_seconds,
+        }
+
+    def log_stats(self, label: str = "Run") -> None:
+        s = self.stats()
+        _LOGGER.info(f"{label}: {s['Requested']} candidates, {s['Model Evaluations']} model evaluations, "
+                     f"{s['Evaluations Saved']} saved (hit rate {s['Hit Rate']:.1%}).")
+
+    def canonical_features(self, features: Union[np.ndarray, torch.Tensor]) -> np.ndarray:
+        """Returns a contiguous float32 copy of the candidates in canonical form."""
+        if isinstance(features, torch.Tensor):
+            features = features.detach().cpu().numpy()
+        canonical = np.array(features, dtype=np.float32, order="C")
+
+        if self.integer_indices:
+            canonical[:, self.integer_indices] = np.rint(canonical[:, self.integer_indices])
+        if self.canonicalize is not None:
+            self.canonicalize(canonical)
+
+        return canonical
+
+    def predict_batch(self, features: Union[np.ndarray, torch.Tensor]) -> dict[str, torch.Tensor]:
+        start = time.perf_counter()
+        canonical = self.canonical_features(features)
+        n_rows = canonical.shape[0]
+
+        # One void scalar per row, so identical candidates in the batch are evaluated once
+        rows = canonical.view(np.dtype((np.void, canonical.dtype.itemsize * canonical.shape[1]))).ravel()
+        unique_rows, first_index, inverse = np.unique(rows, return_index=True, return_inverse=True)
+
+        unique_predictions: list[Optional[np.ndarray]] = [None] * len(unique_rows)
+        missing = []
+        for i, row in enumerate(unique_rows):
+            key = row.tobytes()
+            cached = self._cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                self._cache.move_to_end(key)
+                unique_predictions[i] = cached
+
+        if missing:
+            model_start = time.perf_counter()
+            predictions = self._predict_padded(canonical[first_index[missing]])
+            self.model_seconds += time.perf_counter() - model_start
+            for i, prediction in zip(missing, predictions):
+                unique_predictions[i] = prediction
+                self._cache[unique_rows[i].tobytes()] = prediction
+
+            # Evict least recently used entries
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+        self.requested += n_rows
+        self.model_evaluations += len(missing)
+
+        output = np.stack(unique_predictions)[inverse.ravel()] # type: ignore
+        output = torch.from_numpy(output).to(self.inference_handler.device)
+        self.inference_seconds += time.perf_counter() - start
+        return {InferenceKeys.PREDICTIONS: output}
+
+    def _predict_padded(self, features: np.ndarray) -> np.ndarray:
+        """
+        Runs the wrapped model in `batch_size` chunks, padding a short chunk to `batch_size` by repeating its final row.
+        With a single batch shape a candidate's prediction does not depend on the batch it was computed in, so cached
+        and fresh predictions are identical.
+        """
+        n_rows = features.shape[0]
+        outputs = []
+        for start in range(0, n_rows, self.batch_size):
+            chunk = features[start:start + self.batch_size]
+            n_chunk = chunk.shape[0]
+            if n_chunk < self.batch_size:
+                padding = np.repeat(chunk[-1:], self.batch_size - n_chunk, axis=0)
+                chunk = np.concatenate([chunk, padding])
+            prediction = self.inference_handler.predict_batch(chunk)[InferenceKeys.PREDICTIONS]
+            outputs.append(prediction.cpu().numpy()[:n_chunk])
+        return np.concatenate(outputs)
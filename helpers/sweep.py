@@ -0,0 +1,280 @@
+import itertools
+import math
+import time
+import warnings
+from pathlib import Path
+from typing import Iterator, Literal, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from scipy.stats import qmc
+
+from ml_tools.ML_inference import DragonInferenceHandler
+from ml_tools.schema import FeatureSchema
+from ml_tools.keys import InferenceKeys
+from ml_tools._core import get_logger
+
+from .balance import ChargeBalancer, OXYGEN_COLUMN
+from .storage import is_columnar
+
+
+_LOGGER = get_logger("Design Sweep")
+
+
+class DesignSpace:
+    """
+    Design space of a model schema: continuous features within their ranges and categorical features over their options.
+
+    Quasi-random points of the unit hypercube (one dimension per free feature) are mapped to feature arrays in schema
+    order: continuous features linearly into their range, categorical features onto their option codes in equal strata.
+    Features with a single value (e.g. a collapsed range) take no dimension, and with a `balancer` Fraction_O is derived
+    from the cations instead of sampled. `cross_features` are not sampled: every design is repeated for each combination
+    of their options.
+    """
+    def __init__(self,
+                 schema: FeatureSchema,
+                 continuous_ranges: dict[str, tuple[float, float]],
+                 categorical_options: Optional[dict[str, list[str]]] = None,
+                 cross_features: Optional[list[str]] = None,
+                 integer_columns: Optional[list[str]] = None,
+                 balancer: Optional[ChargeBalancer] = None):
+        """
+        Args:
+            schema (FeatureSchema): Schema of the model, fixes the feature order and the categorical codes.
+            continuous_ranges (dict[str, tuple[float, float]]): (low, high) of every continuous feature.
+            categorical_options (dict[str, list[str]] | None): Labels to sweep per categorical feature. Missing features use every label.
+            cross_features (list[str] | None): Categorical features crossed exhaustively with every design.
+            integer_columns (list[str] | None): Continuous features rounded to integers.
+            balancer (ChargeBalancer | None): Derives Fraction_O after sampling, built for the schema feature order.
+        """
+        self.schema = schema
+        self.feature_names = list(schema.feature_names)
+        self.balancer = balancer
+        mappings = schema.categorical_mappings or {}
+        categorical_options = categorical_options or {}
+        cross_features = list(cross_features or [])
+
+        missing = [col for col in schema.continuous_feature_names if col not in continuous_ranges]
+        if missing:
+            _LOGGER.error(f"No range for the continuous features: {missing}")
+            raise ValueError()
+        unknown = [col for col in list(categorical_options) + cross_features if col not in mappings]
+        if unknown:
+            _LOGGER.error(f"Not categorical features of the schema: {unknown}")
+            raise ValueError()
+
+        # Constant value of every feature without a dimension, NaN for sampled features
+        self.constants = np.full(len(self.feature_names), np.nan, dtype=np.float32)
+
+        self.continuous_indices: list[int] = []
+        lows, highs = [], []
+        for col in schema.continuous_feature_names:
+            i = self.feature_names.index(col)
+            low, high = continuous_ranges[col]
+            if balancer is not None and col == OXYGEN_COLUMN:
+                self.constants[i] = 0.0
+            elif high > low:
+                self.continuous_indices.append(i)
+                lows.append(low)
+                highs.append(high)
+            else:
+                self.constants[i] = low
+        self.lows = np.array(lows, dtype=np.float64)
+        self.spans = np.array(highs, dtype=np.float64) - self.lows
+
+        self.categorical_indices: list[int] = []
+        self.categorical_codes: list[np.ndarray] = []
+        cross_codes = []
+        for col in schema.categorical_feature_names:
+            i = self.feature_names.index(col)
+            mapping = mappings[col]
+            labels = categorical_options.get(col, list(mapping))
+            invalid = [label for label in labels if label not in mapping]
+            if invalid:
+                _LOGGER.error(f"Unknown labels {invalid} of '{col}', expected some of {list(mapping)}.")
+                raise ValueError()
+            codes = np.array(sorted(mapping[label] for label in labels), dtype=np.float32)
+            if col in cross_features:
+                cross_codes.append(codes)
+            elif len(codes) > 1:
+                self.categorical_indices.append(i)
+                self.categorical_codes.append(codes)
+            else:
+                self.constants[i] = codes[0]
+
+        self.cross_indices = [self.feature_names.index(col) for col in schema.categorical_feature_names if col in cross_features]
+        self.combinations = np.array(list(itertools.product(*cross_codes)), dtype=np.float32)
+
+        self.integer_indices = [self.feature_names.index(col) for col in (integer_columns or []) if col in self.feature_names]
+
+    @property
+    def n_dimensions(self) -> int:
+        return len(self.continuous_indices) + len(self.categorical_indices)
+
+    @property
+    def n_combinations(self) -> int:
+        return len(self.combinations)
+
+    def features(self, unit_points: np.ndarray) -> np.ndarray:
+        """
+        Canonical (rounded, charge-balanced) float32 designs of an (N, `n_dimensions`) array in [0, 1), each repeated
+        for every combination of the crossed features: (N * `n_combinations`, F).
+        """
+        n_points = len(unit_points)
+        features = np.empty((n_points, len(self.feature_names)), dtype=np.float32)
+        features[:] = self.constants
+
+        n_continuous = len(self.continuous_indices)
+        features[:, self.continuous_indices] = self.lows + unit_points[:, :n_continuous] * self.spans
+        for j, (i, codes) in enumerate(zip(self.categorical_indices, self.categorical_codes)):
+            strata = np.minimum((unit_points[:, n_continuous + j] * len(codes)).astype(np.int64), len(codes) - 1)
+            features[:, i] = codes[strata]
+
+        if self.cross_indices:
+            features = np.repeat(features, self.n_combinations, axis=0)
+            features[:, self.cross_indices] = np.tile(self.combinations, (n_points, 1))
+
+        if self.integer_indices:
+            features[:, self.integer_indices] = np.rint(features[:, self.integer_indices])
+        if self.balancer is not None:
+            self.balancer(features)
+        return features
+
+
+def iter_unit_points(n_dimensions: int,
+                     n_points: int,
+                     chunk_size: int,
+                     method: Literal["sobol", "lhs"] = "sobol",
+                     seed: int = 0) -> Iterator[np.ndarray]:
+    """
+    Yields `n_points` quasi-random points of the unit hypercube in chunks of at most `chunk_size` rows.
+
+    'sobol' draws consecutive points of one scrambled Sobol sequence (keep `chunk_size` a power of two for balanced
+    chunks). 'lhs' draws an independent Latin hypercube per chunk, so each chunk is stratified on its own.
+    """
+    if method == "sobol":
+        engine = qmc.Sobol(d=n_dimensions, scramble=True, seed=seed) if n_dimensions else None
+    elif method == "lhs":
+        engine = qmc.LatinHypercube(d=n_dimensions, seed=seed) if n_dimensions else None
+    else:
+        _LOGGER.error(f"Unknown sampling method '{method}', expected 'sobol' or 'lhs'.")
+        raise ValueError()
+
+    for start in range(0, n_points, chunk_size):
+        n_chunk = min(chunk_size, n_points - start)
+        if engine is None:
+            yield np.empty((n_chunk, 0))
+            continue
+        with warnings.catch_warnings():
+            # Consecutive chunks continue one sequence, only a trailing partial chunk breaks the power-of-two balance
+            warnings.filterwarnings("ignore", message=".*balance properties of Sobol.*")
+            yield engine.random(n_chunk)
+
+
+def _open_writer(sink, output_path: Path, schema: pa.Schema):
+    if output_path.suffix == ".parquet":
+        return pq.ParquetWriter(sink, schema)
+    if is_columnar(output_path):
+        return ipc.new_file(sink, schema)
+    return pa_csv.CSVWriter(sink, schema)
+
+
+def sweep_design_space(space: DesignSpace,
+                       inference_handler: DragonInferenceHandler,
+                       output_path: Union[str, Path],
+                       n_points: int,
+                       method: Literal["sobol", "lhs"] = "sobol",
+                       chunk_size: int = 2**18,
+                       batch_size: int = 4096,
+                       seed: int = 0) -> dict[str, float]:
+    """
+    Scores `n_points` quasi-random designs of a design space with the surrogate and streams every design with its
+    predicted targets to disk (Parquet, Arrow IPC or CSV by suffix), one chunk at a time.
+
+    Peak memory depends on `chunk_size` and `batch_size` (rows per model call), not on `n_points`, so 10^7 designs
+    fit on one machine. Categorical features are written as their integer codes.
+
+    Args:
+        space (DesignSpace): Design space.
+        inference_handler (DragonInferenceHandler): Surrogate.
+        output_path (str | Path): Output file, overwritten.
+        n_points (int): Number of designs, including the repetitions over the crossed features (rounded up to a multiple of them).
+        method (str): 'sobol' or 'lhs'.
+        chunk_size (int): Designs generated and written per chunk.
+        batch_size (int): Designs per model call.
+        seed (int): Seed of the scrambling or of the Latin hypercubes.
+
+    Returns:
+        dict: Designs, elapsed seconds per phase and throughput.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Chunks hold whole groups of crossed designs
+    n_base = math.ceil(n_points / space.n_combinations)
+    base_chunk = max(1, chunk_size // space.n_combinations)
+    if method == "sobol":
+        base_chunk = 2 ** int(math.log2(base_chunk))
+
+    mappings = space.schema.categorical_mappings or {}
+    cardinalities = {space.feature_names[i]: c for i, c in (space.schema.categorical_index_map or {}).items()}
+    target_ids = list(inference_handler.target_ids) # type: ignore
+
+    timings = {"Sampling(s)": 0.0, "Inference(s)": 0.0, "Writing(s)": 0.0}
+    n_rows = 0
+    writer = None
+    start = time.perf_counter()
+    _LOGGER.info(f"Sweeping {n_base * space.n_combinations} designs ({method}, {space.n_dimensions} dimensions, "
+                 f"{space.n_combinations} crossed combination(s)) into '{output_path.name}'.")
+
+    with open(output_path, "wb") as f:
+        for unit_points in iter_unit_points(space.n_dimensions, n_base, base_chunk, method=method, seed=seed):
+            t0 = time.perf_counter()
+            features = space.features(unit_points)
+
+            t1 = time.perf_counter()
+            predictions = np.concatenate([
+                inference_handler.predict_batch(features[i:i + batch_size])[InferenceKeys.PREDICTIONS].cpu().numpy()
+                for i in range(0, len(features), batch_size)
+            ])
+
+            t2 = time.perf_counter()
+            columns = {}
+            for j, name in enumerate(space.feature_names):
+                values = features[:, j]
+                if name in mappings:
+                    values = values.astype(np.uint8 if cardinalities.get(name, 3) <= 2 else np.int32)
+                columns[name] = values
+            for j, name in enumerate(target_ids):
+                columns[name] = predictions[:, j].astype(np.float32, copy=False)
+            table = pa.table(columns)
+            if writer is None:
+                writer = _open_writer(f, output_path, table.schema)
+            writer.write_table(table)
+            t3 = time.perf_counter()
+
+            timings["Sampling(s)"] += t1 - t0
+            timings["Inference(s)"] += t2 - t1
+            timings["Writing(s)"] += t3 - t2
+            n_rows += len(features)
+            _LOGGER.info(f"{n_rows} designs, {n_rows / (t3 - start):.0f} designs/s.")
+
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "Designs": n_rows,
+        "Method": method,
+        "Dimensions": space.n_dimensions,
+        "Total(s)": elapsed,
+        **timings,
+        "Designs/s": n_rows / elapsed if elapsed > 0 else 0.0,
+        "Inference Designs/s": n_rows / timings["Inference(s)"] if timings["Inference(s)"] > 0 else 0.0,
+    }
+    _LOGGER.info(f"Swept {n_rows} designs in {elapsed:.1f}s ({stats['Designs/s']:.0f} designs/s, "
+                 f"{stats['Inference Designs/s']:.0f} designs/s in the model).")
+    return stats
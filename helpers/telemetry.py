@@ -0,0 +1,140 @@
+import json
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ml_tools.ML_optimization import DragonParetoOptimizer
+from ml_tools._core import get_logger
+
+from .pareto import hypervolume, non_dominated_mask
+from .surrogate_cache import CachedInferenceHandler
+
+
+_LOGGER = get_logger("Optimization Telemetry")
+
+
+class GenerationTelemetry:
+    """
+    Generation hook appending one JSON line per generation of a run: population hypervolume, front size,
+    evaluations, evaluations per second and the wall time split between inference and the GA operators.
+
+    Attach with `optimizer.algorithm.after_step_hook.append(telemetry)` right before the run, and `close()` it after.
+    Lines are flushed as they are written, so the log of an interrupted run is usable.
+    """
+    def __init__(self,
+                 optimizer: DragonParetoOptimizer,
+                 reference: list[float],
+                 log_file: Union[str, Path],
+                 inference_handler: Optional[CachedInferenceHandler] = None,
+                 run_id: Optional[int] = None):
+        """
+        Args:
+            optimizer (DragonParetoOptimizer): Optimizer whose population is recorded.
+            reference (list[float]): Hypervolume reference point in the order of `config.target_objectives`.
+            log_file (str | Path): JSONL file, overwritten.
+            inference_handler (CachedInferenceHandler | None): Source of the evaluation counts and inference time.
+                Without it, one population-sized batch per generation is assumed and no time split is recorded.
+            run_id (int | None): Identifier written on every line (e.g. the seed).
+        """
+        self.optimizer = optimizer
+        self.reference = reference
+        self.inference_handler = inference_handler
+        self.run_id = run_id
+        self.senses = list(optimizer.config.target_objectives.values())
+
+        self.log_file = Path(log_file)
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.log_file, "w")
+
+        self.generation = 0
+        self._last_time = time.perf_counter()
+        self._last_evaluations = 0
+        self._last_inference = 0.0
+        if inference_handler is not None:
+            self._last_evaluations = inference_handler.requested
+            self._last_inference = inference_handler.inference_seconds
+
+    def __call__(self) -> None:
+        now = time.perf_counter()
+        self.generation += 1
+        population = self.optimizer.algorithm.population
+        evals = population.evals.detach().cpu().numpy() # type: ignore
+
+        if self.inference_handler is not None:
+            evaluations = self.inference_handler.requested
+            inference = self.inference_handler.inference_seconds - self._last_inference
+            self._last_inference = self.inference_handler.inference_seconds
+        else:
+            # The initial population plus one batch of children per generation
+            evaluations = (self.generation + 1) * len(population)
+            inference = None
+
+        seconds = now - self._last_time
+        new_evaluations = evaluations - self._last_evaluations
+        record = {
+            "Run": self.run_id,
+            "Generation": self.generation,
+            "Evaluations": evaluations,
+            "Hypervolume": hypervolume(evals, self.senses, self.reference),
+            "Front Size": int(non_dominated_mask(evals, self.senses).sum()),
+            "Seconds": seconds,
+            "Inference(s)": inference,
+            "GA(s)": seconds - inference if inference is not None else None,
+            "Evaluations/s": new_evaluations / seconds if seconds > 0 else None,
+        }
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+        self._last_evaluations = evaluations
+        # The hook's own time (hypervolume, front size) is left out of the next generation
+        self._last_time = time.perf_counter()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def clear_telemetry(directory: Union[str, Path]) -> None:
+    """Deletes the telemetry logs (`*.jsonl`) of earlier runs, so a summary only covers the runs that follow."""
+    files = sorted(Path(directory).glob("*.jsonl"))
+    for file in files:
+        file.unlink()
+    if files:
+        _LOGGER.info(f"Removed {len(files)} telemetry logs of a previous run from '{directory}'.")
+
+
+def load_telemetry(directory: Union[str, Path]) -> pd.DataFrame:
+    """Every generation of every telemetry log (`*.jsonl`) in a directory."""
+    files = sorted(Path(directory).glob("*.jsonl"))
+    if not files:
+        _LOGGER.warning(f"No telemetry logs found in '{directory}'.")
+        return pd.DataFrame()
+    return pd.concat([pd.read_json(file, lines=True) for file in files], ignore_index=True)
+
+
+def summarize_telemetry(telemetry: pd.DataFrame, fractions: tuple[float, ...] = (0.9, 0.99)) -> pd.DataFrame:
+    """
+    One row per run: generations, final hypervolume and front size, the first generation reaching each fraction
+    of the final hypervolume, evaluations per second and the share of the time spent in inference.
+    A run reaching 99% of its hypervolume long before its last generation has more generations than it needs.
+    """
+    records = []
+    for run_id, run in telemetry.groupby("Run", sort=True, dropna=False):
+        final = run["Hypervolume"].iloc[-1]
+        record = {
+            "Run": run_id,
+            "Generations": int(run["Generation"].max()),
+            "Final Hypervolume": final,
+            "Final Front Size": int(run["Front Size"].iloc[-1]),
+        }
+        for fraction in fractions:
+            reached = run.loc[run["Hypervolume"] >= fraction * final, "Generation"]
+            record[f"Generation to {fraction:.0%}"] = int(reached.iloc[0]) if not reached.empty else np.nan
+        seconds = run["Seconds"].sum()
+        record["Seconds"] = seconds
+        record["Evaluations/s"] = run["Evaluations"].iloc[-1] / seconds if seconds > 0 else np.nan
+        record["Inference Share"] = run["Inference(s)"].sum() / seconds if seconds > 0 and run["Inference(s)"].notna().all() else np.nan
+        records.append(record)
+    return pd.DataFrame(records)
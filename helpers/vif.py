@@ -0,0 +1,245 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from ml_tools.path_manager import make_fullpath, sanitize_filename
+from ml_tools._core import get_logger
+
+from .compact import compact_binaries
+from .storage import list_dataset_paths, load_dataframe, save_dataframe_filename
+
+
+_LOGGER = get_logger("VIF")
+
+
+# Same cap as `ml_tools.VIF` for perfectly collinear features
+INFINITE_VIF = 999.0
+# Eigenvalues of the correlation matrix below this (relative to the largest) are treated as exact collinearity
+_RANK_TOLERANCE = 1e-10
+
+
+class InverseCorrelation:
+    """
+    Inverse of the correlation matrix of a set of features. The VIF of each feature is the diagonal of the inverse
+    (identical to regressing it on all other features plus an intercept). Removing a feature is a rank-one downdate
+    of the inverse, O(p^2) instead of a fresh O(p^3) factorization.
+
+    Zero-variance features are left out of the matrix and get a VIF of 0, as with statsmodels.
+    """
+    def __init__(self, df: pd.DataFrame):
+        values = df.to_numpy(dtype=np.float64)
+        std = values.std(axis=0)
+        self.constant = [col for col, s in zip(df.columns, std) if not s > 0]
+        keep = std > 0
+
+        self.columns: list[str] = [col for col, k in zip(df.columns, keep) if k]
+        self.correlation = np.corrcoef(values[:, keep], rowvar=False).reshape(len(self.columns), len(self.columns))
+        self._factorize()
+
+    def _factorize(self) -> None:
+        """Exact inverse, or None with the collinear features marked as infinite when the matrix is singular."""
+        if not self.columns:
+            self.inverse = np.zeros((0, 0))
+            self.collinearity = np.zeros(0)
+            return
+
+        eigenvalues, eigenvectors = np.linalg.eigh(self.correlation)
+        null = eigenvalues < _RANK_TOLERANCE * max(eigenvalues.max(), 1.0)
+        # Weight of each feature in the null space of the matrix
+        self.collinearity = (eigenvectors[:, null] ** 2).sum(axis=1)
+
+        if null.any():
+            self.inverse = None
+        else:
+            self.inverse = (eigenvectors / eigenvalues) @ eigenvectors.T
+
+    def vif(self) -> pd.Series:
+        if self.inverse is None:
+            # statsmodels gives an infinite VIF to every feature that takes part in an exact linear dependence
+            eigenvalues, eigenvectors = np.linalg.eigh(self.correlation)
+            null = eigenvalues < _RANK_TOLERANCE * max(eigenvalues.max(), 1.0)
+            vif = ((eigenvectors[:, ~null] ** 2) / eigenvalues[~null]).sum(axis=1)
+            vif[self.collinearity > 1e-8] = np.inf
+        else:
+            vif = np.diag(self.inverse).copy()
+
+        vif = np.where(np.isinf(vif), INFINITE_VIF, vif)
+        return pd.concat([pd.Series(vif, index=self.columns, dtype=float),
+                          pd.Series(0.0, index=self.constant, dtype=float)])
+
+    def remove(self, column: str) -> None:
+        k = self.columns.index(column)
+        keep = np.arange(len(self.columns)) != k
+        self.correlation = self.correlation[np.ix_(keep, keep)]
+        del self.columns[k]
+
+        if self.inverse is None or not self.inverse[k, k] > 0:
+            # Removing a feature can restore full rank, refactorize
+            self._factorize()
+            return
+
+        # Inverse of a principal submatrix: P' = P[-k,-k] - P[-k,k] P[k,-k] / P[k,k]
+        pivot = self.inverse[keep, k]
+        self.inverse = self.inverse[np.ix_(keep, keep)] - np.outer(pivot, pivot) / self.inverse[k, k]
+
+
+def _vif_columns(df: pd.DataFrame, use_columns: Optional[list[str]], ignore_columns: Optional[list[str]]) -> list[str]:
+    """Same column selection as `ml_tools.VIF.compute_vif`."""
+    if use_columns is not None:
+        return [col for col in use_columns if col in df.columns]
+    columns = df.select_dtypes(include="number").columns.tolist()
+    if ignore_columns is not None:
+        columns = [col for col in columns if col not in ignore_columns]
+    return columns
+
+
+def _vif_frame(vif: pd.Series) -> pd.DataFrame:
+    return (pd.DataFrame({"feature": vif.index, "VIF": vif.to_numpy()})
+            .sort_values(by="VIF", ascending=False)
+            .reset_index(drop=True))
+
+
+def compute_vif(df: pd.DataFrame,
+                use_columns: Optional[list[str]] = None,
+                ignore_columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    VIF of each numeric feature from the inverse correlation matrix. Same columns, values and order
+    as `ml_tools.VIF.compute_vif`, without the plot.
+    """
+    vif = InverseCorrelation(df[_vif_columns(df, use_columns, ignore_columns)]).vif()
+    return _vif_frame(vif)
+
+
+def drop_vif_stepwise(df: pd.DataFrame,
+                      threshold: float = 10.0,
+                      use_columns: Optional[list[str]] = None,
+                      ignore_columns: Optional[list[str]] = None) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Drops the feature with the highest VIF, one at a time, until every VIF is at most `threshold`.
+    The inverse correlation matrix is downdated after every drop instead of being recomputed.
+
+    Returns:
+        tuple: VIF of the remaining features and the dropped column names, in drop order.
+    """
+    engine = InverseCorrelation(df[_vif_columns(df, use_columns, ignore_columns)])
+    dropped = []
+    while engine.columns:
+        if engine.inverse is None:
+            # Exact collinearity, drop the feature most involved in it (the last one on ties)
+            weights = engine.collinearity
+            column = engine.columns[len(weights) - 1 - int(np.argmax(weights[::-1]))]
+        else:
+            vif = np.diag(engine.inverse)
+            if vif.max() <= threshold:
+                break
+            column = engine.columns[int(np.argmax(vif))]
+        engine.remove(column)
+        dropped.append(column)
+
+    return _vif_frame(engine.vif()), dropped
+
+
+def plot_vif(vif_df: pd.DataFrame, save_dir: Union[str, Path], filename: str, max_features_to_plot: int = 20, fontsize: int = 14) -> None:
+    """Bar plot of the highest VIFs, saved as 'VIF_{filename}.svg' like `ml_tools.VIF.compute_vif`."""
+    plot_data = vif_df.dropna().head(max_features_to_plot)
+    if plot_data.empty:
+        return
+
+    colors = ["red" if v >= 10 else "gold" if v >= 5 else "green" for v in plot_data["VIF"]]
+
+    plt.figure(figsize=(10, 6))
+    plt.barh(plot_data["feature"], plot_data["VIF"], color=colors, edgecolor='black')
+    plt.title("Variance Inflation Factor (VIF) per Feature", fontsize=fontsize+1)
+    plt.xlabel("VIF value", fontsize=fontsize)
+    plt.xticks(fontsize=fontsize)
+    plt.yticks(fontsize=fontsize)
+    plt.axvline(x=5, color='gold', linestyle='--', label='VIF = 5')
+    plt.axvline(x=10, color='red', linestyle='--', label='VIF = 10')
+    plt.xlim(0, 12)
+    plt.legend(loc='lower right', fontsize=fontsize-1)
+    plt.gca().invert_yaxis()
+    plt.grid(axis='x', linestyle='--', alpha=0.5)
+    plt.tight_layout()
+
+    filename = "VIF_" + sanitize_filename(filename)
+    if not filename.endswith(".svg"):
+        filename += ".svg"
+    plt.savefig(make_fullpath(save_dir, make=True) / filename, format='svg', bbox_inches='tight')
+    plt.close()
+    _LOGGER.info(f"📊 Saved VIF plot: '{filename}'")
+
+
+def _vif_dataset(df_path: Path,
+                 output_plot_directory: Path,
+                 output_dataset_directory: Optional[Path],
+                 ignore_columns: Optional[list[str]],
+                 threshold: float,
+                 stepwise: bool) -> list[str]:
+    """VIF plot and reduced dataset of one CSV file. Returns the dropped columns."""
+    df, df_name = load_dataframe(df_path=df_path, kind="pandas")
+    df = compact_binaries(df)
+
+    if stepwise:
+        vif_df, dropped = drop_vif_stepwise(df, threshold=threshold, ignore_columns=ignore_columns)
+    else:
+        vif_df = compute_vif(df, ignore_columns=ignore_columns)
+        dropped = vif_df.loc[vif_df["VIF"] > threshold, "feature"].tolist()
+
+    plot_vif(vif_df, save_dir=output_plot_directory, filename=df_name)
+
+    if dropped:
+        _LOGGER.info(f"🗑️ '{df_name}': dropping {len(dropped)} column(s) with VIF > {threshold}: {dropped}")
+    else:
+        _LOGGER.info(f"'{df_name}': no columns exceed the VIF threshold of '{threshold}'.")
+
+    # Like `compute_vif_multi`, a dataset is only written when columns were dropped
+    if output_dataset_directory is not None and dropped:
+        save_dataframe_filename(df=df.drop(columns=dropped), save_dir=output_dataset_directory, filename=df_name + "_VIF" + df_path.suffix)
+
+    return dropped
+
+
+def compute_vif_parallel(input_directory: Union[str, Path],
+                         output_plot_directory: Union[str, Path],
+                         output_dataset_directory: Optional[Union[str, Path]] = None,
+                         ignore_columns: Optional[list[str]] = None,
+                         threshold: float = 10.0,
+                         stepwise: bool = False,
+                         n_workers: int = 1) -> dict[str, list[str]]:
+    """
+    Drop-in replacement for `ml_tools.VIF.compute_vif_multi` that processes every CSV file of a directory
+    in its own worker process and takes the VIFs from the inverse correlation matrix.
+    Reduced datasets are saved in the file format of their input.
+
+    Args:
+        input_directory (str | Path): Directory with the datasets (CSV, Parquet or Arrow).
+        output_plot_directory (str | Path): Directory of the VIF plots.
+        output_dataset_directory (str | Path | None): If given, datasets with dropped columns are saved here as '{name}_VIF'.
+        ignore_columns (list[str] | None): Columns excluded from the VIF computation (kept in the saved datasets).
+        threshold (float): Columns with a VIF above this are dropped.
+        stepwise (bool): False drops every column above the threshold at once, as `compute_vif_multi` does.
+            True drops the highest VIF one at a time, with a rank-one downdate between drops.
+        n_workers (int): Worker processes.
+
+    Returns:
+        dict[str, list[str]]: Dropped columns of each dataset file.
+    """
+    plot_path = make_fullpath(output_plot_directory, make=True)
+    dataset_path = make_fullpath(output_dataset_directory, make=True) if output_dataset_directory is not None else None
+
+    file_paths = list(list_dataset_paths(input_directory).values())
+    tasks = [(path, plot_path, dataset_path, ignore_columns, threshold, stepwise) for path in file_paths]
+
+    n_workers = max(1, min(n_workers, len(tasks)))
+    if n_workers == 1:
+        results = [_vif_dataset(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn")) as executor:
+            results = list(executor.map(_vif_dataset, *zip(*tasks)))
+
+    return {path.stem: dropped for path, dropped in zip(file_paths, results)}
@@ -0,0 +1,69 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import torch
+
+from ml_tools.ML_optimization import DragonParetoOptimizer
+from ml_tools._core import get_logger
+
+from .inference import encode_features
+
+
+_LOGGER = get_logger("Warm Start")
+
+
+def archive_seed_features(solutions: pd.DataFrame,
+                          optimizer: DragonParetoOptimizer,
+                          n_seeds: int,
+                          rng: np.random.Generator) -> np.ndarray:
+    """
+    Samples up to `n_seeds` archived solutions (without replacement) as optimizer inputs: categorical labels
+    back to codes and every feature clipped to the search bounds of `optimizer` (e.g. a collapsed Fraction_O bound).
+
+    Returns:
+        np.ndarray: (n, F) float32 array, n <= `n_seeds`.
+    """
+    features = encode_features(solutions, optimizer.schema)
+    # Solutions with categories unknown to the schema cannot be seeded
+    features = features[~np.isnan(features).any(axis=1)]
+
+    if len(features) > n_seeds:
+        features = features[np.sort(rng.choice(len(features), size=n_seeds, replace=False))]
+
+    lower = np.asarray(optimizer.lower_bounds, dtype=np.float32)
+    upper = np.asarray(optimizer.upper_bounds, dtype=np.float32)
+    return np.clip(features, lower, upper)
+
+
+def warm_start(optimizer: DragonParetoOptimizer,
+               solutions: Optional[pd.DataFrame],
+               fraction: float,
+               seed: int) -> int:
+    """
+    Replaces part of the (not yet evaluated) random initial population of `optimizer` with archived solutions.
+    The remaining individuals stay random for diversity.
+
+    Args:
+        optimizer (DragonParetoOptimizer): Optimizer before its first generation.
+        solutions (pd.DataFrame | None): Archived non-dominated solutions, with every schema feature.
+        fraction (float): Share of the initial population taken from the archive, in [0, 1].
+        seed (int): Seed of the archive sample.
+
+    Returns:
+        int: Number of seeded individuals.
+    """
+    if solutions is None or solutions.empty or fraction <= 0:
+        return 0
+
+    population = optimizer.algorithm.population
+    n_seeds = int(round(min(fraction, 1.0) * len(population)))
+    seeds = archive_seed_features(solutions, optimizer, n_seeds, np.random.default_rng(seed))
+    if len(seeds) == 0:
+        return 0
+
+    values = torch.as_tensor(seeds, dtype=population.values.dtype, device=population.device)
+    population.set_values(values, solutions=slice(0, len(seeds)))
+
+    _LOGGER.info(f"Seeded {len(seeds)} of {len(population)} initial individuals from the archive.")
+    return len(seeds)
@@ -1,5 +1,9 @@
 from ml_tools.path_manager import DragonPathManager
 
+
+# File format of the intermediate datasets: ".csv", ".parquet" or ".arrow" (Arrow IPC, memory-mapped reads)
+DATA_SUFFIX = ".csv"
+
 # 1. Initialize the PathManager using this file as the anchor, adding base directories.
 PM = DragonPathManager(
     anchor_file=__file__,
@@ -20,6 +24,8 @@ PM.train_metrics = PM.results / "Train Metrics"
 PM.optimization_engineering = PM.data / "Optimization Engineering"
 PM.optimization_train_metrics = PM.results / "Optimization Train Metrics"
 PM.optimization_results = PM.results / "Optimization Results"
+# Preprocessing
+PM.parse_cache = PM.data / "Parse Cache"
 
 # 2.2 📁 Subdirectories
 PM.feature_engineering_raw = PM.feature_engineering / "Feature Engineering Raw"
@@ -27,16 +33,40 @@ PM.feature_engineering_final = PM.feature_engineering / "Feature Engineering Fin
 PM.optimization_train_checkpoints = PM.optimization_train_metrics / "checkpoints"
 PM.optimization_train_artifacts = PM.optimization_train_metrics / "artifacts"
 PM.optimization_train_evaluation = PM.optimization_train_metrics / "evaluation"
+PM.optimization_telemetry = PM.optimization_results / "Telemetry"
+# Benchmarks
+PM.benchmarks = PM.results / "Benchmarks"
+PM.benchmark_sandbox = PM.benchmarks / "Sandbox"
+# Profiling
+PM.profiling = PM.results / "Profiling"
 
 # 2.3 📄 Files
 PM.clean_data_file = PM.clean_data / "clean_data.csv"
-PM.processed_data_file = PM.data / "processed_data.csv"
-PM.engineered_raw_file = PM.feature_engineering_raw / "engineered_data_raw.csv"
-PM.engineered_final_file = PM.feature_engineering_final / "engineered_data_final.csv"
+PM.processed_data_file = PM.data / f"processed_data{DATA_SUFFIX}"
+PM.one_hot_vocabulary_file = PM.data / "one_hot_vocabularies.json"
+PM.engineered_raw_file = PM.feature_engineering_raw / f"engineered_data_raw{DATA_SUFFIX}"
+PM.engineered_final_file = PM.feature_engineering_final / f"engineered_data_final{DATA_SUFFIX}"
 PM.binary_columns_file = PM.feature_engineering / "BINARY_COLUMNS_list.joblib"
 PM.continuous_columns_file = PM.feature_engineering / "CONTINUOUS_COLUMNS_list.joblib"
 # Optimization
-PM.optimization_data_file = PM.optimization_engineering / "optimization_dataset.csv"
+PM.optimization_data_file = PM.optimization_engineering / f"optimization_dataset{DATA_SUFFIX}"
+PM.pareto_archive_file = PM.optimization_results / f"Pareto_Solutions{DATA_SUFFIX}"
+PM.balanced_solutions_file = PM.optimization_results / "balanced_NonDominatedSolutions.csv"
+PM.recipes_file = PM.optimization_results / f"Pareto_Recipes{DATA_SUFFIX}"
+PM.optimization_telemetry_summary_file = PM.optimization_results / "telemetry_summary.csv"
+PM.optimization_stats_file = PM.optimization_results / "seed_stats.csv"
+PM.screening_report_file = PM.optimization_results / "screening_report.csv"
+# Always columnar: the default 10^7-design sweep would be a multi-GB CSV
+PM.sweep_file = PM.optimization_results / "design_sweep.parquet"
+PM.sweep_stats_file = PM.optimization_results / "design_sweep_stats.json"
+# Pipeline
+PM.pipeline_state_file = PM.results / "pipeline_state.json"
+PM.memory_report_file = PM.results / "memory_report.csv"
+# Benchmarks
+PM.benchmark_results_file = PM.benchmarks / "benchmark_suite.json"
+PM.benchmark_baseline_file = PM.benchmarks / "benchmark_baseline.json"
+# Profiling
+PM.profiling_trace_file = PM.profiling / "trace.jsonl"
 
 # 3. 🛠️ Make directories and check status
 if __name__ == "__main__":
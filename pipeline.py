@@ -0,0 +1,240 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from importlib.metadata import version
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from ml_tools.IO_tools import load_json, save_json
+from ml_tools.utilities import save_dataframe_filename
+from ml_tools._core import get_logger
+
+from helpers.profiling import ENV_VARIABLE as PROFILE_ENV_VARIABLE
+from paths import PM
+
+
+_LOGGER = get_logger("Pipeline")
+
+_ROOT = Path(__file__).resolve().parent
+
+# Code every stage depends on
+_SHARED_CODE = ["paths.py", "helpers/__init__.py", "helpers/constants.py", "helpers/profiling.py", "helpers/storage.py"]
+
+
+@dataclass
+class Stage:
+    """
+    One step of the numbered pipeline.
+
+    Module-level parameters (e.g. `ITERATIONS`, hyperparameters, the transformation recipe) live in the
+    stage's code files and are covered by their content hash.
+    """
+    name: str
+    script: str
+    inputs: list[Path]
+    outputs: list[Path]
+    code: list[str] = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+
+    def command(self) -> list[str]:
+        if self.script.endswith(".md"):
+            # Jupytext notebooks are executed in place
+            return [sys.executable, "-m", "jupytext", "--to", "ipynb", "--execute", self.script]
+        return [sys.executable, self.script]
+
+
+STAGES = [
+    Stage(name="1_preprocess",
+          script="1_preprocess.py",
+          inputs=[PM.clean_data_file],
+          outputs=[PM.processed_data_file],
+          code=["helpers/function_map.py", "helpers/keyword_matcher.py", "helpers/memo_processor.py", "helpers/streaming.py"]),
+    Stage(name="2_feature_engineering",
+          script="2_feature_engineering.md",
+          inputs=[PM.processed_data_file],
+          outputs=[PM.engineered_raw_file],
+          code=["helpers/compact.py"]),
+    Stage(name="3_feature_engineering_p2",
+          script="3_feature_engineering_p2.md",
+          inputs=[PM.engineered_raw_file],
+          outputs=[PM.engineered_final_file, PM.binary_columns_file, PM.continuous_columns_file],
+          code=["helpers/compact.py"]),
+    Stage(name="5_mice",
+          script="5_mice.py",
+          inputs=[PM.engineered_final_file, PM.binary_columns_file],
+          outputs=[PM.mice_datasets],
+          code=["helpers/compact.py", "helpers/parallel_mice.py"]),
+    Stage(name="6_vif",
+          script="6_vif.py",
+          inputs=[PM.mice_datasets],
+          outputs=[PM.vif_datasets],
+          code=["helpers/compact.py", "helpers/vif.py"]),
+    Stage(name="7_optimization_engineering",
+          script="7_optimization_engineering.md",
+          inputs=[PM.mice_datasets],
+          outputs=[PM.optimization_engineering],
+          code=["helpers/schema_ops.py"]),
+    Stage(name="8_optimization_training",
+          script="8_optimization_training.md",
+          inputs=[PM.optimization_engineering],
+          outputs=[PM.optimization_train_artifacts],
+          code=["helpers/cpu_training.py", "helpers/storage.py"]),
+    Stage(name="9_optimization",
+          script="9_optimization.py",
+          # The persistent archive warm-starts the runs and is merged into, so it is read as well as written
+          inputs=[PM.optimization_engineering, PM.optimization_train_artifacts, PM.pareto_archive_file],
+          outputs=[PM.pareto_archive_file],
+          code=["helpers/balance.py", "helpers/convergence.py", "helpers/inference.py", "helpers/pareto.py", "helpers/pareto_runner.py",
+                "helpers/screening.py", "helpers/storage.py", "helpers/surrogate_cache.py", "helpers/telemetry.py", "helpers/warm_start.py"]),
+    Stage(name="10_balance",
+          script="10_balance.py",
+          inputs=[PM.pareto_archive_file, PM.optimization_engineering, PM.optimization_train_artifacts],
+          outputs=[PM.balanced_solutions_file],
+          code=["helpers/balance.py", "helpers/inference.py"]),
+    Stage(name="11_recipes",
+          script="11_recipes.py",
+          inputs=[PM.balanced_solutions_file, PM.optimization_engineering],
+          outputs=[PM.recipes_file],
+          code=["helpers/recipes.py"]),
+]
+
+
+class _Hasher:
+    """Content hashes of files and directories, reusing the stored digest of files whose size and mtime did not change."""
+    def __init__(self, file_digests: dict[str, list]):
+        # path -> [size, mtime_ns, digest]
+        self.file_digests = file_digests
+
+    def file(self, path: Path) -> str:
+        stat = path.stat()
+        known = self.file_digests.get(str(path))
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.file_digests[str(path)] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path(self, path: Path) -> str:
+        if path.is_dir():
+            entries = [f"{p.relative_to(path)}:{self.file(p)}" for p in sorted(path.rglob("*")) if p.is_file()]
+            return hashlib.sha256("\n".join(entries).encode()).hexdigest()
+        if path.is_file():
+            return self.file(path)
+        return "missing"
+
+
+def stage_key(stage: Stage, hasher: _Hasher) -> str:
+    """Hash of the stage code, parameters, library version and input contents."""
+    parts = {
+        "code": {name: hasher.path(_ROOT / name) for name in [stage.script, *_SHARED_CODE, *stage.code]},
+        "inputs": {str(path): hasher.path(path) for path in stage.inputs},
+        "params": stage.params,
+        "ml_tools": version("dragon-ml-toolbox"),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _save_state(stage_keys: dict[str, str], hasher: _Hasher) -> None:
+    save_json(data={"stages": stage_keys, "files": hasher.file_digests},
+              directory=PM.pipeline_state_file.parent,
+              filename=PM.pipeline_state_file.name,
+              verbose=False)
+
+
+def run_pipeline(stage_names: Optional[list[str]] = None,
+                 force: Optional[list[str]] = None,
+                 dry_run: bool = False,
+                 profile: Optional[str] = None) -> pd.DataFrame:
+    """
+    Runs the pipeline stages in order, skipping those whose code, parameters and inputs are unchanged
+    since their last successful run and whose outputs still exist.
+
+    Args:
+        stage_names (list[str] | None): Subset of stages to consider. None runs all.
+        force (list[str] | None): Stages to run even if cached.
+        dry_run (bool): Only report which stages would run.
+        profile (str | None): Profiling mode of the stages that run ('1' or 'cprofile', see `helpers.profiling`).
+            Cached stages are not profiled, force them to trace them.
+
+    Returns:
+        pd.DataFrame: Per-stage status and wall time.
+    """
+    state = load_json(PM.pipeline_state_file, verbose=False) if PM.pipeline_state_file.exists() else {}
+    stage_keys: dict[str, str] = state.get("stages", {})
+    hasher = _Hasher(state.get("files", {}))
+    force = force or []
+    env = {**os.environ, PROFILE_ENV_VARIABLE: profile} if profile else None
+
+    records = []
+    for stage in STAGES:
+        if stage_names and stage.name not in stage_names:
+            continue
+
+        # Inputs are hashed now, after the upstream stages have run
+        key = stage_key(stage, hasher)
+        outputs_exist = all(path.exists() for path in stage.outputs)
+        cached = stage_keys.get(stage.name) == key and outputs_exist and stage.name not in force
+
+        if cached or dry_run:
+            status = "cached" if cached else "would run"
+            records.append({"Stage": stage.name, "Status": status, "Wall Time(s)": 0.0})
+            _LOGGER.info(f"{stage.name}: {status}.")
+            continue
+
+        _LOGGER.info(f"{stage.name}: running '{stage.script}'...")
+        start = time.perf_counter()
+        result = subprocess.run(stage.command(), cwd=_ROOT, env=env)
+        elapsed = time.perf_counter() - start
+
+        if result.returncode != 0:
+            records.append({"Stage": stage.name, "Status": "failed", "Wall Time(s)": elapsed})
+            _LOGGER.error(f"{stage.name} failed after {elapsed:.1f}s (exit code {result.returncode}).")
+            break
+
+        records.append({"Stage": stage.name, "Status": "ran", "Wall Time(s)": elapsed})
+        # A stage reading its own output is up to date with the output it just wrote
+        if any(path in stage.inputs for path in stage.outputs):
+            key = stage_key(stage, hasher)
+        stage_keys[stage.name] = key
+        _LOGGER.info(f"{stage.name}: done in {elapsed:.1f}s.")
+
+        # Persist after every stage so an interrupted run keeps its progress
+        _save_state(stage_keys, hasher)
+
+    if not dry_run:
+        _save_state(stage_keys, hasher)
+
+    report = pd.DataFrame(records)
+    if not report.empty:
+        hits = int((report["Status"] == "cached").sum())
+        _LOGGER.info(f"Pipeline report ({hits}/{len(report)} cache hits):\n{report.to_string(index=False)}")
+        if not dry_run:
+            save_dataframe_filename(df=report, save_dir=PM.results, filename="pipeline_report.csv")
+
+    if not report.empty and (report["Status"] == "failed").any():
+        raise RuntimeError("Pipeline stopped at a failed stage.")
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the numbered pipeline, skipping unchanged stages.")
+    parser.add_argument("--stages", nargs="+", choices=[stage.name for stage in STAGES], default=None)
+    parser.add_argument("--force", nargs="+", choices=[stage.name for stage in STAGES], default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--profile", nargs="?", const="1", choices=["1", "cprofile"], default=None,
+                        help="Trace the steps of the stages that run into the profiling trace, 'cprofile' also dumps the slowest step.")
+    args = parser.parse_args()
+
+    run_pipeline(stage_names=args.stages, force=args.force, dry_run=args.dry_run, profile=args.profile)
@@ -0,0 +1,57 @@
+from ml_tools.ML_utilities import DragonArtifactFinder
+
+from helpers.balance import ChargeBalancer
+from helpers.constants import CONTINUOUS_INTEGER_FEATURES
+from helpers.inference import load_inference_handler
+from helpers.scoring import MicroBatcher, RecipeScorer, serve
+from helpers.surrogate_cache import CachedInferenceHandler
+from paths import PM
+
+
+# Local only by default, the server has no authentication
+HOST: str = "127.0.0.1"
+PORT: int = 8765
+
+# Intra-op threads of the CPU model, None keeps the torch default
+NUM_THREADS: int | None = None
+
+# Micro-batching: a batch runs once it has MAX_BATCH_ROWS rows or MAX_WAIT_MS after its first request
+MAX_BATCH_ROWS: int = 256
+MAX_WAIT_MS: float = 2.0
+
+# Derive Fraction_O from the cations (electroneutrality), as in the optimization
+CHARGE_BALANCE: bool = True
+
+# Maximum number of cached predictions
+CACHE_SIZE: int = 100_000
+
+# Seconds between latency/throughput log lines
+STATS_INTERVAL: float = 60.0
+
+
+def main():
+    ARTIFACTS = DragonArtifactFinder(directory=PM.optimization_train_artifacts,
+                                     load_scaler=True,
+                                     load_schema=True,
+                                     strict=True)
+    schema = ARTIFACTS.feature_schema
+
+    inference_handler = load_inference_handler(architecture_path=ARTIFACTS.model_architecture_path, # type: ignore
+                                               weights_path=ARTIFACTS.weights_path, # type: ignore
+                                               scaler_path=ARTIFACTS.scaler_path,
+                                               device="cpu",
+                                               num_threads=NUM_THREADS)
+
+    integer_indices = [schema.feature_names.index(col) for col in CONTINUOUS_INTEGER_FEATURES if col in schema.feature_names] # type: ignore
+    inference_handler = CachedInferenceHandler(inference_handler=inference_handler,
+                                               integer_indices=integer_indices,
+                                               canonicalize=ChargeBalancer(feature_names=list(schema.feature_names)) if CHARGE_BALANCE else None, # type: ignore
+                                               max_size=CACHE_SIZE,
+                                               batch_size=MAX_BATCH_ROWS)
+
+    batcher = MicroBatcher(inference_handler=inference_handler, max_batch_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS)
+    serve(scorer=RecipeScorer(batcher=batcher, schema=schema), host=HOST, port=PORT, stats_interval=STATS_INTERVAL) # type: ignore
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from ml_tools.IO_tools import save_json
+from ml_tools.ML_utilities import DragonArtifactFinder
+
+from helpers.balance import ChargeBalancer
+from helpers.constants import CONTINUOUS_OPTIMIZATION_RANGE, LI_RICH_OPTIMIZATION_RANGE, CONTINUOUS_INTEGER_FEATURES
+from helpers.inference import load_inference_handler
+from helpers.sweep import DesignSpace, sweep_design_space
+from paths import PM
+
+
+# Continuous bounds of the sweep: the general optimization range or the Li-rich (Li1.2Mn0.54Ni0.13Co0.13O2) range
+RANGES: dict = CONTINUOUS_OPTIMIZATION_RANGE
+# RANGES = LI_RICH_OPTIMIZATION_RANGE
+
+# Labels swept per categorical feature, features left out use every label of the schema
+CATEGORICAL_OPTIONS: dict[str, list[str]] = {}
+
+# Categorical features crossed exhaustively with every design instead of sampled
+CROSS_FEATURES: list[str] = []
+
+# Number of designs and quasi-random method: "sobol" or "lhs". The sweep is written to Parquet (PM.sweep_file),
+# as CSV the default 10^7 designs would take several GB
+N_POINTS: int = 10_000_000
+METHOD: str = "sobol"
+SEED: int = 42
+
+# Designs generated and written per chunk (power of two for Sobol), and per model call
+CHUNK_SIZE: int = 2**18
+BATCH_SIZE: int = 8192
+
+# Intra-op threads of the CPU model, None keeps the torch default
+NUM_THREADS: int | None = None
+
+# Derive Fraction_O from the cations (electroneutrality), as in the optimization
+CHARGE_BALANCE: bool = True
+
+
+def main():
+    ARTIFACTS = DragonArtifactFinder(directory=PM.optimization_train_artifacts,
+                                     load_scaler=True,
+                                     load_schema=True,
+                                     strict=True)
+    schema = ARTIFACTS.feature_schema
+
+    inference_handler = load_inference_handler(architecture_path=ARTIFACTS.model_architecture_path, # type: ignore
+                                               weights_path=ARTIFACTS.weights_path, # type: ignore
+                                               scaler_path=ARTIFACTS.scaler_path,
+                                               device="cpu",
+                                               num_threads=NUM_THREADS)
+
+    space = DesignSpace(schema=schema, # type: ignore
+                        continuous_ranges=RANGES,
+                        categorical_options=CATEGORICAL_OPTIONS,
+                        cross_features=CROSS_FEATURES,
+                        integer_columns=CONTINUOUS_INTEGER_FEATURES,
+                        balancer=ChargeBalancer(feature_names=list(schema.feature_names)) if CHARGE_BALANCE else None) # type: ignore
+
+    stats = sweep_design_space(space=space,
+                               inference_handler=inference_handler,
+                               output_path=PM.sweep_file,
+                               n_points=N_POINTS,
+                               method=METHOD, # type: ignore
+                               chunk_size=CHUNK_SIZE,
+                               batch_size=BATCH_SIZE,
+                               seed=SEED)
+
+    save_json(data=stats, directory=PM.sweep_stats_file.parent, filename=PM.sweep_stats_file.name, verbose=False)
+
+
+if __name__ == "__main__":
+    main()